@@ -9,6 +9,8 @@ PROJECT_ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 LOG_FILE="${PROJECT_ROOT}/deploy.log"
 # Temporary file to store CDK deployment output
 CDK_OUTPUT_FILE="${PROJECT_ROOT}/cdk/cdk-deploy-output.json"
+# DynamoDB table shared by the API and translation Lambdas for job status
+JOB_TABLE_NAME="${JOB_TABLE_NAME:-ppt-translation-jobs}"
 
 # Function to log messages
 log_message() {
@@ -79,7 +81,7 @@ check_aws_credentials
 # Step 1: Compile and Package Lambda Function
 log_message "Step 1: Packaging Lambda function..."
 cd "${PROJECT_ROOT}/translator-app" || handle_error "Failed to navigate to translator-app directory"
-zip -r translator-app.zip . -x "*.git*" || handle_error "Failed to create translator-app.zip"
+zip -r translator-app.zip . -x "*.git*" "tests/*" || handle_error "Failed to create translator-app.zip"
 log_message "Lambda function packaged successfully as translator-app.zip"
 
 # Create output directory if it doesn't exist
@@ -155,6 +157,41 @@ log_message "  Original Bucket: $ORIGINAL_BUCKET"
 log_message "  Translated Bucket: $TRANSLATED_BUCKET"
 log_message "  CloudFront Domain: $CLOUDFRONT_DOMAIN"
 
+# Step 3b: Provision the job table and point the Lambda functions at it
+log_message "Step 3b: Provisioning job table $JOB_TABLE_NAME..."
+if ! aws dynamodb describe-table --table-name "$JOB_TABLE_NAME" &> /dev/null; then
+    aws dynamodb create-table \
+        --table-name "$JOB_TABLE_NAME" \
+        --attribute-definitions AttributeName=jobId,AttributeType=S \
+        --key-schema AttributeName=jobId,KeyType=HASH \
+        --billing-mode PAY_PER_REQUEST > /dev/null || handle_error "Failed to create DynamoDB table $JOB_TABLE_NAME"
+    aws dynamodb wait table-exists --table-name "$JOB_TABLE_NAME" || handle_error "Table $JOB_TABLE_NAME did not become active"
+    log_message "Created DynamoDB table $JOB_TABLE_NAME"
+fi
+JOB_TABLE_ARN=$(aws dynamodb describe-table --table-name "$JOB_TABLE_NAME" --query "Table.TableArn" --output text)
+
+# The API and translation Lambdas must share the table; without it they refuse to track jobs
+LAMBDA_FUNCTIONS=$(aws cloudformation describe-stack-resources --stack-name "$STACK_NAME" \
+    --query "StackResources[?ResourceType=='AWS::Lambda::Function'].PhysicalResourceId" --output text 2>/dev/null)
+if [ -z "$LAMBDA_FUNCTIONS" ]; then
+    log_message "WARNING: No Lambda functions found in stack $STACK_NAME; set JOB_TABLE_NAME=$JOB_TABLE_NAME on them manually"
+fi
+for FUNCTION_NAME in $LAMBDA_FUNCTIONS; do
+    # Merge JOB_TABLE_NAME into the existing variables rather than replacing them
+    ENVIRONMENT=$(aws lambda get-function-configuration --function-name "$FUNCTION_NAME" \
+        --query "Environment.Variables" --output json | \
+        jq -c --arg table "$JOB_TABLE_NAME" '{Variables: ((. // {}) + {JOB_TABLE_NAME: $table})}')
+    aws lambda update-function-configuration --function-name "$FUNCTION_NAME" \
+        --environment "$ENVIRONMENT" > /dev/null || handle_error "Failed to set JOB_TABLE_NAME on $FUNCTION_NAME"
+
+    ROLE_NAME=$(aws lambda get-function-configuration --function-name "$FUNCTION_NAME" \
+        --query "Role" --output text | sed 's|.*/||')
+    aws iam put-role-policy --role-name "$ROLE_NAME" --policy-name "translation-job-table" \
+        --policy-document "{\"Version\": \"2012-10-17\", \"Statement\": [{\"Effect\": \"Allow\", \"Action\": [\"dynamodb:GetItem\", \"dynamodb:PutItem\", \"dynamodb:UpdateItem\"], \"Resource\": \"$JOB_TABLE_ARN\"}]}" \
+        || handle_error "Failed to grant $FUNCTION_NAME access to $JOB_TABLE_NAME"
+    log_message "Configured $FUNCTION_NAME to use job table $JOB_TABLE_NAME"
+done
+
 # Step 4: Update Configuration in 'web-ui/src/aws-exports.js'
 log_message "Step 4: Updating configuration in web-ui/src/aws-exports.js..."
 AWS_EXPORTS_FILE="${PROJECT_ROOT}/web-ui/src/aws-exports.js"
@@ -0,0 +1,116 @@
+import os
+import threading
+
+import boto3
+from botocore.config import Config
+
+# Connection pool per client; raised to match translation concurrency where needed
+DEFAULT_MAX_POOL_CONNECTIONS = 10
+
+# Attempts per call, including the first, under botocore's adaptive retry mode
+DEFAULT_MAX_ATTEMPTS = 3
+
+_clients = {}
+_resolved = {}
+_lock = threading.Lock()
+
+
+def client_config(max_pool_connections=DEFAULT_MAX_POOL_CONNECTIONS, max_attempts=None, read_timeout=None):
+    """
+    Return the botocore configuration shared by every client.
+
+    Adaptive retries add client-side rate limiting on throttling errors, and TCP
+    keep-alive keeps pooled connections usable across warm Lambda invocations.
+    AWS_MAX_ATTEMPTS overrides the default number of attempts.
+
+    Args:
+        max_pool_connections (int): Size of the client's HTTP connection pool.
+        max_attempts (int): Attempts per call, or None for the default. Use 1 for
+            clients whose callers do their own retrying.
+        read_timeout (float): Seconds to wait for each socket read, or None for the
+            botocore default. On streaming calls this bounds the gap between chunks.
+
+    Returns:
+        Config: botocore client configuration.
+    """
+    options = {'read_timeout': read_timeout} if read_timeout else {}
+    return Config(
+        max_pool_connections=max_pool_connections,
+        retries={
+            'mode': 'adaptive',
+            'max_attempts': max_attempts or int(os.environ.get('AWS_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS))
+        },
+        tcp_keepalive=True,
+        **options
+    )
+
+
+def get_client(service_name, region_name=None, max_pool_connections=DEFAULT_MAX_POOL_CONNECTIONS,
+               max_attempts=None, read_timeout=None):
+    """
+    Return a process-wide boto3 client, creating it on first use.
+
+    Clients are thread-safe and kept at module level so warm Lambda invocations reuse
+    their connection pools instead of building new clients.
+
+    Args:
+        service_name (str): AWS service name, e.g. 's3'.
+        region_name (str): AWS region, or None for the default region.
+        max_pool_connections (int): Minimum connection pool size.
+        max_attempts (int): Attempts per call, or None for the default.
+        read_timeout (float): Seconds to wait for each socket read, or None for the default.
+
+    Returns:
+        botocore.client.BaseClient: The client.
+    """
+    max_pool_connections = max(DEFAULT_MAX_POOL_CONNECTIONS, max_pool_connections)
+    key = (service_name, region_name, max_pool_connections, max_attempts, read_timeout)
+    with _lock:
+        if key not in _clients:
+            _clients[key] = boto3.client(
+                service_name, region_name=region_name,
+                config=client_config(max_pool_connections, max_attempts, read_timeout)
+            )
+        return _clients[key]
+
+
+def resolve_once(name, resolver):
+    """
+    Return a value computed by `resolver()` on first use and cached for the process.
+
+    Args:
+        name (str): Cache key.
+        resolver (callable): Computes the value.
+
+    Returns:
+        The cached value.
+    """
+    with _lock:
+        if name in _resolved:
+            return _resolved[name]
+    value = resolver()
+    with _lock:
+        return _resolved.setdefault(name, value)
+
+
+def lambda_function_arn(function_name):
+    """
+    Return the full ARN of a Lambda function given its name or ARN.
+
+    The account ID is looked up with STS once per process.
+
+    Args:
+        function_name (str): Function name or ARN.
+
+    Returns:
+        str: Function ARN.
+    """
+    if ':function:' in function_name:
+        return function_name
+
+    def resolve():
+        account_id = get_client('sts').get_caller_identity()['Account']
+        region = boto3.session.Session().region_name
+        return f"arn:aws:lambda:{region}:{account_id}:function:{function_name}"
+
+    return resolve_once(f"lambda_arn:{function_name}", resolve)
@@ -0,0 +1,256 @@
+"""
+Local stand-ins for the AWS clients used by the translation pipeline.
+
+FakeBedrockRuntime answers converse and converse_stream calls without a network. Its
+latency is drawn from a configurable distribution, it can throw ThrottlingException at a
+set rate, and it "translates" by echoing the input text so token counts stay realistic.
+LocalS3Client implements the S3 calls the translator makes on top of a local directory.
+"""
+import json
+import math
+import os
+import random
+import shutil
+import threading
+import time
+
+from botocore.exceptions import ClientError
+
+# Latency distributions understood by LatencyModel
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "exponential", "lognormal")
+
+
+def estimate_tokens(text):
+    """Estimate model tokens the same way the translator does (~4 characters per token)."""
+    return max(1, (len(text) + 3) // 4)
+
+
+class LatencyModel:
+    """
+    Per-call latency: a base delay drawn from a distribution plus a per-output-token cost.
+
+    Args:
+        distribution (str): 'constant', 'uniform' (mean ± jitter), 'exponential' or
+            'lognormal' (jitter is the sigma of the underlying normal).
+        mean_ms (float): Mean base delay in milliseconds.
+        jitter (float): Spread of the distribution, relative to the mean.
+        ms_per_output_token (float): Extra delay per generated token.
+        seed (int): Random seed, for repeatable runs.
+    """
+
+    def __init__(self, distribution="lognormal", mean_ms=300.0, jitter=0.5,
+                 ms_per_output_token=0.0, seed=None):
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        self.distribution = distribution
+        self.mean_ms = mean_ms
+        self.jitter = jitter
+        self.ms_per_output_token = ms_per_output_token
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample_ms(self, output_tokens=0):
+        """Return a latency in milliseconds for a call generating `output_tokens`."""
+        with self._lock:
+            if self.distribution == "constant":
+                base = self.mean_ms
+            elif self.distribution == "uniform":
+                base = self._random.uniform(self.mean_ms * (1 - self.jitter), self.mean_ms * (1 + self.jitter))
+            elif self.distribution == "exponential":
+                base = self._random.expovariate(1.0 / self.mean_ms) if self.mean_ms > 0 else 0.0
+            else:
+                # Lognormal with the requested mean
+                mu = math.log(self.mean_ms) - self.jitter ** 2 / 2 if self.mean_ms > 0 else 0.0
+                base = self._random.lognormvariate(mu, self.jitter) if self.mean_ms > 0 else 0.0
+        return max(0.0, base) + output_tokens * self.ms_per_output_token
+
+
+class FakeBedrockRuntime:
+    """
+    bedrock-runtime stand-in implementing converse and converse_stream.
+
+    The reply echoes the text after the prompt's instructions (the part after the first
+    blank line), so batched JSON envelopes and inline run tags come back intact.
+    Counters are kept for calls, throttled calls and tokens.
+
+    Args:
+        latency (LatencyModel): Latency of every call.
+        throttle_rate (float): Probability that a call raises ThrottlingException.
+        echo_prefix (str): Prepended to every echoed text (or JSON value), so changed
+            output is visible in the translated deck.
+        seed (int): Random seed for throttling decisions.
+    """
+
+    def __init__(self, latency=None, throttle_rate=0.0, echo_prefix="", seed=None):
+        self.latency = latency or LatencyModel("constant", 0.0)
+        self.throttle_rate = throttle_rate
+        self.echo_prefix = echo_prefix
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.throttled = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def converse(self, modelId, messages, inferenceConfig=None, **kwargs):
+        """Return a converse-style response after the sampled latency."""
+        prompt = messages[0]["content"][0]["text"]
+        output = self._reply(prompt)
+        input_tokens = estimate_tokens(prompt)
+        output_tokens = estimate_tokens(output)
+        latency_ms = self.latency.sample_ms(output_tokens)
+        time.sleep(latency_ms / 1000.0)
+        with self._lock:
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+        return {
+            "output": {"message": {"role": "assistant", "content": [{"text": output}]}},
+            "stopReason": "end_turn",
+            "usage": {"inputTokens": input_tokens, "outputTokens": output_tokens,
+                      "totalTokens": input_tokens + output_tokens},
+            "metrics": {"latencyMs": round(latency_ms)}
+        }
+
+    def converse_stream(self, modelId, messages, inferenceConfig=None, **kwargs):
+        """Return a converse_stream-style response; the latency is spread over the chunks."""
+        prompt = messages[0]["content"][0]["text"]
+        output = self._reply(prompt)
+        input_tokens = estimate_tokens(prompt)
+        output_tokens = estimate_tokens(output)
+        latency_ms = self.latency.sample_ms(output_tokens)
+        with self._lock:
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+        pieces = [output[i:i + 16] for i in range(0, len(output), 16)] or [""]
+
+        def events():
+            yield {"messageStart": {"role": "assistant"}}
+            for piece in pieces:
+                time.sleep(latency_ms / 1000.0 / len(pieces))
+                yield {"contentBlockDelta": {"contentBlockIndex": 0, "delta": {"text": piece}}}
+            yield {"messageStop": {"stopReason": "end_turn"}}
+            yield {"metadata": {"usage": {"inputTokens": input_tokens, "outputTokens": output_tokens,
+                                          "totalTokens": input_tokens + output_tokens},
+                                "metrics": {"latencyMs": round(latency_ms)}}}
+
+        return {"stream": events()}
+
+    def stats(self):
+        """Return the call and token counters."""
+        with self._lock:
+            return {"calls": self.calls, "throttled": self.throttled,
+                    "input_tokens": self.input_tokens, "output_tokens": self.output_tokens}
+
+    def _reply(self, prompt):
+        with self._lock:
+            self.calls += 1
+            throttle = self._random.random() < self.throttle_rate
+            if throttle:
+                self.throttled += 1
+        if throttle:
+            raise ClientError({"Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"}}, "Converse")
+        text = prompt.split("\n\n", 1)[1] if "\n\n" in prompt else prompt
+        if prompt.startswith("Translate the value of every entry"):
+            segments = json.loads(text)
+            return json.dumps({key: self.echo_prefix + value for key, value in segments.items()},
+                              ensure_ascii=False)
+        return self.echo_prefix + text
+
+
+class _Body:
+    """Streaming body returned by LocalS3Client.get_object."""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+
+    def read(self, amount=None):
+        return self._file.read() if amount is None else self._file.read(amount)
+
+    def iter_chunks(self, chunk_size=1024 * 1024):
+        try:
+            while True:
+                chunk = self._file.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            self._file.close()
+
+    def close(self):
+        self._file.close()
+
+
+class _Paginator:
+    def __init__(self, client):
+        self._client = client
+
+    def paginate(self, Bucket, Prefix=""):
+        yield self._client.list_objects_v2(Bucket=Bucket, Prefix=Prefix)
+
+
+class LocalS3Client:
+    """
+    S3 stand-in storing objects as files under `root/<bucket>/<key>`.
+
+    Implements the calls made by the translator and the bulk and directory modes:
+    get_object, put_object, upload_fileobj, upload_file, download_file and
+    list_objects_v2 (also through get_paginator).
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, bucket, key):
+        return os.path.join(self.root, bucket, *key.split("/"))
+
+    def _missing(self, bucket, key, operation):
+        return ClientError({"Error": {"Code": "NoSuchKey", "Message": f"s3://{bucket}/{key} not found"}}, operation)
+
+    def get_object(self, Bucket, Key, **kwargs):
+        path = self._path(Bucket, Key)
+        if not os.path.exists(path):
+            raise self._missing(Bucket, Key, "GetObject")
+        return {"Body": _Body(path), "ContentLength": os.path.getsize(path)}
+
+    def put_object(self, Bucket, Key, Body=b"", **kwargs):
+        path = self._path(Bucket, Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(Body if isinstance(Body, bytes) else Body.read())
+        return {}
+
+    def upload_fileobj(self, Fileobj, Bucket, Key, **kwargs):
+        path = self._path(Bucket, Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            shutil.copyfileobj(Fileobj, f)
+
+    def upload_file(self, Filename, Bucket, Key, **kwargs):
+        path = self._path(Bucket, Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.copyfile(Filename, path)
+
+    def download_file(self, Bucket, Key, Filename, **kwargs):
+        path = self._path(Bucket, Key)
+        if not os.path.exists(path):
+            raise self._missing(Bucket, Key, "HeadObject")
+        shutil.copyfile(path, Filename)
+
+    def list_objects_v2(self, Bucket, Prefix="", **kwargs):
+        base = os.path.join(self.root, Bucket)
+        contents = []
+        for root, _, files in os.walk(base):
+            for name in files:
+                path = os.path.join(root, name)
+                key = os.path.relpath(path, base).replace(os.sep, "/")
+                if key.startswith(Prefix):
+                    stat = os.stat(path)
+                    contents.append({"Key": key, "Size": stat.st_size,
+                                     "ETag": f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'})
+        contents.sort(key=lambda item: item["Key"])
+        return {"Contents": contents, "KeyCount": len(contents), "IsTruncated": False}
+
+    def get_paginator(self, operation_name):
+        if operation_name != "list_objects_v2":
+            raise ValueError(f"LocalS3Client has no paginator for {operation_name}")
+        return _Paginator(self)
@@ -0,0 +1,218 @@
+"""
+Benchmark the translation pipeline without AWS.
+
+A synthetic deck is generated (or an existing one is used) and translated once per
+scenario: every combination of engine, batch token budget and input path ('file' reads and
+writes local files, 's3' goes through the in-memory S3 buffers against a local S3
+stand-in). Bedrock is replaced by FakeBedrockRuntime with the requested latency
+distribution and throttling rate. Each scenario runs in a fresh process so that its peak
+RSS is its own.
+
+Example:
+    python translator-app/benchmark/run_benchmark.py --slides 100 --latency-ms 400 \\
+        --engines object,xml --batch-tokens 0,800 --output bench.json
+
+Results are printed as a table and written as JSON: the configuration, the deck and, per
+scenario, wall time, segments, segments per second, model calls, throttled calls, retries,
+tokens and peak RSS.
+"""
+import argparse
+import datetime
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+# Appended rather than prepended: lambda-package vendors platform-specific wheels
+# (lxml, PIL) built for Lambda, so installed packages must take precedence
+sys.path.append(os.path.join(os.path.dirname(BENCHMARK_DIR), "lambda-package"))
+
+from fake_aws import LATENCY_DISTRIBUTIONS, FakeBedrockRuntime, LatencyModel, LocalS3Client
+from synthetic_decks import generate_deck
+
+BENCH_BUCKET = "benchmark"
+
+
+def peak_rss_mb():
+    """Return the peak resident set size of this process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def run_scenario(scenario, deck_path, work_dir, fake_options, verbose=False):
+    """
+    Translate the deck once under one scenario. Runs in its own process.
+
+    Args:
+        scenario (dict): 'engine', 'batch_tokens', 'via', 'streaming' and 'concurrency'.
+        deck_path (str): Deck to translate.
+        work_dir (str): Directory for outputs and the local S3 root.
+        fake_options (dict): FakeBedrockRuntime and LatencyModel settings.
+        verbose (bool): Keep the pipeline's INFO logging.
+
+    Returns:
+        dict: The scenario with its measurements.
+    """
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-2")
+    import main
+    from rate_limiter import AdaptiveRateLimiter
+    # main configures INFO logging on import; job timings have their own logger
+    for name in ("", "translation_timings"):
+        logging.getLogger(name).setLevel(logging.INFO if verbose else logging.WARNING)
+
+    latency = LatencyModel(fake_options["distribution"], fake_options["mean_ms"], fake_options["jitter"],
+                           fake_options["ms_per_output_token"], fake_options["seed"])
+    fake = FakeBedrockRuntime(latency, fake_options["throttle_rate"], fake_options["echo_prefix"],
+                              fake_options["seed"])
+    limiter = AdaptiveRateLimiter()
+    translator = main.BedrockTranslator(
+        max_concurrency=scenario["concurrency"], batch_token_budget=scenario["batch_tokens"],
+        engine=scenario["engine"], rate_limiter=limiter, streaming=scenario["streaming"]
+    )
+    translator.bedrock_runtime = translator.bedrock_stream_runtime = fake
+
+    name = f"{scenario['engine']}-b{scenario['batch_tokens']}-{scenario['via']}"
+    output_path = os.path.join(work_dir, f"{name}.pptx")
+    started = time.perf_counter()
+    if scenario["via"] == "s3":
+        s3 = LocalS3Client(os.path.join(work_dir, "s3"))
+        translator.s3_client = s3
+        s3.upload_file(deck_path, BENCH_BUCKET, "input/deck.pptx")
+        started = time.perf_counter()
+        input_buffer = translator.download_to_buffer(BENCH_BUCKET, "input/deck.pptx")
+        output_buffer = tempfile.SpooledTemporaryFile(max_size=main.DEFAULT_SPOOL_MAX_SIZE)
+        with input_buffer, output_buffer:
+            succeeded = translator.translate_file(input_buffer, output_buffer)
+            succeeded = succeeded and translator.upload_from_buffer(output_buffer, BENCH_BUCKET, f"output/{name}.pptx")
+        output_bytes = os.path.getsize(s3._path(BENCH_BUCKET, f"output/{name}.pptx")) if succeeded else 0
+    else:
+        succeeded = translator.translate_file(deck_path, output_path)
+        output_bytes = os.path.getsize(output_path) if succeeded else 0
+    wall = time.perf_counter() - started
+
+    report = translator.last_report or {}
+    calls = fake.stats()
+    segments = report.get("segments", 0)
+    result = dict(scenario)
+    result.update({
+        "name": name,
+        "succeeded": bool(succeeded),
+        "wall_seconds": round(wall, 3),
+        "segments": segments,
+        "unique_segments": report.get("unique_segments", 0),
+        "failed_segments": report.get("failed_segments", 0),
+        "segments_per_second": round(segments / wall, 1) if wall > 0 else None,
+        "model_calls": calls["calls"],
+        "throttled_calls": calls["throttled"],
+        "retries": limiter.stats()["retried"],
+        "input_tokens": calls["input_tokens"],
+        "output_tokens": calls["output_tokens"],
+        "output_bytes": output_bytes,
+        "peak_rss_mb": peak_rss_mb()
+    })
+    return result
+
+
+def csv_list(value, cast=str):
+    return [cast(item) for item in value.split(",") if item]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the PowerPoint translation pipeline against local AWS stand-ins")
+    parser.add_argument("--deck", help="Existing .pptx to translate instead of a generated one")
+    parser.add_argument("--slides", type=int, default=50, help="Slides in the generated deck")
+    parser.add_argument("--paragraphs", type=int, default=4, help="Bullet paragraphs per generated slide")
+    parser.add_argument("--image-pixels", type=int, default=256, help="Size of generated images (0 for none)")
+    parser.add_argument("--engines", type=csv_list, default=["object", "xml"], help="Comma-separated engines")
+    parser.add_argument("--batch-tokens", type=lambda v: csv_list(v, int), default=[0, 800],
+                        help="Comma-separated batch token budgets (0 disables batching)")
+    parser.add_argument("--via", type=csv_list, default=["file"],
+                        help="Comma-separated input paths: file, s3")
+    parser.add_argument("--stream", action="store_true", help="Use the streaming Converse API")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent model calls per scenario")
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="lognormal",
+                        help="Distribution of fake model latency")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Mean fake model latency")
+    parser.add_argument("--latency-jitter", type=float, default=0.5, help="Spread of the latency distribution")
+    parser.add_argument("--ms-per-token", type=float, default=0.0, help="Extra fake latency per output token")
+    parser.add_argument("--throttle-rate", type=float, default=0.0,
+                        help="Fraction of fake model calls that raise ThrottlingException")
+    parser.add_argument("--echo-prefix", default="", help="Prefix the fake model adds to every translation")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per scenario")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the deck and the fake model")
+    parser.add_argument("--work-dir", help="Directory for decks and outputs (default: a temporary directory)")
+    parser.add_argument("--output", help="Write JSON results to this file ('-' for stdout)")
+    parser.add_argument("--verbose", action="store_true", help="Show pipeline logging")
+    args = parser.parse_args()
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="ppt-bench-")
+    os.makedirs(work_dir, exist_ok=True)
+    if args.deck:
+        deck_path = args.deck
+        deck_info = {"source": args.deck}
+    else:
+        deck_path = os.path.join(work_dir, "synthetic.pptx")
+        deck_info = generate_deck(deck_path, slides=args.slides, paragraphs=args.paragraphs,
+                                  image_every=4 if args.image_pixels else 0,
+                                  image_pixels=args.image_pixels or 1, seed=args.seed)
+    deck_info["bytes"] = os.path.getsize(deck_path)
+
+    fake_options = {
+        "distribution": args.latency_dist,
+        "mean_ms": args.latency_ms,
+        "jitter": args.latency_jitter,
+        "ms_per_output_token": args.ms_per_token,
+        "throttle_rate": args.throttle_rate,
+        "echo_prefix": args.echo_prefix,
+        "seed": args.seed
+    }
+    scenarios = [
+        {"engine": engine, "batch_tokens": batch_tokens, "via": via, "streaming": args.stream,
+         "concurrency": args.concurrency, "run": run}
+        for engine in args.engines for batch_tokens in args.batch_tokens for via in args.via
+        for run in range(args.repeat)
+    ]
+
+    # A fresh interpreter per scenario keeps peak RSS and process-wide state separate
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for scenario in scenarios:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            result = executor.submit(run_scenario, scenario, deck_path, work_dir, fake_options,
+                                     args.verbose).result()
+        results.append(result)
+        print(f"{result['name']:<24} run {result['run']}: {result['wall_seconds']:8.2f}s "
+              f"{result['segments_per_second'] or 0:8.1f} seg/s {result['model_calls']:6d} calls "
+              f"{result['throttled_calls']:4d} throttled {result['peak_rss_mb']:8.1f} MiB peak RSS",
+              file=sys.stderr)
+
+    document = {
+        "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "work_dir")},
+        "deck": deck_info,
+        "results": results
+    }
+    if args.output == "-":
+        json.dump(document, sys.stdout, indent=2)
+        print()
+    elif args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+        print(f"Results written to {args.output}", file=sys.stderr)
+    if not args.work_dir:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Synthetic PowerPoint decks for benchmarking, built with python-pptx.
+
+Decks mix the content the translator has to handle: titles and multi-paragraph bullets
+with mixed run formatting, tables, charts, speaker notes, repeated footer text and
+incompressible images that make the package large without adding text.
+"""
+import random
+import struct
+import zlib
+from io import BytesIO
+
+from pptx import Presentation
+from pptx.chart.data import CategoryChartData
+from pptx.enum.chart import XL_CHART_TYPE
+from pptx.util import Inches, Pt
+
+_WORDS = (
+    "revenue growth quarter customer platform adoption margin pipeline forecast region "
+    "strategy market launch partner retention pricing roadmap service latency capacity "
+    "quality release feature team hiring budget risk milestone segment channel product"
+).split()
+
+FOOTER_TEXT = "Confidential - for internal use only"
+
+
+def _sentence(rng, words=12):
+    text = " ".join(rng.choice(_WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def _png(width, height, rng):
+    """Return an RGB PNG of random pixels (incompressible, so it keeps its size in the zip)."""
+    raw = b"".join(b"\x00" + rng.randbytes(width * 3) for _ in range(height))
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) +
+            chunk(b"IDAT", zlib.compress(raw, 1)) + chunk(b"IEND", b""))
+
+
+def generate_deck(path, slides=50, paragraphs=4, table_every=5, chart_every=10,
+                  image_every=4, image_pixels=256, notes=True, seed=0):
+    """
+    Generate a synthetic deck.
+
+    Args:
+        path (str or file-like): Where to save the deck.
+        slides (int): Number of slides.
+        paragraphs (int): Bullet paragraphs per slide.
+        table_every (int): Add a 4x3 table to every n-th slide (0 for none).
+        chart_every (int): Add a bar chart to every n-th slide (0 for none).
+        image_every (int): Add an image to every n-th slide (0 for none).
+        image_pixels (int): Width and height of each image.
+        notes (bool): Whether slides get speaker notes.
+        seed (int): Random seed; the same arguments and seed give the same text.
+
+    Returns:
+        dict: Counts of slides, tables, charts and images in the deck.
+    """
+    rng = random.Random(seed)
+    prs = Presentation()
+    counts = {"slides": slides, "tables": 0, "charts": 0, "images": 0}
+    for index in range(slides):
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = f"{rng.choice(_WORDS).title()} update {index + 1}"
+
+        body = slide.placeholders[1].text_frame
+        body.text = _sentence(rng)
+        for _ in range(paragraphs - 1):
+            paragraph = body.add_paragraph()
+            lead = paragraph.add_run()
+            lead.text = rng.choice(_WORDS).title() + ": "
+            lead.font.bold = True
+            rest = paragraph.add_run()
+            rest.text = _sentence(rng, rng.randint(6, 18))
+
+        footer = slide.shapes.add_textbox(Inches(0.5), Inches(7), Inches(6), Inches(0.4)).text_frame
+        footer.text = FOOTER_TEXT
+        footer.paragraphs[0].runs[0].font.size = Pt(9)
+
+        if table_every and index % table_every == 0:
+            table = slide.shapes.add_table(4, 3, Inches(5.5), Inches(1.5), Inches(4), Inches(2)).table
+            for col, header in enumerate(("Metric", "Current", "Target")):
+                table.cell(0, col).text = header
+            for row in range(1, 4):
+                table.cell(row, 0).text = rng.choice(_WORDS).title()
+                table.cell(row, 1).text = f"{rng.randint(1, 99)}%"
+                table.cell(row, 2).text = f"{rng.randint(1, 99)}%"
+            counts["tables"] += 1
+
+        if chart_every and index % chart_every == 0:
+            data = CategoryChartData()
+            data.categories = [rng.choice(_WORDS).title() for _ in range(4)]
+            data.add_series("Actual", [rng.randint(1, 100) for _ in range(4)])
+            data.add_series("Plan", [rng.randint(1, 100) for _ in range(4)])
+            slide.shapes.add_chart(XL_CHART_TYPE.COLUMN_CLUSTERED, Inches(5.5), Inches(4),
+                                   Inches(4), Inches(2.5), data)
+            counts["charts"] += 1
+
+        if image_every and index % image_every == 0:
+            slide.shapes.add_picture(BytesIO(_png(image_pixels, image_pixels, rng)),
+                                     Inches(8), Inches(0.3), Inches(1.5), Inches(1.5))
+            counts["images"] += 1
+
+        if notes:
+            slide.notes_slide.notes_text_frame.text = "\n".join(_sentence(rng, 20) for _ in range(3))
+
+    prs.save(path)
+    return counts
@@ -2,25 +2,166 @@ import logging
 import json
 import traceback
 import os
+import random
+import threading
+import contextvars
 import boto3
 import datetime
+from contextlib import contextmanager
+
+# Line format of LOG_FORMAT=text; context and structured fields follow the message as JSON
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Fraction of sampled (per-item) records kept per level, unless LOG_SAMPLE_RATE_<LEVEL>
+# says otherwise; warnings and errors are always kept
+DEFAULT_SAMPLE_RATES = {logging.DEBUG: 0.01, logging.INFO: 0.1}
+
+# SDK loggers that stay at INFO or above when LOG_LEVEL=DEBUG
+QUIET_LOGGERS = ('boto3', 'botocore', 's3transfer', 'urllib3')
+
+# Request-scoped fields (jobId, slide, ...) attached to every record
+_log_context = contextvars.ContextVar('log_context', default={})
+
+_configure_lock = threading.Lock()
+_configured = False
+_sample_rates = dict(DEFAULT_SAMPLE_RATES)
+_sample_random = random.Random()
+
+class JsonFormatter(logging.Formatter):
+    """Format each record as one JSON object with its context and structured fields."""
+    
+    def format(self, record):
+        document = {
+            'timestamp': datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        document.update(getattr(record, 'context', None) or {})
+        document.update(getattr(record, 'fields', None) or {})
+        if record.exc_info:
+            document['exception'] = self.formatException(record.exc_info)
+        return json.dumps(document, ensure_ascii=False, default=str)
+
+class TextFormatter(logging.Formatter):
+    """The classic line format, followed by context and structured fields as JSON."""
+    
+    def format(self, record):
+        line = super().format(record)
+        extra = dict(getattr(record, 'context', None) or {})
+        extra.update(getattr(record, 'fields', None) or {})
+        if extra:
+            line = f"{line} {json.dumps(extra, ensure_ascii=False, default=str)}"
+        return line
+
+class ContextFilter(logging.Filter):
+    """Attach the current log_context() fields to every record."""
+    
+    def filter(self, record):
+        record.context = _log_context.get()
+        return True
+
+class LazyJson:
+    """Defer json.dumps of a value until a record using it is actually formatted."""
+    
+    def __init__(self, value):
+        self.value = value
+    
+    def __str__(self):
+        return json.dumps(self.value, default=str)
 
 def setup_logger(name):
-    """Configure a logger with consistent formatting and appropriate level"""
+    """
+    Return a logger, configuring process-wide logging on first use.
+    
+    This is the single configuration point for every handler and module. The root logger
+    gets one stream handler, replacing any installed by the runtime, so records are never
+    printed twice. LOG_LEVEL sets the level, LOG_FORMAT picks 'json' (one JSON object per
+    record, the default on Lambda) or 'text', and LOG_SAMPLE_RATE_DEBUG and
+    LOG_SAMPLE_RATE_INFO set the fraction of log_sampled() records kept.
+    
+    Args:
+        name (str): Logger name, usually __name__.
+        
+    Returns:
+        logging.Logger: The named logger; it propagates to the configured root logger.
+    """
+    global _configured
+    if not _configured:
+        with _configure_lock:
+            if not _configured:
+                configure_logging()
+                _configured = True
+    return logging.getLogger(name)
+
+def configure_logging():
+    """Install the root handler, level and sample rates from the environment."""
     log_level = os.environ.get('LOG_LEVEL', 'INFO')
     numeric_level = getattr(logging, log_level.upper(), logging.INFO)
+    default_format = 'json' if os.environ.get('AWS_LAMBDA_FUNCTION_NAME') else 'text'
+    log_format = os.environ.get('LOG_FORMAT', default_format).lower()
     
-    logger = logging.getLogger(name)
-    logger.setLevel(numeric_level)
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter() if log_format == 'json' else TextFormatter(TEXT_FORMAT))
+    handler.addFilter(ContextFilter())
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(numeric_level)
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(max(numeric_level, logging.INFO))
     
-    # Add consistent formatting
-    if not logger.handlers:
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
+    for level in DEFAULT_SAMPLE_RATES:
+        value = os.environ.get(f'LOG_SAMPLE_RATE_{logging.getLevelName(level)}')
+        if value is not None:
+            _sample_rates[level] = min(1.0, max(0.0, float(value)))
+
+@contextmanager
+def log_context(**fields):
+    """
+    Attach fields (e.g. jobId, slide) to every record logged inside the block.
+    
+    Context follows the current thread and task; use bind_context() to carry it into
+    executor threads.
+    """
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+def bind_context(function):
+    """Wrap `function` so that it runs with a copy of the current log context."""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(function, *args, **kwargs)
+
+def log_sampled(logger, level, msg, *args, **kwargs):
+    """
+    Log a per-item message (per segment, per call), keeping only a sample of them.
+    
+    Levels in DEFAULT_SAMPLE_RATES are kept with their configured probability; other
+    levels are always logged. Nothing is formatted for records that are dropped.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    rate = _sample_rates.get(level, 1.0)
+    if rate < 1.0 and _sample_random.random() >= rate:
+        return
+    logger.log(level, msg, *args, **kwargs)
+
+def log_phase(logger, phase, level=logging.INFO, **fields):
+    """
+    Log one structured record summarizing a phase of work.
     
-    return logger
+    Args:
+        logger (logging.Logger): Logger to use.
+        phase (str): Phase name, also used as the message.
+        level (int): Log level, default INFO.
+        **fields: Structured fields; they become JSON keys of the record.
+    """
+    if logger.isEnabledFor(level):
+        logger.log(level, phase, extra={'fields': dict(fields, phase=phase)})
 
 def log_event(event, context=None, logger=None):
     """Log incoming event with sensitive data redacted"""
@@ -31,14 +172,17 @@ def log_event(event, context=None, logger=None):
     
     # Redact sensitive information if present
     if 'headers' in event_copy and event_copy['headers']:
+        event_copy['headers'] = dict(event_copy['headers'])
         if 'Authorization' in event_copy['headers']:
             event_copy['headers']['Authorization'] = '[REDACTED]'
     
-    logger.info(f"Event received: {json.dumps(event_copy)}")
+    # The request line is always logged; the full event is only serialized at DEBUG
+    fields = {'method': event_copy.get('httpMethod'), 'path': event_copy.get('path')}
     if context:
-        logger.info(f"Context: RequestId: {context.aws_request_id}, "
-                   f"Function: {context.function_name}, "
-                   f"Remaining time: {context.get_remaining_time_in_millis()}ms")
+        fields.update(requestId=context.aws_request_id, function=context.function_name,
+                      remainingMs=context.get_remaining_time_in_millis())
+    log_phase(logger, 'request', **fields)
+    logger.debug("Event received: %s", LazyJson(event_copy))
     
     return event_copy
 
@@ -86,6 +230,7 @@ def handle_debug_request(event, cors_headers, logger=None):
                     'original_bucket': os.environ.get('ORIGINAL_BUCKET', 'unknown'),
                     'translated_bucket': os.environ.get('TRANSLATED_BUCKET', 'unknown'),
                     'translation_lambda': os.environ.get('TRANSLATION_LAMBDA_NAME', 'unknown'),
+                    'job_table': os.environ.get('JOB_TABLE_NAME', 'unknown'),
                     'timestamp': datetime.datetime.now().isoformat()
                 })
             }
@@ -0,0 +1,193 @@
+import datetime
+import json
+import os
+import sqlite3
+import threading
+from decimal import Decimal
+
+import boto3
+
+from debug_utils import setup_logger
+
+logger = setup_logger(__name__)
+
+# Job lifecycle states, as understood by the web UI
+JOB_PENDING = 'pending'
+JOB_PROCESSING = 'processing'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+
+
+class JobStoreNotConfigured(Exception):
+    """Raised on Lambda when neither JOB_TABLE_NAME nor JOB_STORE_PATH is set."""
+
+
+def _now():
+    return datetime.datetime.now().isoformat()
+
+
+class InMemoryJobStore:
+    """Job records in a process-local dict, for local runs and tests."""
+
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def get(self, job_id):
+        with self._lock:
+            record = self._jobs.get(job_id)
+            return dict(record) if record is not None else None
+
+    def put(self, job_id, record):
+        with self._lock:
+            self._jobs[job_id] = dict(record)
+
+    def update(self, job_id, fields):
+        with self._lock:
+            self._jobs.setdefault(job_id, {'jobId': job_id}).update(fields)
+
+
+class SQLiteJobStore:
+    """Job records in a local SQLite file, one JSON document per job."""
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, record TEXT NOT NULL)")
+        self._conn.commit()
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT record FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, job_id, record):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO jobs (job_id, record) VALUES (?, ?)",
+                               (job_id, json.dumps(record)))
+            self._conn.commit()
+
+    def update(self, job_id, fields):
+        with self._lock:
+            row = self._conn.execute("SELECT record FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            record = json.loads(row[0]) if row else {'jobId': job_id}
+            record.update(fields)
+            self._conn.execute("INSERT OR REPLACE INTO jobs (job_id, record) VALUES (?, ?)",
+                               (job_id, json.dumps(record)))
+            self._conn.commit()
+
+
+class DynamoDBJobStore:
+    """
+    Job records in a DynamoDB table with a string partition key named 'jobId'.
+
+    Reads are single GetItem calls and updates only send the changed attributes.
+    """
+
+    def __init__(self, table_name, region_name=None):
+        self.table = boto3.resource('dynamodb', region_name=region_name).Table(table_name)
+
+    def get(self, job_id):
+        item = self.table.get_item(Key={'jobId': job_id}).get('Item')
+        return _from_dynamodb(item) if item is not None else None
+
+    def put(self, job_id, record):
+        self.table.put_item(Item=_to_dynamodb(dict(record, jobId=job_id)))
+
+    def update(self, job_id, fields):
+        fields = {key: value for key, value in fields.items() if key != 'jobId'}
+        if not fields:
+            return
+        names = {f'#f{i}': key for i, key in enumerate(fields)}
+        values = {f':v{i}': _to_dynamodb(value) for i, value in enumerate(fields.values())}
+        self.table.update_item(
+            Key={'jobId': job_id},
+            UpdateExpression='SET ' + ', '.join(f'#f{i} = :v{i}' for i in range(len(fields))),
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values
+        )
+
+
+def _to_dynamodb(value):
+    """Convert floats (recursively) to Decimal, which is what DynamoDB accepts."""
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {key: _to_dynamodb(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_to_dynamodb(item) for item in value]
+    return value
+
+
+def _from_dynamodb(value):
+    """Convert Decimal values (recursively) back to int or float."""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, dict):
+        return {key: _from_dynamodb(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_from_dynamodb(item) for item in value]
+    return value
+
+
+class JobTracker:
+    """Reads and writes translation job records on top of a job store backend."""
+
+    def __init__(self, store):
+        self.store = store
+
+    def create(self, job_id, **fields):
+        """Create a pending job record."""
+        now = _now()
+        record = {'jobId': job_id, 'status': JOB_PENDING, 'progress': 0, 'createdAt': now, 'updatedAt': now}
+        record.update(fields)
+        self.store.put(job_id, record)
+        return record
+
+    def update(self, job_id, **fields):
+        """Merge `fields` into the job record."""
+        fields['updatedAt'] = _now()
+        self.store.update(job_id, fields)
+
+    def get(self, job_id):
+        """Return the job record, or None if the job is unknown."""
+        return self.store.get(job_id)
+
+
+_environment_tracker = None
+_environment_tracker_lock = threading.Lock()
+
+
+def tracker_from_environment():
+    """
+    Return the process-wide JobTracker configured from environment variables.
+
+    JOB_TABLE_NAME selects a DynamoDB table, which is what the API and translation
+    Lambdas must share in a deployment. JOB_STORE_PATH selects a local SQLite file;
+    otherwise records live in memory for the lifetime of the process, which is only
+    allowed outside Lambda: separate functions would never see each other's records.
+
+    Raises:
+        JobStoreNotConfigured: On Lambda, if neither variable is set.
+    """
+    global _environment_tracker
+    with _environment_tracker_lock:
+        if _environment_tracker is None:
+            table_name = os.environ.get('JOB_TABLE_NAME')
+            store_path = os.environ.get('JOB_STORE_PATH')
+            if table_name:
+                store = DynamoDBJobStore(table_name)
+            elif store_path:
+                store = SQLiteJobStore(store_path)
+            elif os.environ.get('AWS_LAMBDA_FUNCTION_NAME'):
+                message = ("No job store configured: set JOB_TABLE_NAME to the DynamoDB table "
+                           "shared by the API and translation Lambdas")
+                logger.error(message)
+                raise JobStoreNotConfigured(message)
+            else:
+                store = InMemoryJobStore()
+            _environment_tracker = JobTracker(store)
+        return _environment_tracker
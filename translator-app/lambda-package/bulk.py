@@ -0,0 +1,576 @@
+"""
+Bulk translation of many decks through Bedrock batch inference.
+
+A bulk run has three stages, all recorded in a manifest in the work directory:
+
+1. extract: every deck under a directory or S3 prefix is opened and its segments are
+   collected with the same traversal as BedrockTranslator.translate_file. Texts are
+   deduplicated across all decks, translation memory hits are filled in, and long texts
+   are split into chunks. Each remaining chunk becomes one record of a JSONL
+   batch-inference input file.
+2. submit and poll: the input files are handed to a backend. BedrockBatchBackend runs
+   them as Bedrock model invocation jobs. LocalBatchBackend is a file-based stand-in that
+   answers every record through the synchronous translator.
+3. merge: the job outputs are read back, chunks are reassembled, and every deck is
+   reopened and written through its segment locators.
+
+Throughput is bounded by batch job capacity rather than per-request latency. Records
+missing from the job output are translated synchronously during the merge. Runs can be
+resumed: a work directory whose manifest already lists submitted jobs skips straight to
+polling.
+"""
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from aws_clients import get_client
+from debug_utils import log_phase, setup_logger
+from text_chunker import join_chunks, split_text
+from translation_memory import normalize_text
+from xml_engine import text_parts
+
+logger = setup_logger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+# Bedrock batch inference job limits: smaller inputs are rejected, larger ones are split
+MIN_RECORDS_PER_JOB = 100
+MAX_RECORDS_PER_JOB = 50000
+
+DEFAULT_POLL_SECONDS = 60
+
+# Anthropic Messages API version expected in batch inference records
+ANTHROPIC_VERSION = "bedrock-2023-05-31"
+
+# Job states after which the job produces no more output
+TERMINAL_STATES = frozenset(("Completed", "PartiallyCompleted", "Failed", "Stopped", "Expired"))
+
+
+def split_s3_uri(uri):
+    """
+    Split an s3://bucket/prefix URI.
+
+    Returns:
+        tuple: (bucket, key or prefix), or None if `uri` is not an S3 URI.
+    """
+    if not uri.startswith("s3://"):
+        return None
+    bucket, _, key = uri[len("s3://"):].partition("/")
+    return bucket, key
+
+
+def list_decks(source, s3_client=None):
+    """
+    List the .pptx files under a local directory or S3 prefix.
+
+    Args:
+        source (str): Directory path or s3://bucket/prefix URI.
+        s3_client: S3 client used for S3 prefixes.
+
+    Returns:
+        list: (location, relative path, fingerprint) tuples in sorted order; location is a
+            local path or an s3:// URI, and fingerprint changes when the file does (size and
+            modification time, or the S3 ETag).
+    """
+    s3_location = split_s3_uri(source)
+    decks = []
+    if s3_location is None:
+        for root, _, files in os.walk(source):
+            for name in files:
+                if name.lower().endswith(".pptx") and not name.startswith("~$"):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    decks.append((path, os.path.relpath(path, source), f"{stat.st_size}:{stat.st_mtime_ns}"))
+    else:
+        bucket, prefix = s3_location
+        paginator = s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            for item in page.get("Contents", []):
+                if item["Key"].lower().endswith(".pptx"):
+                    relative = item["Key"][len(prefix):].lstrip("/")
+                    decks.append((f"s3://{bucket}/{item['Key']}", relative, item["ETag"].strip('"')))
+    return sorted(decks, key=lambda deck: deck[1])
+
+
+def batch_record(record_id, prompt, max_tokens, temperature, top_p):
+    """
+    Build one batch inference input record in the Anthropic Messages format.
+
+    Args:
+        record_id (str): Record ID, echoed back in the job output.
+        prompt (str): User prompt.
+        max_tokens (int): Maximum tokens for the response.
+        temperature (float): Temperature for model creativity.
+        top_p (float): Top P for nucleus sampling.
+
+    Returns:
+        dict: The record.
+    """
+    return {
+        "recordId": record_id,
+        "modelInput": {
+            "anthropic_version": ANTHROPIC_VERSION,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "top_p": top_p,
+            "messages": [{"role": "user", "content": [{"type": "text", "text": prompt}]}]
+        }
+    }
+
+
+def read_batch_output(path):
+    """
+    Read a batch inference output file.
+
+    Args:
+        path (str): JSONL output file.
+
+    Returns:
+        tuple: (translations, tokens) where translations maps record ID to response text
+            for every record that succeeded, and tokens is the total token usage reported.
+    """
+    translations = {}
+    tokens = 0
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                output = record.get("modelOutput")
+                if not output or "error" in record:
+                    logger.warning(f"Batch record {record.get('recordId')} failed: {record.get('error')}")
+                    continue
+                translations[record["recordId"]] = output["content"][0]["text"]
+                usage = output.get("usage", {})
+                tokens += usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                logger.warning(f"Skipping malformed batch output line: {e}")
+    return translations, tokens
+
+
+class LocalBatchBackend:
+    """
+    File-based stand-in for Bedrock batch inference.
+
+    submit() answers every record right away through the translator's synchronous model
+    calls and writes the output next to the input in the batch output format, so bulk
+    runs can be tested end to end without batch inference access.
+    """
+
+    def __init__(self, translator):
+        self.translator = translator
+
+    def submit(self, input_path, job_name):
+        """
+        Process a batch input file.
+
+        Args:
+            input_path (str): JSONL input file.
+            job_name (str): Job name.
+
+        Returns:
+            dict: JSON-serializable job handle.
+        """
+        with open(input_path, "r", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+
+        def answer(record):
+            model_input = record["modelInput"]
+            try:
+                text = self.translator.invoke_model(
+                    model_input["messages"][0]["content"][0]["text"], False,
+                    model_input["temperature"], model_input["max_tokens"], model_input["top_p"]
+                )
+            except Exception as e:
+                return {"recordId": record["recordId"], "error": {"errorMessage": str(e)}}
+            # Usage is already counted by the synchronous call
+            return {"recordId": record["recordId"], "modelOutput": {"content": [{"type": "text", "text": text}]}}
+
+        output_path = input_path + ".out"
+        with ThreadPoolExecutor(max_workers=self.translator.max_concurrency) as executor:
+            results = list(executor.map(answer, records))
+        with open(output_path, "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(result, ensure_ascii=False) + "\n")
+        return {"backend": "local", "name": job_name, "output_path": output_path}
+
+    def status(self, job):
+        """Return the job state; local jobs complete during submit()."""
+        return "Completed"
+
+    def fetch(self, job, local_path):
+        """
+        Make the job output available locally.
+
+        Returns:
+            bool: True if the output exists at `local_path`.
+        """
+        if job["output_path"] != local_path:
+            os.replace(job["output_path"], local_path)
+            job["output_path"] = local_path
+        return os.path.exists(local_path)
+
+
+class BedrockBatchBackend:
+    """Runs batch input files as Bedrock model invocation jobs, staged under an S3 prefix."""
+
+    def __init__(self, s3_uri, role_arn, model_id, region_name=None):
+        """
+        Args:
+            s3_uri (str): s3://bucket/prefix under which inputs and outputs are staged.
+            role_arn (str): IAM role Bedrock assumes to read and write the staging prefix.
+            model_id (str): Model to run.
+            region_name (str): AWS region.
+        """
+        location = split_s3_uri(s3_uri)
+        if location is None:
+            raise ValueError(f"Batch staging location must be an s3:// URI: {s3_uri}")
+        self.bucket, prefix = location
+        self.prefix = prefix.rstrip("/")
+        self.role_arn = role_arn
+        self.model_id = model_id
+        self.bedrock = get_client("bedrock", region_name)
+        self.s3_client = get_client("s3", region_name)
+
+    def submit(self, input_path, job_name):
+        """
+        Upload a batch input file and start a model invocation job on it.
+
+        Returns:
+            dict: JSON-serializable job handle.
+        """
+        input_key = f"{self.prefix}/input/{job_name}.jsonl".lstrip("/")
+        output_prefix = f"{self.prefix}/output/".lstrip("/")
+        self.s3_client.upload_file(input_path, self.bucket, input_key)
+        response = self.bedrock.create_model_invocation_job(
+            jobName=job_name,
+            roleArn=self.role_arn,
+            modelId=self.model_id,
+            inputDataConfig={"s3InputDataConfig": {"s3Uri": f"s3://{self.bucket}/{input_key}"}},
+            outputDataConfig={"s3OutputDataConfig": {"s3Uri": f"s3://{self.bucket}/{output_prefix}"}}
+        )
+        job_arn = response["jobArn"]
+        logger.info(f"Submitted batch inference job {job_arn}")
+        # Output is written as <output prefix>/<job ID>/<input file name>.out
+        output_key = f"{output_prefix}{job_arn.rsplit('/', 1)[-1]}/{job_name}.jsonl.out"
+        return {"backend": "bedrock", "name": job_name, "job_arn": job_arn, "output_key": output_key}
+
+    def status(self, job):
+        """Return the Bedrock job state, e.g. 'InProgress' or 'Completed'."""
+        response = self.bedrock.get_model_invocation_job(jobIdentifier=job["job_arn"])
+        if response.get("message"):
+            logger.info(f"Batch job {job['name']}: {response['status']} ({response['message']})")
+        return response["status"]
+
+    def fetch(self, job, local_path):
+        """
+        Download the job output.
+
+        Returns:
+            bool: True if the output was downloaded to `local_path`.
+        """
+        try:
+            self.s3_client.download_file(self.bucket, job["output_key"], local_path)
+            return True
+        except Exception as e:
+            logger.error(f"Could not download output of batch job {job['name']}: {e}")
+            return False
+
+
+class BulkTranslation:
+    """
+    A resumable bulk translation run rooted in a work directory.
+
+    The translator provides segment collection, prompts, output sizing, the translation
+    memory and synchronous fallback translation; the backend runs the batch jobs.
+    """
+
+    def __init__(self, translator, backend, work_dir, source_language="auto (en-US)",
+                 target_language="zh-TW", use_reasoning=False, temperature=0.7,
+                 max_tokens=3000, top_p=0.9, engine="xml", poll_seconds=DEFAULT_POLL_SECONDS):
+        self.translator = translator
+        self.backend = backend
+        self.work_dir = work_dir
+        self.source_language = source_language
+        self.target_language = target_language
+        self.use_reasoning = use_reasoning
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.top_p = top_p
+        self.engine = engine
+        self.poll_seconds = poll_seconds
+        self.manifest_path = os.path.join(work_dir, MANIFEST_NAME)
+        os.makedirs(work_dir, exist_ok=True)
+
+    def run(self, source, destination):
+        """
+        Translate every deck under `source` into `destination`.
+
+        Args:
+            source (str): Directory or s3://bucket/prefix holding the decks.
+            destination (str): Directory or s3://bucket/prefix receiving the translated
+                decks, under the same relative paths.
+
+        Returns:
+            dict: Report of the run.
+        """
+        manifest = self.load_manifest()
+        if manifest is None:
+            manifest = self.extract(source)
+        else:
+            logger.info(f"Resuming bulk run with {len(manifest['jobs'])} of "
+                        f"{len(manifest['inputs'])} inputs submitted")
+        self.submit(manifest)
+        self.wait(manifest)
+        return self.merge(manifest, destination)
+
+    def load_manifest(self):
+        """Return the manifest saved in the work directory, or None."""
+        if not os.path.exists(self.manifest_path):
+            return None
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_manifest(self, manifest):
+        """Write the manifest atomically."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.work_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    def extract(self, source):
+        """
+        Collect the segments of every deck and write the batch input files.
+
+        Args:
+            source (str): Directory or s3://bucket/prefix holding the decks.
+
+        Returns:
+            dict: The manifest.
+        """
+        decks_dir = os.path.join(self.work_dir, "decks")
+        texts = []
+        index_by_text = {}
+        decks = []
+        for location, relative, _ in list_decks(source, self.translator.s3_client):
+            local_path = location
+            s3_location = split_s3_uri(location)
+            if s3_location is not None:
+                local_path = os.path.join(decks_dir, relative)
+                os.makedirs(os.path.dirname(local_path), exist_ok=True)
+                if not self.translator.download_from_s3(*s3_location, local_path):
+                    continue
+            try:
+                package = self.translator.open_package(local_path, self.engine)
+                segments = self.translator.collect_segments(package, text_parts(package))
+            except Exception as e:
+                logger.error(f"Skipping {location}: {e}")
+                continue
+            locators = {}
+            for segment in segments:
+                key = normalize_text(segment['text'])
+                if key not in index_by_text:
+                    index_by_text[key] = len(texts)
+                    texts.append(segment['text'])
+                locators[segment['locator']] = index_by_text[key]
+            decks.append({"source": location, "local_path": local_path, "relative": relative,
+                          "segments": locators})
+        logger.info(f"Collected {sum(len(deck['segments']) for deck in decks)} segments "
+                    f"({len(texts)} unique) from {len(decks)} decks")
+
+        translations = {}
+        chunks = {}
+        records = {}
+        lines = []
+        chunk_budget = self.translator.chunk_budget(self.use_reasoning, self.max_tokens)
+        for i, text in enumerate(texts):
+            cached = self.translator.memory_get(text, self.source_language, self.target_language,
+                                                self.use_reasoning)
+            if cached is not None:
+                translations[str(i)] = cached
+                continue
+            chunks[str(i)] = split_text(text, chunk_budget)
+            for c, (chunk, _) in enumerate(chunks[str(i)]):
+                record_id = f"r{len(records):07d}"
+                records[record_id] = [i, c]
+                prompt = self.translator.translation_prompt(chunk, self.source_language,
+                                                            self.target_language, self.use_reasoning)
+                max_tokens = self.translator.output_token_limit([chunk], False, self.max_tokens)
+                lines.append(json.dumps(batch_record(record_id, prompt, max_tokens, self.temperature,
+                                                     self.top_p), ensure_ascii=False))
+
+        inputs = []
+        for start in range(0, len(lines), MAX_RECORDS_PER_JOB):
+            input_path = os.path.join(self.work_dir, f"input-{len(inputs):03d}.jsonl")
+            with open(input_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines[start:start + MAX_RECORDS_PER_JOB]) + "\n")
+            inputs.append(input_path)
+
+        manifest = {
+            "source_language": self.source_language,
+            "target_language": self.target_language,
+            "use_reasoning": self.use_reasoning,
+            "decks": decks,
+            "texts": texts,
+            "translations": translations,
+            "chunks": chunks,
+            "records": records,
+            "inputs": inputs,
+            "jobs": []
+        }
+        self.save_manifest(manifest)
+        logger.info(f"Wrote {len(records)} batch records to {len(inputs)} input files "
+                    f"({len(translations)} texts from translation memory)")
+        return manifest
+
+    def submit(self, manifest):
+        """
+        Submit every batch input file that has no job yet to the backend.
+
+        Inputs smaller than the batch inference minimum are answered through the
+        synchronous translator instead. Called again on a resumed run, it submits the
+        inputs an interrupted run did not get to.
+        """
+        run_id = time.strftime("%Y%m%d-%H%M%S")
+        # Jobs are appended in input order; older manifests do not name their input
+        submitted = {job.get("input_path", manifest["inputs"][n]) for n, job in enumerate(manifest["jobs"])}
+        for n, input_path in enumerate(manifest["inputs"]):
+            if input_path in submitted:
+                continue
+            with open(input_path, "r", encoding="utf-8") as f:
+                record_count = sum(1 for line in f if line.strip())
+            backend = self.backend
+            if record_count < MIN_RECORDS_PER_JOB and not isinstance(backend, LocalBatchBackend):
+                logger.info(f"{input_path} has {record_count} records, below the batch minimum; "
+                            f"translating synchronously")
+                backend = LocalBatchBackend(self.translator)
+            job = backend.submit(input_path, f"ppt-translate-{run_id}-{n:03d}")
+            job["input_path"] = input_path
+            job["output_path"] = input_path + ".out"
+            manifest["jobs"].append(job)
+            self.save_manifest(manifest)
+
+    def wait(self, manifest):
+        """Poll the backend until every job reaches a terminal state."""
+        pending = [job for job in manifest["jobs"] if job.get("state") not in TERMINAL_STATES]
+        while pending:
+            for job in pending:
+                job["state"] = self.backend_for(job).status(job)
+            self.save_manifest(manifest)
+            pending = [job for job in pending if job["state"] not in TERMINAL_STATES]
+            if pending:
+                logger.info(f"Waiting for {len(pending)} batch jobs: "
+                            f"{', '.join(job['name'] + ' ' + job['state'] for job in pending)}")
+                time.sleep(self.poll_seconds)
+
+    def backend_for(self, job):
+        """Return the backend that ran `job`."""
+        if job["backend"] == "local" and not isinstance(self.backend, LocalBatchBackend):
+            return LocalBatchBackend(self.translator)
+        return self.backend
+
+    def merge(self, manifest, destination):
+        """
+        Read the job outputs and write the translated decks.
+
+        Args:
+            manifest (dict): The manifest.
+            destination (str): Directory or s3://bucket/prefix for the translated decks.
+
+        Returns:
+            dict: Report of the run.
+        """
+        outputs = {}
+        tokens = 0
+        for job in manifest["jobs"]:
+            if job["state"] != "Completed":
+                logger.warning(f"Batch job {job['name']} ended as {job['state']}")
+            if self.backend_for(job).fetch(job, job["output_path"]):
+                job_outputs, job_tokens = read_batch_output(job["output_path"])
+                outputs.update(job_outputs)
+                tokens += job_tokens
+        self.translator.add_usage(tokens)
+
+        texts = manifest["texts"]
+        translations = {int(i): text for i, text in manifest["translations"].items()}
+        chunk_translations = {int(i): [None] * len(chunks) for i, chunks in manifest["chunks"].items()}
+        for record_id, (i, c) in manifest["records"].items():
+            chunk_translations[i][c] = outputs.get(record_id)
+        missing = []
+        for i, parts in chunk_translations.items():
+            if None in parts:
+                missing.append(i)
+                continue
+            translations[i] = join_chunks(manifest["chunks"][str(i)], parts)
+            self.translator.memory_put(texts[i], self.source_language, self.target_language,
+                                       self.use_reasoning, translations[i])
+
+        if missing:
+            logger.warning(f"{len(missing)} texts missing from batch output; translating synchronously")
+            retried = self.translator.translate_segments(
+                [texts[i] for i in missing], self.source_language, self.target_language,
+                self.use_reasoning, self.temperature, self.max_tokens, self.top_p,
+                desc="Retrying batch failures"
+            )
+            for i, translated in zip(missing, retried):
+                if translated is not None:
+                    translations[i] = translated
+
+        report = {
+            "decks": len(manifest["decks"]),
+            "decks_written": 0,
+            "segments": 0,
+            "unique_segments": len(texts),
+            "batch_records": len(manifest["records"]),
+            "batch_jobs": len(manifest["jobs"]),
+            "retried_synchronously": len(missing),
+            "failed_segments": 0,
+            "tokens_used": tokens
+        }
+        for deck in manifest["decks"]:
+            failed = self.write_deck(deck, translations, destination)
+            if failed is None:
+                continue
+            report["decks_written"] += 1
+            report["segments"] += len(deck["segments"])
+            report["failed_segments"] += failed
+        log_phase(logger, "bulk_report", **report)
+        return report
+
+    def write_deck(self, deck, translations, destination):
+        """
+        Write translations into one deck through its segment locators.
+
+        Returns:
+            int: Number of segments left untranslated, or None if the deck was not written.
+        """
+        try:
+            package = self.translator.open_package(deck["local_path"], self.engine)
+            segments = self.translator.collect_segments(package, text_parts(package))
+            failed = 0
+            for segment in segments:
+                translated_text = translations.get(deck["segments"].get(segment['locator']))
+                if translated_text is None or not self.translator.write_segment(package, segment, translated_text):
+                    failed += 1
+
+            s3_location = split_s3_uri(destination)
+            if s3_location is None:
+                output_path = os.path.join(destination, deck["relative"])
+            else:
+                output_path = os.path.join(self.work_dir, "output", deck["relative"])
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            package.save(output_path)
+            if s3_location is not None:
+                bucket, prefix = s3_location
+                key = f"{prefix.rstrip('/')}/{deck['relative']}".lstrip("/")
+                if not self.translator.upload_to_s3(output_path, bucket, key):
+                    return None
+            if failed:
+                logger.warning(f"{failed}/{len(segments)} segments of {deck['source']} left untranslated")
+            return failed
+        except Exception as e:
+            logger.error(f"Failed to write {deck['source']}: {e}")
+            return None
@@ -0,0 +1,340 @@
+"""
+Lazy loading of .pptx packages.
+
+python-pptx's zip reader decompresses every member of the package into memory when a
+presentation is opened, including embedded videos and images that translation never
+touches. The reader here keeps only the zip central directory in memory and decompresses
+a member when its part is accessed. Binary parts are loaded as lazy handles and stay that
+way unless their blob is replaced.
+
+Saving streams parts that were not modified byte-for-byte from the source archive,
+reusing their compressed data and CRC, so only the XML parts that were edited are
+serialized and deflated again.
+"""
+import os
+import struct
+import zipfile
+
+from pptx.opc.constants import CONTENT_TYPE as CT
+from pptx.opc.oxml import serialize_part_xml
+from pptx.opc.package import XmlPart, PartFactory, _PackageLoader
+from pptx.opc.packuri import PACKAGE_URI, PackURI
+from pptx.opc.serialized import PackageReader, PackageWriter, _PhysPkgReader, _ZipPkgWriter
+from pptx.oxml import parse_xml
+from pptx.package import Package
+from pptx.util import lazyproperty
+
+
+# Size of the reads used when copying compressed members between archives
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class LazyBlob:
+    """Handle to a zip member that has not been decompressed."""
+
+    def __init__(self, zip_file, zip_info):
+        self.zip_file = zip_file
+        self.zip_info = zip_info
+
+    def read(self):
+        """Decompress and return the member's bytes."""
+        return self.zip_file.read(self.zip_info)
+
+    def copy_raw_to(self, dest):
+        """
+        Copy the member's compressed bytes to the writable file object `dest`.
+
+        Args:
+            dest: File object positioned where the member data should be written.
+        """
+        info = self.zip_info
+        zip_file = self.zip_file
+        with zip_file._lock:
+            fp = zip_file.fp
+            fp.seek(info.header_offset)
+            header = fp.read(zipfile.sizeFileHeader)
+            name_length, extra_length = struct.unpack("<HH", header[26:30])
+            fp.seek(info.header_offset + zipfile.sizeFileHeader + name_length + extra_length)
+            remaining = info.compress_size
+            while remaining:
+                chunk = fp.read(min(remaining, _COPY_CHUNK_SIZE))
+                if not chunk:
+                    raise zipfile.BadZipFile("Truncated member '%s'" % info.filename)
+                dest.write(chunk)
+                remaining -= len(chunk)
+
+
+class _LazyZipPkgReader(_PhysPkgReader):
+    """Zip package reader that holds the central directory and reads members on demand."""
+
+    def __init__(self, pkg_file):
+        self._zip_file = zipfile.ZipFile(pkg_file, "r")
+        self._members = {
+            PackURI("/%s" % info.filename): info for info in self._zip_file.infolist()
+        }
+
+    def __contains__(self, pack_uri):
+        return pack_uri in self._members
+
+    def __getitem__(self, pack_uri):
+        if pack_uri not in self._members:
+            raise KeyError("no member '%s' in package" % pack_uri)
+        return self._zip_file.read(self._members[pack_uri])
+
+    def lazy_blob(self, pack_uri):
+        """Return a |LazyBlob| for the member corresponding to `pack_uri`."""
+        if pack_uri not in self._members:
+            raise KeyError("no member '%s' in package" % pack_uri)
+        return LazyBlob(self._zip_file, self._members[pack_uri])
+
+
+class _LazyPackageReader(PackageReader):
+    """PackageReader that uses |_LazyZipPkgReader| for zip packages."""
+
+    @lazyproperty
+    def _blob_reader(self):
+        if isinstance(self._pkg_file, str) and os.path.isdir(self._pkg_file):
+            return _PhysPkgReader.factory(self._pkg_file)
+        return _LazyZipPkgReader(self._pkg_file)
+
+
+class _LazyBlobMixin:
+    """
+    Mixin for binary part classes whose blob stays in the zip archive until needed.
+
+    Part classes read their content through `self._blob`, so it is turned into a property
+    that decompresses the member on every read without keeping the bytes. Assigning a blob
+    replaces the handle with real bytes.
+    """
+
+    @property
+    def _blob(self):
+        blob = self.__dict__.get("_lazy_blob")
+        if isinstance(blob, LazyBlob):
+            return blob.read()
+        return blob
+
+    @_blob.setter
+    def _blob(self, blob):
+        self.__dict__["_lazy_blob"] = blob
+
+    @property
+    def lazy_blob(self):
+        """The part's |LazyBlob| if its content was never replaced, otherwise None."""
+        blob = self.__dict__.get("_lazy_blob")
+        return blob if isinstance(blob, LazyBlob) else None
+
+
+_lazy_part_classes = {}
+
+
+def _lazy_part_class(part_class):
+    """Return (and cache) a |_LazyBlobMixin| subclass of `part_class`."""
+    if part_class not in _lazy_part_classes:
+        _lazy_part_classes[part_class] = type(
+            "Lazy%s" % part_class.__name__, (_LazyBlobMixin, part_class), {}
+        )
+    return _lazy_part_classes[part_class]
+
+
+class _LazyPackageLoader(_PackageLoader):
+    """Package loader that parses XML parts and defers reading binary parts."""
+
+    @lazyproperty
+    def _package_reader(self):
+        return _LazyPackageReader(self._pkg_file)
+
+    @lazyproperty
+    def _parts(self):
+        content_types = self._content_types
+        package = self._package
+        package_reader = self._package_reader
+        blob_reader = package_reader._blob_reader
+        lazy = isinstance(blob_reader, _LazyZipPkgReader)
+
+        parts = {}
+        for partname in self._xml_rels:
+            # -- invalid partnames can arise in some packages; ignore those as python-pptx does
+            if partname == "/" or partname not in package_reader:
+                continue
+            content_type = content_types[partname]
+            part_class = PartFactory._part_cls_for(content_type)
+            if lazy and not issubclass(part_class, XmlPart):
+                parts[partname] = _lazy_part_class(part_class).load(
+                    partname, content_type, package, blob_reader.lazy_blob(partname)
+                )
+            else:
+                part = part_class.load(partname, content_type, package, package_reader[partname])
+                if lazy:
+                    # -- remembered so an unmodified part can be copied raw on save
+                    part.source_blob = blob_reader.lazy_blob(partname)
+                parts[partname] = part
+        return parts
+
+
+class _PassThroughZipPkgWriter(_ZipPkgWriter):
+    """Zip package writer that can also copy members raw from another archive."""
+
+    def copy_raw(self, pack_uri, lazy_blob):
+        """
+        Write the member behind `lazy_blob` under `pack_uri` without recompressing it.
+
+        Args:
+            pack_uri (PackURI): Partname to write.
+            lazy_blob (LazyBlob): Source member.
+        """
+        source = lazy_blob.zip_info
+        zip_file = self._zipf
+        zinfo = zipfile.ZipInfo(pack_uri.membername, date_time=source.date_time)
+        zinfo.compress_type = source.compress_type
+        zinfo.CRC = source.CRC
+        zinfo.compress_size = source.compress_size
+        zinfo.file_size = source.file_size
+        zinfo.external_attr = source.external_attr
+        # -- sizes are known up front, so no trailing data descriptor is written
+        zinfo.flag_bits = source.flag_bits & ~0x08
+        with zip_file._lock:
+            zip_file._writecheck(zinfo)
+            zip_file._didModify = True
+            zinfo.header_offset = zip_file.fp.tell()
+            zip_file.fp.write(zinfo.FileHeader())
+            lazy_blob.copy_raw_to(zip_file.fp)
+            zip_file.filelist.append(zinfo)
+            zip_file.NameToInfo[zinfo.filename] = zinfo
+            zip_file.start_dir = zip_file.fp.tell()
+
+
+class _PassThroughPackageWriter(PackageWriter):
+    """
+    PackageWriter that copies unmodified parts raw from the source archive.
+
+    Binary parts still holding a |LazyBlob| are always copied. XML parts are copied when
+    `dirty_parts` is a set that does not contain them; when it is None every XML part is
+    serialized as python-pptx does.
+    """
+
+    def __init__(self, pkg_file, pkg_rels, parts, dirty_parts):
+        super().__init__(pkg_file, pkg_rels, parts)
+        self._dirty_parts = dirty_parts
+
+    @classmethod
+    def write(cls, pkg_file, pkg_rels, parts, dirty_parts=None):
+        cls(pkg_file, pkg_rels, parts, dirty_parts)._write()
+
+    def _write(self):
+        with _PassThroughZipPkgWriter(self._pkg_file) as phys_writer:
+            self._write_content_types_stream(phys_writer)
+            self._write_pkg_rels(phys_writer)
+            self._write_parts(phys_writer)
+
+    def _write_parts(self, phys_writer):
+        for part in self._parts:
+            source = self._raw_source(part)
+            if source is not None:
+                phys_writer.copy_raw(part.partname, source)
+            else:
+                phys_writer.write(part.partname, part.blob)
+            if part._rels:
+                phys_writer.write(part.partname.rels_uri, part.rels.xml)
+
+    def _raw_source(self, part):
+        """Return the |LazyBlob| to copy for `part`, or None when it must be serialized."""
+        lazy_blob = getattr(part, "lazy_blob", None)
+        if isinstance(lazy_blob, LazyBlob):
+            return lazy_blob
+        source_blob = getattr(part, "source_blob", None)
+        if (source_blob is not None and self._dirty_parts is not None
+                and part.partname not in self._dirty_parts):
+            return source_blob
+        return None
+
+
+class LazyPackage(Package):
+    """
+    A .pptx package whose binary parts are read from the archive on demand.
+
+    By default every XML part is serialized on save. After `track_changes()` only XML
+    parts whose partnames are passed to `mark_dirty()` (and parts that did not exist in
+    the source archive) are serialized; the rest are copied raw like untouched media.
+
+    Parts are also addressable by partname through `element()`, `related_partnames()` and
+    `rel_targets()`, the interface the text traversal in xml_engine works on.
+    """
+
+    dirty_parts = None
+
+    def track_changes(self):
+        """Only re-serialize XML parts that are explicitly marked dirty from now on."""
+        if self.dirty_parts is None:
+            self.dirty_parts = set()
+
+    def mark_dirty(self, partname):
+        """Record that the XML of the part named `partname` was modified."""
+        if self.dirty_parts is not None:
+            self.dirty_parts.add(partname)
+
+    def element(self, partname):
+        """
+        Return the root element of the part named `partname`.
+
+        XML parts python-pptx loads as plain binary parts (SmartArt data and drawings) are
+        parsed on first access; if they are marked dirty, they are serialized back on save.
+        """
+        part = self._parts_by_partname[partname]
+        if isinstance(part, XmlPart):
+            return part._element
+        if partname not in self._parsed_elements:
+            self._parsed_elements[partname] = parse_xml(part.blob)
+        return self._parsed_elements[partname]
+
+    def related_partnames(self, partname, reltype):
+        """Return partnames related to `partname` (or the package) by relationships of `reltype`."""
+        rels = self._rels if partname == PACKAGE_URI else self._parts_by_partname[partname].rels
+        return [
+            rel.target_part.partname for rel in rels.values()
+            if rel.reltype == reltype and not rel.is_external
+        ]
+
+    def rel_targets(self, partname):
+        """Return {rId: target partname} for the internal relationships of `partname`."""
+        rels = self._rels if partname == PACKAGE_URI else self._parts_by_partname[partname].rels
+        return {rId: rel.target_part.partname for rId, rel in rels.items() if not rel.is_external}
+
+    def save(self, pkg_file):
+        for partname, element in self._parsed_elements.items():
+            if self.dirty_parts is None or partname in self.dirty_parts:
+                self._parts_by_partname[partname]._blob = serialize_part_xml(element)
+        _PassThroughPackageWriter.write(pkg_file, self._rels, tuple(self.iter_parts()), self.dirty_parts)
+
+    @lazyproperty
+    def _parts_by_partname(self):
+        return {part.partname: part for part in self.iter_parts()}
+
+    @lazyproperty
+    def _parsed_elements(self):
+        return {}
+
+    def _load(self):
+        pkg_xml_rels, parts = _LazyPackageLoader.load(self._pkg_file, self)
+        self._rels.load_from_xml(PACKAGE_URI, pkg_xml_rels, parts)
+        return self
+
+
+def open_presentation(pptx):
+    """
+    Open a presentation without decompressing media that is never accessed.
+
+    Drop-in replacement for `pptx.Presentation`. The package file (or stream) must stay
+    available until the presentation has been saved.
+
+    Args:
+        pptx (str or file-like): Path to a .pptx file or a binary stream.
+
+    Returns:
+        Presentation: The loaded presentation.
+    """
+    presentation_part = LazyPackage.open(pptx).main_document_part
+    if presentation_part.content_type not in (CT.PML_PRESENTATION_MAIN, CT.PML_PRES_MACRO_MAIN):
+        raise ValueError("file '%s' is not a PowerPoint file, content type is '%s'"
+                         % (pptx, presentation_part.content_type))
+    return presentation_part.presentation
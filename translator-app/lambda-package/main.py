@@ -1,21 +1,89 @@
+import datetime
+import glob
 import json
-import boto3
 import os
+import shutil
+import tempfile
 import argparse
 import logging
+import threading
 import time
-from botocore.exceptions import ClientError
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from boto3.s3.transfer import TransferConfig
+import urllib3
+from botocore.exceptions import ClientError, ReadTimeoutError
+from aws_clients import get_client
 from tqdm import tqdm
-from pptx import Presentation
+from translation_memory import SQLiteStore, TranslationMemory, normalize_text, store_from_environment
+from segment_batcher import (
+    DEFAULT_BATCH_MAX_SEGMENTS, BatchParseError, build_batch_prompt, estimate_tokens, pack_batches,
+    parse_batch_response
+)
+from pptx.oxml.ns import qn
+from pptx.text.text import TextFrame
+from lazy_package import open_presentation
+from job_store import JOB_COMPLETED, JOB_FAILED, JOB_PROCESSING, tracker_from_environment
+from xml_engine import VALUE_TAG, XmlPackage, text_elements, text_locator, text_parts
+from progress import ProgressReporter
+from usage_report import DEFAULT_TOP_SLIDES, add_usage, build_usage_report, empty_usage
+from rate_limiter import get_rate_limiter
+from profiling import JobTimer, span
+from metrics import get_metrics
+from debug_utils import LazyJson, bind_context, log_context, log_phase, log_sampled, setup_logger
+from bulk import (
+    DEFAULT_POLL_SECONDS, BedrockBatchBackend, BulkTranslation, LocalBatchBackend, list_decks, split_s3_uri
+)
+from run_map import RUN_TAG_INSTRUCTIONS, apply_runs, capture_runs, has_tags
+from text_chunker import (
+    DEFAULT_CHUNK_TOKENS, estimate_batch_output_tokens, estimate_output_tokens, input_budget_for_output,
+    join_chunks, split_text
+)
 from pptx.dml.color import RGBColor
+from collections import deque
 from copy import deepcopy
 
 # Set up logging with detailed format
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+logger = setup_logger(__name__)
+
+# Default number of concurrent Bedrock requests per translation job
+DEFAULT_MAX_CONCURRENCY = 4
+
+# Default number of S3 records translated at once by the Lambda handler
+DEFAULT_RECORD_CONCURRENCY = 2
+
+# Per-record work directories live under the Lambda's writable /tmp
+LAMBDA_TMP_DIR = '/tmp'
+WORK_DIR_PREFIX = 'ppt-translate-'
+
+# In-memory buffering of S3 objects: bytes held before spilling to disk, read size and
+# multipart transfer settings
+DEFAULT_SPOOL_MAX_SIZE = 64 * 1024 * 1024
+S3_CHUNK_SIZE = 1024 * 1024
+S3_TRANSFER_CONFIG = TransferConfig(multipart_threshold=8 * 1024 * 1024, multipart_chunksize=8 * 1024 * 1024)
+
+# Directory mode: worker processes, and the state file recording finished decks
+DEFAULT_DIR_PROCESSES = 2
+DEFAULT_STATE_FILE = '.ppt-translate-state.jsonl'
+
+# Translation engines: python-pptx object model, or direct slide XML access
+ENGINES = ("object", "xml")
+
+# Bump whenever the translation prompts change so cached translations are not reused
+PROMPT_VERSION = "2"
+
+# Streaming: seconds a converse_stream call may go without a chunk before it is retried,
+# and the number of recent streamed calls whose timings are kept
+DEFAULT_STREAM_IDLE_TIMEOUT = 15
+STREAM_METRICS_HISTORY = 1000
+
+# Shown by on_text callbacks when a retried stream does not repeat the text already shown
+STREAM_RESTART_MARKER = "\n[stream interrupted, restarting]\n"
+
+# Thinking budget reserved out of maxTokens when extended reasoning is enabled
+REASONING_BUDGET_TOKENS = 2000
+
+# Default translation memory location for the command-line interface
+DEFAULT_CACHE_DB = os.path.join(os.path.expanduser("~"), ".cache", "ppt-translator", "translation-memory.sqlite3")
 
 class BedrockTranslator:
     """
@@ -23,20 +91,66 @@ class BedrockTranslator:
     Supports interactive, file-based, and batch translation modes with advanced features.
     """
     
-    def __init__(self, region_name="us-west-2"):
+    def __init__(self, region_name="us-west-2", max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 batch_token_budget=0, batch_max_segments=DEFAULT_BATCH_MAX_SEGMENTS,
+                 translation_memory=None, engine="object", chunk_token_budget=DEFAULT_CHUNK_TOKENS,
+                 rate_limiter=None, streaming=False, stream_idle_timeout=DEFAULT_STREAM_IDLE_TIMEOUT,
+                 metrics=None):
         """
         Initialize the translator with AWS Bedrock Runtime client.
         
         Args:
             region_name (str): AWS region name, default is 'us-west-2'.
+            max_concurrency (int): Maximum concurrent Bedrock requests per job, default is 4.
+            batch_token_budget (int): Estimated input tokens to pack into one request when
+                translating many segments; 0 disables batching.
+            batch_max_segments (int): Maximum number of segments per batched request.
+            translation_memory (TranslationMemory): Cache consulted before every model call,
+                or None to always call the model.
+            engine (str): Default translate_file engine, 'object' or 'xml'.
+            chunk_token_budget (int): Estimated input tokens above which a text frame is
+                split into chunks that are translated separately.
+            rate_limiter (AdaptiveRateLimiter): Request and token budget for Bedrock calls,
+                defaults to the one shared by the whole process.
+            streaming (bool): Whether to call converse_stream instead of converse.
+            stream_idle_timeout (float): Seconds a stream may go without a chunk before
+                the call is retried.
+            metrics (MetricsRecorder): Where call and job metrics are buffered, defaults
+                to the one shared by the whole process.
         """
-        self.bedrock_runtime = boto3.client("bedrock-runtime", region_name=region_name)
+        self.max_concurrency = max(1, max_concurrency)
+        # Shared clients, pooled to the number of concurrent Bedrock requests; the rate
+        # limiter retries Bedrock calls, so botocore makes a single attempt
+        self.bedrock_runtime = get_client("bedrock-runtime", region_name,
+                                          max_pool_connections=self.max_concurrency, max_attempts=1)
+        self.streaming = streaming
+        self.stream_idle_timeout = stream_idle_timeout
+        # Streamed calls use their own client, whose read timeout bounds the gap between chunks
+        self.bedrock_stream_runtime = get_client("bedrock-runtime", region_name,
+                                                 max_pool_connections=self.max_concurrency, max_attempts=1,
+                                                 read_timeout=stream_idle_timeout)
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.metrics = metrics or get_metrics()
         self.model_id = "anthropic.claude-3-5-sonnet-20240620-v1:0"  # Using a model ID that works reliably
-        self.s3_client = boto3.client('s3', region_name=region_name)
-        logger.info(f"Initialized BedrockTranslator with region {region_name}")
+        self.s3_client = get_client('s3', region_name)
+        self.batch_token_budget = batch_token_budget
+        self.batch_max_segments = batch_max_segments
+        self.translation_memory = translation_memory
+        self.engine = engine
+        self.chunk_token_budget = chunk_token_budget
+        self.last_report = None
+        self.tokens_used = 0
+        self._usage_lock = threading.Lock()
+        # Timings of recent streamed calls, and how many streamed calls were made in total
+        self.stream_metrics = deque(maxlen=STREAM_METRICS_HISTORY)
+        self.stream_calls = 0
+        # Per-thread list collecting the usage of every call made for the current request
+        self._call_log = threading.local()
+        self.last_usage_report = None
+        logger.info(f"Initialized BedrockTranslator with region {region_name}, max concurrency {self.max_concurrency}")
     
     def translate(self, text, source_language="auto (en-US)", target_language="zh-TW", 
-                  use_reasoning=False, temperature=0.7, max_tokens=3000, top_p=0.9):
+                  use_reasoning=False, temperature=0.7, max_tokens=3000, top_p=0.9, on_text=None):
         """
         Translate a single piece of text using AWS Bedrock.
         
@@ -48,65 +162,372 @@ class BedrockTranslator:
             temperature (float): Temperature for model creativity, default is 0.7.
             max_tokens (int): Maximum tokens for response, default is 3000.
             top_p (float): Top P for nucleus sampling, default is 0.9.
+            on_text (callable): Streams the translation: called with each piece of text as
+                it arrives (see invoke_model). A cached translation is passed in one piece.
             
         Returns:
             str: Translated text.
         """
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                # Build translation prompt
-                prompt = f"Translate the following text from {source_language} to {target_language}, maintaining the original format, tone, and meaning. Return only the translated text without any additional explanation:\n\n{text}"
-                
-                if use_reasoning:
-                    prompt = f"Translate the following text from {source_language} to {target_language}. First, analyze key terms and style, then provide an accurate translation that preserves the original format, tone, and technical accuracy. Return only the translated text without explanation:\n\n{text}"
-                
-                # Build messages for Converse API
-                messages = [
-                    {
-                        "role": "user",
-                        "content": [{"text": prompt}]
-                    }
-                ]
-                
-                # Configure inference parameters
-                inference_config = {
-                    "maxTokens": max_tokens,
-                    "temperature": temperature,
-                    "topP": top_p
-                }
-                
-                if use_reasoning:
-                    # Enable extended reasoning with token budget
-                    inference_config["reasoning"] = {"thinking": {"type": "enabled", "budget": 2000}}
-                
-                # Call Converse API
-                logger.info(f"Invoking Bedrock model {self.model_id} for translation")
-                response = self.bedrock_runtime.converse(
-                    modelId=self.model_id,
-                    messages=messages,
-                    inferenceConfig=inference_config
-                )
-                
-                # Extract translated text
-                translated_text = response["output"]["message"]["content"][0]["text"]
-                logger.info("Translation successful")
-                return translated_text
-                
-            except ClientError as e:
-                logger.error(f"Attempt {attempt+1}/{max_retries} failed: {str(e)}")
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
-                    continue
-                else:
-                    raise Exception(f"Failed to translate text after {max_retries} attempts: {str(e)}")
-            except Exception as e:
-                logger.error(f"Unexpected error in attempt {attempt+1}/{max_retries}: {str(e)}")
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
-                    continue
+        cached = self.memory_get(text, source_language, target_language, use_reasoning)
+        if cached is not None:
+            if on_text is not None:
+                on_text(cached)
+            return cached
+        
+        translated_text = self.translate_uncached(
+            text, source_language, target_language,
+            use_reasoning, temperature, max_tokens, top_p, on_text
+        )
+        self.memory_put(text, source_language, target_language, use_reasoning, translated_text)
+        return translated_text
+    
+    def memory_get(self, text, source_language, target_language, use_reasoning):
+        """
+        Look up a translation in the translation memory.
+        
+        Returns:
+            str: The cached translation, or None on a miss or when no memory is configured.
+        """
+        if self.translation_memory is None:
+            return None
+        prompt_version = PROMPT_VERSION + ("+reasoning" if use_reasoning else "")
+        return self.translation_memory.get(text, source_language, target_language, self.model_id, prompt_version)
+    
+    def memory_put(self, text, source_language, target_language, use_reasoning, translated_text):
+        """Store a translation in the translation memory, if one is configured."""
+        if self.translation_memory is None:
+            return
+        prompt_version = PROMPT_VERSION + ("+reasoning" if use_reasoning else "")
+        self.translation_memory.put(text, source_language, target_language, self.model_id,
+                                    prompt_version, translated_text)
+    
+    def translate_uncached(self, text, source_language="auto (en-US)", target_language="zh-TW",
+                           use_reasoning=False, temperature=0.7, max_tokens=3000, top_p=0.9,
+                           on_text=None):
+        """
+        Translate a single piece of text with the model, bypassing the translation memory.
+        
+        Args:
+            text (str): Text to translate.
+            source_language (str): Source language, default is 'auto (en-US)'.
+            target_language (str): Target language, default is 'zh-TW'.
+            use_reasoning (bool): Whether to enable extended reasoning for improved accuracy.
+            temperature (float): Temperature for model creativity, default is 0.7.
+            max_tokens (int): Maximum tokens for response, default is 3000.
+            top_p (float): Top P for nucleus sampling, default is 0.9.
+            on_text (callable): Streams the translation (see invoke_model).
+            
+        Returns:
+            str: Translated text.
+        """
+        prompt = self.translation_prompt(text, source_language, target_language, use_reasoning)
+        return self.invoke_model(prompt, use_reasoning, temperature,
+                                 self.output_token_limit([text], use_reasoning, max_tokens), top_p, on_text)
+    
+    def translation_prompt(self, text, source_language, target_language, use_reasoning=False):
+        """
+        Build the prompt that asks the model to translate a single text.
+        
+        Args:
+            text (str): Text to translate.
+            source_language (str): Source language.
+            target_language (str): Target language.
+            use_reasoning (bool): Whether extended reasoning is enabled.
+            
+        Returns:
+            str: Prompt text.
+        """
+        # Keep inline formatting tags in place
+        tag_instructions = RUN_TAG_INSTRUCTIONS if has_tags(text) else ""
+        
+        # Build translation prompt
+        prompt = f"Translate the following text from {source_language} to {target_language}, maintaining the original format, tone, and meaning.{tag_instructions} Return only the translated text without any additional explanation:\n\n{text}"
+        
+        if use_reasoning:
+            prompt = f"Translate the following text from {source_language} to {target_language}. First, analyze key terms and style, then provide an accurate translation that preserves the original format, tone, and technical accuracy.{tag_instructions} Return only the translated text without explanation:\n\n{text}"
+        
+        return prompt
+    
+    def output_token_limit(self, texts, use_reasoning, max_tokens, segment_ids=None):
+        """
+        Size maxTokens for a request from the length of the texts it translates.
+        
+        Args:
+            texts (list): Source texts in the request.
+            use_reasoning (bool): Whether extended reasoning is enabled.
+            max_tokens (int): Upper bound on the result, or None for the uncapped estimate.
+            segment_ids (list): IDs of a packed batch, whose reply is a JSON envelope
+                keyed by them; None for a single plain text.
+            
+        Returns:
+            int: maxTokens for the request.
+        """
+        if segment_ids is None:
+            limit = estimate_output_tokens(texts)
+        else:
+            limit = estimate_batch_output_tokens(dict(zip(segment_ids, texts)))
+        if use_reasoning:
+            limit += REASONING_BUDGET_TOKENS
+        return limit if max_tokens is None else min(max_tokens, limit)
+    
+    def chunk_budget(self, use_reasoning, max_tokens):
+        """
+        Return the chunk size, in estimated input tokens, whose translation fits in max_tokens.
+        
+        Args:
+            use_reasoning (bool): Whether extended reasoning is enabled.
+            max_tokens (int): Upper bound on maxTokens per request.
+            
+        Returns:
+            int: Token budget for split_text.
+        """
+        available = max_tokens - (REASONING_BUDGET_TOKENS if use_reasoning else 0)
+        return min(self.chunk_token_budget, input_budget_for_output(available))
+    
+    def invoke_model(self, prompt, use_reasoning=False, temperature=0.7, max_tokens=3000, top_p=0.9,
+                     on_text=None):
+        """
+        Send a prompt to the Bedrock Converse API and return the response text.
+        
+        The call goes through the shared rate limiter, which retries throttling and
+        transient errors with backoff; other errors are raised without retrying. When the
+        translator is streaming, or `on_text` is given, the response is read through
+        converse_stream; a stream that stalls for stream_idle_timeout seconds is retried.
+        
+        Args:
+            prompt (str): Complete user prompt.
+            use_reasoning (bool): Whether to enable extended reasoning for improved accuracy.
+            temperature (float): Temperature for model creativity, default is 0.7.
+            max_tokens (int): Maximum tokens for response, default is 3000.
+            top_p (float): Top P for nucleus sampling, default is 0.9.
+            on_text (callable): Called with each piece of output text as it arrives. If a
+                stalled stream is retried, text already passed on is not repeated (see
+                StreamEcho).
+            
+        Returns:
+            str: Model output text.
+        """
+        # Build messages for Converse API
+        messages = [
+            {
+                "role": "user",
+                "content": [{"text": prompt}]
+            }
+        ]
+        
+        # Configure inference parameters
+        inference_config = {
+            "maxTokens": max_tokens,
+            "temperature": temperature,
+            "topP": top_p
+        }
+        
+        if use_reasoning:
+            # Enable extended reasoning with token budget
+            inference_config["reasoning"] = {"thinking": {"type": "enabled", "budget": REASONING_BUDGET_TOKENS}}
+        
+        streaming = self.streaming or on_text is not None
+        timer = getattr(self._call_log, "timer", None)
+        echo = StreamEcho(on_text) if on_text is not None else None
+        
+        def request():
+            # Call Converse API; each attempt is its own model_call span
+            log_sampled(logger, logging.DEBUG, "Invoking Bedrock model %s for translation", self.model_id)
+            with span(timer, "model_call"):
+                if streaming:
+                    if echo is not None:
+                        echo.restart()
+                    response = self.converse_streamed(messages, inference_config, echo)
                 else:
-                    raise Exception(f"Unexpected error during translation after {max_retries} attempts: {str(e)}")
+                    response = self.bedrock_runtime.converse(
+                        modelId=self.model_id,
+                        messages=messages,
+                        inferenceConfig=inference_config
+                    )
+            usage = response.get("usage", {})
+            return response, usage.get("inputTokens", 0) + usage.get("outputTokens", 0)
+        
+        try:
+            # model_request includes rate limiter waits and retries
+            with span(timer, "model_request"):
+                response = self.rate_limiter.call(request, estimate_tokens(prompt) + max_tokens)
+        except ClientError as e:
+            raise Exception(f"Failed to translate text: {str(e)}")
+        
+        usage = response.get("usage", {})
+        self.add_usage(usage.get("inputTokens", 0) + usage.get("outputTokens", 0))
+        self.metrics.count("BedrockCalls")
+        self.metrics.count("InputTokens", usage.get("inputTokens", 0))
+        self.metrics.count("OutputTokens", usage.get("outputTokens", 0))
+        if "latencyMs" in response.get("metrics", {}):
+            self.metrics.observe("BedrockLatency", response["metrics"]["latencyMs"])
+        calls = getattr(self._call_log, "calls", None)
+        if calls is not None:
+            calls.append({
+                "input_tokens": usage.get("inputTokens", 0),
+                "output_tokens": usage.get("outputTokens", 0),
+                "latency_ms": response.get("metrics", {}).get("latencyMs", 0),
+                "calls": 1
+            })
+        
+        # Extract translated text
+        translated_text = response["output"]["message"]["content"][0]["text"]
+        return translated_text
+    
+    def converse_streamed(self, messages, inference_config, on_text=None):
+        """
+        Call converse_stream and collect the stream into a converse-style response.
+        
+        Time to first token and output tokens per second are recorded in stream_metrics.
+        
+        Args:
+            messages (list): Converse messages.
+            inference_config (dict): Converse inference configuration.
+            on_text (callable): Called with each piece of output text as it arrives.
+            
+        Returns:
+            dict: Response with the same 'output', 'usage', 'metrics' and 'stopReason'
+                keys as a converse response.
+            
+        Raises:
+            ReadTimeoutError: If no chunk arrives for stream_idle_timeout seconds.
+        """
+        started = time.monotonic()
+        response = self.bedrock_stream_runtime.converse_stream(
+            modelId=self.model_id,
+            messages=messages,
+            inferenceConfig=inference_config
+        )
+        pieces = []
+        usage = {}
+        stop_reason = None
+        first_token_at = None
+        try:
+            for event in response["stream"]:
+                if "contentBlockDelta" in event:
+                    text = event["contentBlockDelta"]["delta"].get("text")
+                    if text:
+                        if first_token_at is None:
+                            first_token_at = time.monotonic()
+                        pieces.append(text)
+                        if on_text is not None:
+                            on_text(text)
+                elif "messageStop" in event:
+                    stop_reason = event["messageStop"].get("stopReason")
+                elif "metadata" in event:
+                    usage = event["metadata"].get("usage", {})
+        except (urllib3.exceptions.ReadTimeoutError, urllib3.exceptions.ProtocolError) as e:
+            # Surface stalls as botocore timeouts so the rate limiter retries them
+            raise ReadTimeoutError(endpoint_url=f"converse_stream ({e})")
+        finished = time.monotonic()
+        
+        output_tokens = usage.get("outputTokens", 0)
+        generation_seconds = finished - (first_token_at or finished)
+        metrics = {
+            'ttft_ms': round((first_token_at - started) * 1000) if first_token_at else None,
+            'duration_ms': round((finished - started) * 1000),
+            'output_tokens': output_tokens,
+            'tokens_per_second': round(output_tokens / generation_seconds, 1) if generation_seconds > 0 else None
+        }
+        with self._usage_lock:
+            self.stream_metrics.append(metrics)
+            self.stream_calls += 1
+        if metrics['ttft_ms'] is not None:
+            self.metrics.observe("BedrockTimeToFirstToken", metrics['ttft_ms'])
+        log_sampled(logger, logging.DEBUG, "Stream metrics: %s", metrics)
+        return {
+            "output": {"message": {"role": "assistant", "content": [{"text": "".join(pieces)}]}},
+            "usage": usage,
+            "metrics": {"latencyMs": metrics['duration_ms']},
+            "stopReason": stop_reason
+        }
+    
+    def stream_report(self, since=0):
+        """
+        Summarize the timings of streamed calls.
+        
+        Args:
+            since (int): Value of stream_calls before the calls to summarize were made.
+            
+        Returns:
+            dict: Call count, mean and maximum time to first token, and mean output tokens
+                per second; None if no streamed call was made.
+        """
+        with self._usage_lock:
+            count = self.stream_calls - since
+            calls = list(self.stream_metrics)[-count:] if count > 0 else []
+        if not calls:
+            return None
+        ttfts = [call['ttft_ms'] for call in calls if call['ttft_ms'] is not None]
+        rates = [call['tokens_per_second'] for call in calls if call['tokens_per_second'] is not None]
+        return {
+            'calls': count,
+            'mean_ttft_ms': round(sum(ttfts) / len(ttfts)) if ttfts else None,
+            'max_ttft_ms': max(ttfts) if ttfts else None,
+            'mean_tokens_per_second': round(sum(rates) / len(rates), 1) if rates else None
+        }
+    
+    def add_usage(self, tokens):
+        """Add model tokens to the running total in tokens_used."""
+        with self._usage_lock:
+            self.tokens_used += tokens
+    
+    def translate_packed(self, texts, source_language="auto (en-US)", target_language="zh-TW",
+                         use_reasoning=False, temperature=0.7, max_tokens=3000, top_p=0.9,
+                         segment_ids=None):
+        """
+        Translate several segments in a single Bedrock request.
+        
+        The segments are sent as a JSON envelope keyed by segment ID. If the response cannot
+        be mapped back onto every segment, the batch is split in half and each half is
+        retried, down to single segments which are translated on their own. A batch whose
+        reply would not fit in max_tokens is split before it is sent.
+        
+        Args:
+            texts (list): Texts to translate.
+            source_language (str): Source language, default is 'auto (en-US)'.
+            target_language (str): Target language, default is 'zh-TW'.
+            use_reasoning (bool): Whether to enable extended reasoning for improved accuracy.
+            temperature (float): Temperature for model creativity, default is 0.7.
+            max_tokens (int): Maximum tokens for response, default is 3000.
+            top_p (float): Top P for nucleus sampling, default is 0.9.
+            segment_ids (list): Stable IDs for the segments, defaults to their positions.
+            
+        Returns:
+            list: Translated texts in input order.
+        """
+        if segment_ids is None:
+            segment_ids = [str(i) for i in range(len(texts))]
+        
+        if len(texts) == 1:
+            return [self.translate_uncached(
+                texts[0], source_language, target_language,
+                use_reasoning, temperature, max_tokens, top_p
+            )]
+        
+        output_limit = self.output_token_limit(texts, use_reasoning, None, segment_ids)
+        if output_limit > max_tokens:
+            # The reply would be cut off, so do not pay for the request
+            logger.info(f"Batch of {len(texts)} segments needs ~{output_limit} output tokens, "
+                        f"over max_tokens {max_tokens}; splitting")
+        else:
+            prompt = build_batch_prompt(dict(zip(segment_ids, texts)), source_language,
+                                        target_language, use_reasoning,
+                                        keep_tags=any(has_tags(text) for text in texts))
+            try:
+                response_text = self.invoke_model(prompt, use_reasoning, temperature, output_limit, top_p)
+                translations = parse_batch_response(response_text, segment_ids)
+                return [translations[segment_id] for segment_id in segment_ids]
+            except BatchParseError as e:
+                logger.warning(f"Malformed response for batch of {len(texts)} segments, splitting: {e}")
+        
+        middle = len(texts) // 2
+        return (
+            self.translate_packed(texts[:middle], source_language, target_language, use_reasoning,
+                                  temperature, max_tokens, top_p, segment_ids[:middle]) +
+            self.translate_packed(texts[middle:], source_language, target_language, use_reasoning,
+                                  temperature, max_tokens, top_p, segment_ids[middle:])
+        )
     
     def copy_run_formatting(self, source_run, target_run):
         """
@@ -137,6 +558,29 @@ class BedrockTranslator:
         if hasattr(source_run.font, 'name') and source_run.font.name is not None:
             target_run.font.name = source_run.font.name
     
+    def capture_text_frame(self, text_frame):
+        """
+        Capture the run formatting of a text frame before it is rewritten.
+        
+        Args:
+            text_frame: The text frame to capture.
+            
+        Returns:
+            RunMap: Run map whose tagged text is what gets translated.
+        """
+        return capture_runs(text_frame._txBody)
+    
+    def apply_translation(self, text_frame, run_map, translated_text):
+        """
+        Write translated text back into a text frame using its captured formatting.
+        
+        Args:
+            text_frame: The text frame to rewrite.
+            run_map (RunMap): Formatting captured by capture_text_frame.
+            translated_text (str): Translated tagged text, paragraphs separated by newlines.
+        """
+        apply_runs(text_frame._txBody, run_map, translated_text)
+    
     def translate_text_frame(self, text_frame, source_language, target_language, use_reasoning, temperature, max_tokens, top_p):
         """
         Translate text in a text frame while preserving formatting.
@@ -158,209 +602,462 @@ class BedrockTranslator:
         
         try:
             # Store original text and formatting information
-            original_paragraphs = []
-            for p in text_frame.paragraphs:
-                p_info = {
-                    'text': p.text,
-                    'runs': []
-                }
-                
-                # Store alignment and level
-                p_info['alignment'] = p.alignment
-                p_info['level'] = p.level
-                
-                # Store run information
-                for run in p.runs:
-                    run_info = {
-                        'text': run.text,
-                        'font': {
-                            'bold': run.font.bold,
-                            'italic': run.font.italic,
-                            'underline': run.font.underline,
-                            'size': run.font.size,
-                            'name': run.font.name if hasattr(run.font, 'name') else None
-                        }
-                    }
-                    
-                    # Store color information if available
-                    if hasattr(run.font.color, 'rgb') and run.font.color.rgb is not None:
-                        run_info['font']['color'] = run.font.color.rgb
-                    
-                    p_info['runs'].append(run_info)
-                
-                original_paragraphs.append(p_info)
+            run_map = self.capture_text_frame(text_frame)
             
-            # Translate the entire text
-            original_text = text_frame.text
-            translated_text = self.translate(
-                original_text, source_language, target_language,
-                use_reasoning, temperature, max_tokens, top_p
-            )
-            
-            # Split translated text into paragraphs
-            translated_paragraphs = translated_text.split('\n')
-            
-            # Clear the text frame
-            for i in range(len(text_frame.paragraphs)):
-                p = text_frame.paragraphs[i]
-                if i == 0:
-                    p.clear()
-                else:
-                    # Can't remove paragraphs, so clear all but the first
-                    for run in p.runs:
-                        run.text = ''
-            
-            # Add translated paragraphs with original formatting
-            for i, translated_para_text in enumerate(translated_paragraphs):
-                if i == 0:
-                    # Use the first paragraph that's already in the text frame
-                    p = text_frame.paragraphs[0]
-                else:
-                    # Add new paragraphs as needed
-                    p = text_frame.add_paragraph()
-                
-                # Apply original paragraph formatting if available
-                if i < len(original_paragraphs):
-                    if original_paragraphs[i]['alignment'] is not None:
-                        p.alignment = original_paragraphs[i]['alignment']
-                    if original_paragraphs[i]['level'] is not None:
-                        p.level = original_paragraphs[i]['level']
-                
-                # Add a single run with the translated text
-                run = p.add_run()
-                run.text = translated_para_text
-                
-                # Apply formatting from the first run of the original paragraph
-                if i < len(original_paragraphs) and original_paragraphs[i]['runs']:
-                    original_run_info = original_paragraphs[i]['runs'][0]
-                    
-                    # Apply font properties
-                    if original_run_info['font']['bold'] is not None:
-                        run.font.bold = original_run_info['font']['bold']
-                    
-                    if original_run_info['font']['italic'] is not None:
-                        run.font.italic = original_run_info['font']['italic']
-                    
-                    if original_run_info['font']['underline'] is not None:
-                        run.font.underline = original_run_info['font']['underline']
-                    
-                    if original_run_info['font']['size'] is not None:
-                        run.font.size = original_run_info['font']['size']
-                    
-                    if original_run_info['font']['name'] is not None:
-                        run.font.name = original_run_info['font']['name']
-                    
-                    # Apply color if available
-                    if 'color' in original_run_info['font']:
-                        run.font.color.rgb = original_run_info['font']['color']
+            # Translate the entire text, in chunks if it is long
+            translated_text = self.translate_segments(
+                [run_map.text], source_language, target_language,
+                use_reasoning, temperature, max_tokens, top_p, desc="Translating text frame"
+            )[0]
+            if translated_text is None:
+                raise Exception("Translation failed")
             
+            self.apply_translation(text_frame, run_map, translated_text)
             return True
         
         except Exception as e:
             logger.error(f"Error translating text frame: {e}")
             return False
     
+    def open_package(self, input_file, engine):
+        """
+        Open a presentation for text extraction and write-back.
+        
+        Args:
+            input_file (str or file-like): Path to a PowerPoint file, or a seekable binary stream.
+            engine (str): 'object' or 'xml'.
+            
+        Returns:
+            XmlPackage or LazyPackage: Package exposing element(), mark_dirty() and save().
+        """
+        if engine == "xml":
+            # Parse only the text-bearing parts
+            return XmlPackage(input_file)
+        # Load the presentation, leaving media in the archive until it is needed
+        prs = open_presentation(input_file)
+        # Only parts we write to are re-serialized on save, the rest are copied raw
+        package = prs.part.package
+        package.track_changes()
+        return package
+    
+    def write_segment(self, package, segment, translated_text):
+        """
+        Write a translation into the element of a segment and mark its part as modified.
+        
+        Args:
+            package: Package the segment was collected from.
+            segment (dict): Segment from collect_segments.
+            translated_text (str): Translated (tagged) text.
+            
+        Returns:
+            bool: True if the text was written, False otherwise.
+        """
+        try:
+            package.mark_dirty(segment['part'])
+            if segment['run_map'] is None:
+                segment['element'].text = translated_text.strip()
+            else:
+                self.apply_translation(segment['text_frame'], segment['run_map'], translated_text)
+            return True
+        except Exception as e:
+            logger.error(f"Error writing {segment['kind']} at {segment['locator']}: {e}")
+            return False
+    
+    def collect_segments(self, package, parts):
+        """
+        Collect every translatable text element of a presentation in document order.
+        
+        Parts are walked in the order given by xml_engine.text_parts: each slide with its
+        charts, SmartArt and notes, then masters and layouts. Formatting is captured up front
+        so that translations can later be written back in any order.
+        
+        Args:
+            package: XmlPackage or LazyPackage holding the parts.
+            parts (list): (kind, slide_index, partname) tuples from xml_engine.text_parts.
+            
+        Returns:
+            list: Segment dicts with 'slide' (None outside slides), 'kind', 'part'
+                (partname), 'locator', 'text' (tagged with run formatting), 'element',
+                'text_frame' and 'run_map' keys. Chart string values have no text frame
+                or run map.
+        """
+        segments = []
+        
+        for part_kind, slide_idx, partname in parts:
+            for element in text_elements(part_kind, package.element(partname)):
+                if element.tag == VALUE_TAG:
+                    # Chart series names and category labels, skipping numbers and dates
+                    text = element.text or ''
+                    if not any(char.isalpha() for char in text):
+                        continue
+                    text_frame = run_map = None
+                else:
+                    text_frame = TextFrame(element, None)
+                    run_map = self.capture_text_frame(text_frame)
+                    if not run_map.plain_text.strip():
+                        continue
+                    text = run_map.text
+                if part_kind == 'slide':
+                    kind = 'table_cell' if element.tag == qn('a:txBody') else 'shape'
+                else:
+                    kind = part_kind
+                segments.append({
+                    'slide': slide_idx,
+                    'kind': kind,
+                    'part': partname,
+                    'locator': text_locator(partname, element),
+                    'text': text,
+                    'element': element,
+                    'text_frame': text_frame,
+                    'run_map': run_map
+                })
+        
+        return segments
+    
+    def deduplicate_segments(self, segments):
+        """
+        Group segments whose normalized text is identical.
+        
+        Args:
+            segments (list): Segments from collect_segments.
+            
+        Returns:
+            tuple: (unique_texts, occurrences) where unique_texts lists the first occurrence of
+                each distinct text and occurrences maps every segment to its unique_texts index.
+        """
+        unique_texts = []
+        occurrences = []
+        index_by_text = {}
+        for segment in segments:
+            key = normalize_text(segment['text'])
+            if key not in index_by_text:
+                index_by_text[key] = len(unique_texts)
+                unique_texts.append(segment['text'])
+            occurrences.append(index_by_text[key])
+        return unique_texts, occurrences
+    
+    def translate_segments(self, texts, source_language="auto (en-US)", target_language="zh-TW",
+                           use_reasoning=False, temperature=0.7, max_tokens=3000, top_p=0.9,
+                           max_concurrency=None, desc="Translating content", on_complete=None,
+                           on_result=None, errors=None, usage=None, timer=None):
+        """
+        Translate independent text segments through a bounded thread pool.
+        
+        Segments found in the translation memory never reach the model. Segments longer
+        than the chunk budget are split at paragraph and sentence boundaries, translated as
+        independent chunks and reassembled in order. When batching is enabled, the remaining
+        short segments are packed into batched requests within the translator's
+        batch_token_budget.
+        
+        Args:
+            texts (list): Texts to translate.
+            source_language (str): Source language, default is 'auto (en-US)'.
+            target_language (str): Target language, default is 'zh-TW'.
+            use_reasoning (bool): Whether to enable extended reasoning for improved accuracy.
+            temperature (float): Temperature for model creativity, default is 0.7.
+            max_tokens (int): Upper bound on maxTokens per request, default is 3000.
+            top_p (float): Top P for nucleus sampling, default is 0.9.
+            max_concurrency (int): Maximum concurrent Bedrock requests, defaults to the
+                translator's max_concurrency.
+            desc (str): Progress bar description.
+            on_complete (callable): Called from the calling thread with the list of indices
+                finished by each memory lookup pass or request, failed ones included.
+            on_result (callable): Called from the calling thread with (index, translated
+                text) for every finished segment, memory hits included; the text is None
+                if the segment failed.
+            errors (dict): If given, receives an error message per failed segment index.
+            usage (dict): If given, receives the usage (input_tokens, output_tokens,
+                latency_ms, calls) of the model calls made for each segment index. A call
+                carrying several segments or chunks is shared in proportion to their
+                estimated size; memory hits get no entry.
+            timer (JobTimer): If given, receives a memory_lookup span and a model_request
+                and model_call span per Bedrock call.
+            
+        Returns:
+            list: Translated texts in input order; None for segments that failed.
+        """
+        max_concurrency = max(1, max_concurrency or self.max_concurrency)
+        results = [None] * len(texts)
+        
+        pending = []
+        with span(timer, "memory_lookup"):
+            for i, text in enumerate(texts):
+                results[i] = self.memory_get(text, source_language, target_language, use_reasoning)
+                if results[i] is None:
+                    pending.append(i)
+                elif on_result is not None:
+                    on_result(i, results[i])
+        if self.translation_memory is not None:
+            self.metrics.count("CacheHits", len(texts) - len(pending))
+            self.metrics.count("CacheMisses", len(pending))
+        if on_complete is not None and len(pending) < len(texts):
+            pending_set = set(pending)
+            on_complete([i for i in range(len(texts)) if i not in pending_set])
+        
+        # Long texts are split into chunks that are translated as separate units
+        chunk_budget = self.chunk_budget(use_reasoning, max_tokens)
+        chunks = {i: split_text(texts[i], chunk_budget) for i in pending}
+        units = [(i, chunk) for i in pending for chunk, _ in chunks[i]]
+        unit_translations = {i: [] for i in pending}
+        
+        if self.batch_token_budget > 0:
+            batches = pack_batches([chunk for _, chunk in units], self.batch_token_budget,
+                                   self.batch_max_segments)
+        else:
+            batches = [[u] for u in range(len(units))]
+        
+        def translate_units(unit_indices):
+            self._call_log.calls = []
+            self._call_log.timer = timer
+            try:
+                translations = self.translate_packed(
+                    [units[u][1] for u in unit_indices], source_language, target_language,
+                    use_reasoning, temperature, max_tokens, top_p,
+                    segment_ids=[str(u) for u in unit_indices]
+                )
+            except Exception as e:
+                logger.error(f"Error translating segments {sorted(set(units[u][0] for u in unit_indices))}: {e}")
+                if errors is not None:
+                    for u in unit_indices:
+                        errors[units[u][0]] = str(e)
+                translations = [None] * len(unit_indices)
+            finally:
+                calls = self._call_log.calls
+                self._call_log.calls = None
+                self._call_log.timer = None
+            for u, translated in zip(unit_indices, translations):
+                i = units[u][0]
+                if translated is not None and len(chunks[i]) == 1:
+                    self.memory_put(texts[i], source_language, target_language, use_reasoning, translated)
+            return unit_indices, translations, calls
+        
+        with tqdm(total=len(texts), initial=len(texts) - len(pending), desc=desc) as pbar:
+            with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+                # Worker threads log with the caller's context (jobId, ...)
+                futures = [executor.submit(bind_context(translate_units), batch) for batch in batches]
+                for future in as_completed(futures):
+                    unit_indices, translations, calls = future.result()
+                    if usage is not None and calls:
+                        # Share the calls between units by their estimated size
+                        sizes = [estimate_tokens(units[u][1]) for u in unit_indices]
+                        for u, size in zip(unit_indices, sizes):
+                            unit_usage = usage.setdefault(units[u][0], empty_usage())
+                            for call in calls:
+                                add_usage(unit_usage, call, size / sum(sizes))
+                    completed = []
+                    for u, translated in zip(unit_indices, translations):
+                        i = units[u][0]
+                        unit_translations[i].append((u, translated))
+                        if len(unit_translations[i]) < len(chunks[i]):
+                            continue
+                        completed.append(i)
+                        if len(chunks[i]) == 1:
+                            results[i] = translated
+                        else:
+                            # Reassemble chunked text once every chunk is back
+                            chunk_translations = [t for _, t in sorted(unit_translations[i])]
+                            if None not in chunk_translations:
+                                results[i] = join_chunks(chunks[i], chunk_translations)
+                                self.memory_put(texts[i], source_language, target_language, use_reasoning, results[i])
+                        if on_result is not None:
+                            on_result(i, results[i])
+                    pbar.update(len(completed))
+                    if on_complete is not None and completed:
+                        on_complete(completed)
+        
+        return results
+    
     def translate_file(self, input_file, output_file, source_language="auto (en-US)", 
                        target_language="zh-TW", use_reasoning=False, temperature=0.7, 
-                       max_tokens=3000, top_p=0.9):
+                       max_tokens=3000, top_p=0.9, max_concurrency=None, engine=None,
+                       progress_callback=None, usage_report_file=None, timer=None,
+                       top_slides=DEFAULT_TOP_SLIDES):
         """
         Translate content from a PowerPoint file and save to a new file.
         
+        All translatable text frames are extracted first, translated concurrently and then
+        written back in document order, so the output does not depend on the order in which
+        Bedrock requests complete. Repeated text (footers, labels, table headers) is translated
+        once and fanned out to every occurrence. A summary of the job is kept in last_report.
+        
+        Text is found by a single part-level traversal covering slides (including group
+        shapes and tables), charts, SmartArt, notes, layouts and masters. The 'object' engine
+        loads the deck through python-pptx; the 'xml' engine only parses the text-bearing
+        parts. Both locate and rewrite text the same way and produce the same part XML.
+        
         Args:
-            input_file (str): Path to input PowerPoint file.
-            output_file (str): Path to save translated PowerPoint file.
+            input_file (str or file-like): Path to input PowerPoint file, or a seekable
+                binary stream.
+            output_file (str or file-like): Path to save translated PowerPoint file, or a
+                writable binary stream.
             source_language (str): Source language, default is 'auto (en-US)'.
             target_language (str): Target language, default is 'zh-TW'.
             use_reasoning (bool): Whether to enable extended reasoning for improved accuracy.
             temperature (float): Temperature for model creativity, default is 0.7.
             max_tokens (int): Maximum tokens for response, default is 3000.
             top_p (float): Top P for nucleus sampling, default is 0.9.
+            max_concurrency (int): Maximum concurrent Bedrock requests, defaults to the
+                translator's max_concurrency.
+            engine (str): 'object' or 'xml', defaults to the translator's engine.
+            progress_callback (callable): Receives throttled progress event dicts while
+                segments are translated (see progress.ProgressReporter).
+            usage_report_file (str or file-like): Where to write the JSON usage report
+                (tokens, latency and cost per segment, slide and job), or None. The report
+                is also kept in last_usage_report, and its job totals and most expensive
+                slides in last_report['usage'].
+            timer (JobTimer): Job timer of a caller that also times other phases (such as
+                downloads and uploads) and emits the timings itself. By default the file
+                gets its own timer, whose timings are logged as one JSON line when the
+                file is done. Either way the per-phase summary is kept in
+                last_report['timings'].
+            top_slides (int): Number of most expensive slides listed in the usage report.
             
         Returns:
             bool: True if translation is successful, False otherwise.
         """
+        engine = engine or self.engine
+        # The translator may be reused across files; report this file's usage only
+        tokens_at_start = self.tokens_used
+        stream_calls_at_start = self.stream_calls
+        started = time.monotonic()
+        own_timer = timer is None
+        if own_timer:
+            timer = JobTimer(file_label(input_file))
+            timer.start_profile()
+        succeeded = False
+        segments = []
+        failed = 0
         try:
-            logger.info(f"Processing PowerPoint file: {input_file}")
+            with span(timer, "load"):
+                package = self.open_package(input_file, engine)
             
-            # Load the presentation
-            prs = Presentation(input_file)
+            # Extract every translatable text element before calling the model
+            with span(timer, "extract"):
+                parts = text_parts(package)
+                slide_count = sum(1 for kind, _, _ in parts if kind == 'slide')
+                segments = self.collect_segments(package, parts)
+                unique_texts, occurrences = self.deduplicate_segments(segments)
+            log_phase(logger, 'extract', input_file=file_label(input_file), engine=engine,
+                      parts=len(parts), slides=slide_count, segments=len(segments),
+                      unique_segments=len(unique_texts))
             
-            # Count total items for progress tracking
-            total_shapes = sum(len(slide.shapes) for slide in prs.slides)
-            total_notes = sum(1 for slide in prs.slides if hasattr(slide, 'has_notes_slide') and slide.has_notes_slide and slide.notes_slide.notes_text_frame.text.strip())
-            total_items = total_shapes + total_notes
-            processed_items = 0
+            # Progress is weighted by how many segments each unique text fills
+            unit_weights = [0] * len(unique_texts)
+            unit_slides = [set() for _ in unique_texts]
+            for segment, unique_index in zip(segments, occurrences):
+                unit_weights[unique_index] += 1
+                if segment['slide'] is not None:
+                    unit_slides[unique_index].add(segment['slide'])
+            reporter = ProgressReporter(progress_callback, unit_weights, unit_slides, slide_count)
+            reporter.start()
             
-            with tqdm(total=total_items, desc="Translating content") as pbar:
-                for slide_idx, slide in enumerate(prs.slides):
-                    logger.info(f"Processing slide {slide_idx+1}/{len(prs.slides)}")
-                    
-                    # Process each shape in the slide
-                    for shape_idx, shape in enumerate(slide.shapes):
-                        # Handle text in shapes
-                        if hasattr(shape, "text_frame") and shape.text_frame.text.strip():
-                            original_text = shape.text_frame.text
-                            logger.info(f"Translating shape text: {original_text[:50]}...")
-                            
-                            # Translate the text frame with formatting preservation
-                            self.translate_text_frame(
-                                shape.text_frame, source_language, target_language,
-                                use_reasoning, temperature, max_tokens, top_p
-                            )
-                            
-                            logger.info(f"Translated shape text with preserved formatting")
-                        
-                        # Handle tables explicitly
-                        if hasattr(shape, "table"):
-                            logger.info(f"Processing table with {len(shape.table.rows)} rows and {len(shape.table.columns)} columns")
-                            for row_idx, row in enumerate(shape.table.rows):
-                                for col_idx, cell in enumerate(row.cells):
-                                    if cell.text_frame.text.strip():
-                                        original_cell_text = cell.text_frame.text
-                                        logger.info(f"Translating table cell [{row_idx},{col_idx}]: {original_cell_text[:50]}...")
-                                        
-                                        # Translate the cell text frame with formatting preservation
-                                        self.translate_text_frame(
-                                            cell.text_frame, source_language, target_language,
-                                            use_reasoning, temperature, max_tokens, top_p
-                                        )
-                                        
-                                        logger.info(f"Translated table cell with preserved formatting")
-                        
-                        processed_items += 1
-                        pbar.update(1)
-                    
-                    # Translate speaker notes if they exist
-                    if hasattr(slide, 'has_notes_slide') and slide.has_notes_slide:
-                        notes_slide = slide.notes_slide
-                        original_notes = notes_slide.notes_text_frame.text
-                        if original_notes.strip():
-                            logger.info(f"Translating speaker notes: {original_notes[:50]}...")
-                            
-                            # Translate the notes text frame with formatting preservation
-                            self.translate_text_frame(
-                                notes_slide.notes_text_frame, source_language, target_language,
-                                use_reasoning, temperature, max_tokens, top_p
-                            )
-                            
-                            logger.info(f"Translated speaker notes with preserved formatting")
-                        
-                        processed_items += 1
-                        pbar.update(1)
+            unique_usage = {}
+            with span(timer, "translate"):
+                unique_translations = self.translate_segments(
+                    unique_texts, source_language, target_language,
+                    use_reasoning, temperature, max_tokens, top_p, max_concurrency,
+                    on_complete=reporter.advance, usage=unique_usage, timer=timer
+                )
+            reporter.finish()
+            
+            # Write results back in document order
+            with span(timer, "write_back"):
+                for segment, unique_index in zip(segments, occurrences):
+                    translated_text = unique_translations[unique_index]
+                    if translated_text is None:
+                        failed += 1
+                        continue
+                    with log_context(slide=segment['slide'] + 1 if segment['slide'] is not None else None):
+                        if not self.write_segment(package, segment, translated_text):
+                            failed += 1
+            
+            if failed:
+                logger.warning("%d/%d segments were left untranslated", failed, len(segments))
             
             # Save the translated presentation
-            prs.save(output_file)
-            logger.info(f"Translated presentation saved to {output_file}")
+            with span(timer, "save"):
+                package.save(output_file)
+            
+            self.last_report = {
+                'input_file': file_label(input_file),
+                'output_file': file_label(output_file),
+                'engine': engine,
+                'slides': slide_count,
+                'segments': len(segments),
+                'unique_segments': len(unique_texts),
+                'duplicate_segments': len(segments) - len(unique_texts),
+                'dedup_ratio': round(1 - len(unique_texts) / len(segments), 4) if segments else 0.0,
+                'failed_segments': failed,
+                'tokens_used': self.tokens_used - tokens_at_start,
+                'rate_limiter': self.rate_limiter.stats()
+            }
+            if self.translation_memory is not None:
+                self.last_report['translation_memory'] = self.translation_memory.stats()
+            stream_report = self.stream_report(stream_calls_at_start)
+            if stream_report is not None:
+                self.last_report['streaming'] = stream_report
+            
+            self.last_usage_report = build_usage_report(segments, occurrences, unique_usage, self.model_id,
+                                                        top_slides)
+            self.last_report['usage'] = dict(self.last_usage_report['job'],
+                                             top_slides=self.last_usage_report['top_slides'])
+            if usage_report_file is not None:
+                write_json(usage_report_file, self.last_usage_report)
+            self.last_report['timings'] = timer.summary()
+            log_phase(logger, 'report', **self.last_report)
+            self.record_job_metrics(input_file, self.last_report, time.monotonic() - started)
+            succeeded = True
             return True
             
         except Exception as e:
             logger.error(f"File translation failed: {e}")
             return False
+        finally:
+            if not succeeded:
+                self.metrics.count("FailedDecks")
+            if own_timer:
+                timer.emit(status='succeeded' if succeeded else 'failed', engine=engine,
+                           segments=len(segments), failed_segments=failed,
+                           tokens_used=self.tokens_used - tokens_at_start)
+    
+    def record_job_metrics(self, input_file, report, seconds):
+        """
+        Buffer the metrics of a translated deck: its size, segment counts and throughput.
+        
+        Args:
+            input_file (str or file-like): The deck that was translated.
+            report (dict): The job's last_report, including its timings.
+            seconds (float): Time taken by translate_file.
+        """
+        metrics = self.metrics
+        metrics.count("Decks")
+        metrics.count("Segments", report['segments'])
+        metrics.count("UniqueSegments", report['unique_segments'])
+        metrics.count("FailedSegments", report['failed_segments'])
+        metrics.observe("DeckSlides", report['slides'], unit="Count")
+        metrics.observe("DeckSegments", report['segments'], unit="Count")
+        size = file_size(input_file)
+        if size is not None:
+            metrics.observe("DeckBytes", size, unit="Bytes")
+        translate_ms = report['timings'].get('translate', {}).get('total_ms')
+        if translate_ms:
+            metrics.observe("SegmentsPerSecond", round(report['segments'] / translate_ms * 1000, 2),
+                            unit="Count/Second")
+        metrics.observe("DeckDuration", round(seconds * 1000, 1))
     
     def translate_batch(self, texts, source_language="auto (en-US)", target_language="zh-TW", 
-                        use_reasoning=False, temperature=0.7, max_tokens=3000, top_p=0.9):
+                        use_reasoning=False, temperature=0.7, max_tokens=3000, top_p=0.9,
+                        max_concurrency=None, checkpoint_file=None):
         """
-        Translate a batch of texts with progress tracking.
+        Translate a batch of texts concurrently with progress tracking.
+        
+        Texts are translated through translate_segments, so they share its bounded thread
+        pool, translation memory, chunking and request packing. A failed text does not stop
+        the batch: its result is None and the error is listed in last_report['errors'].
+        
+        With a checkpoint file, every completed translation is appended to it as a JSON
+        line as soon as it is back. Rerunning the same batch with the same checkpoint file
+        only translates the texts that are not in it yet.
         
         Args:
             texts (list): List of texts to translate.
@@ -370,21 +1067,67 @@ class BedrockTranslator:
             temperature (float): Temperature for model creativity, default is 0.7.
             max_tokens (int): Maximum tokens for response, default is 3000.
             top_p (float): Top P for nucleus sampling, default is 0.9.
+            max_concurrency (int): Maximum concurrent Bedrock requests, defaults to the
+                translator's max_concurrency.
+            checkpoint_file (str): JSONL file of completed translations to resume from and
+                append to, or None.
             
         Returns:
-            list: List of translated texts.
-        """
-        results = []
-        for text in tqdm(texts, desc="Batch translation progress"):
-            if text.strip():
-                translated = self.translate(
-                    text, source_language, target_language, 
-                    use_reasoning, temperature, max_tokens, top_p
-                )
-                results.append(translated)
-            else:
-                results.append("")
-        logger.info(f"Completed batch translation of {len(texts)} texts")
+            list: Translated texts in input order; '' for blank texts and None for texts
+                that failed.
+        """
+        results = ["" if not text.strip() else None for text in texts]
+        
+        restored = 0
+        if checkpoint_file and os.path.exists(checkpoint_file):
+            with open(checkpoint_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        i = entry['index']
+                        # Ignore entries from a different input
+                        if 0 <= i < len(texts) and texts[i] == entry['text']:
+                            results[i] = entry['translation']
+                            restored += 1
+                    except (ValueError, KeyError, TypeError):
+                        # A line cut short by an interrupted run
+                        continue
+            logger.info(f"Restored {restored} translations from {checkpoint_file}")
+        
+        pending = [i for i, result in enumerate(results) if result is None]
+        errors = {}
+        checkpoint = open(checkpoint_file, 'a', encoding='utf-8') if checkpoint_file else None
+        
+        def on_result(position, translated):
+            i = pending[position]
+            results[i] = translated
+            if checkpoint is not None and translated is not None:
+                checkpoint.write(json.dumps({'index': i, 'text': texts[i], 'translation': translated},
+                                            ensure_ascii=False) + '\n')
+                checkpoint.flush()
+        
+        try:
+            self.translate_segments(
+                [texts[i] for i in pending], source_language, target_language,
+                use_reasoning, temperature, max_tokens, top_p, max_concurrency,
+                desc="Batch translation progress", on_result=on_result, errors=errors
+            )
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+        
+        failed = [
+            {'index': i, 'text': texts[i], 'error': errors.get(position, "Translation failed")}
+            for position, i in enumerate(pending) if results[i] is None
+        ]
+        self.last_report = {
+            'texts': len(texts),
+            'restored': restored,
+            'translated': len(pending) - len(failed),
+            'failed': len(failed),
+            'errors': failed
+        }
+        logger.info(f"Completed batch translation of {len(texts)} texts ({len(failed)} failed)")
         return results
     
     def download_from_s3(self, bucket, key, local_path):
@@ -407,6 +1150,56 @@ class BedrockTranslator:
             logger.error(f"Error downloading from S3: {e}")
             return False
     
+    def download_to_buffer(self, bucket, key, spool_max_size=DEFAULT_SPOOL_MAX_SIZE, spool_dir=None):
+        """
+        Stream an S3 object into a spooled temporary file.
+        
+        The object stays in memory unless it is larger than spool_max_size, in which case
+        it spills to a temporary file in spool_dir.
+        
+        Args:
+            bucket (str): S3 bucket name.
+            key (str): S3 object key.
+            spool_max_size (int): Bytes kept in memory before spilling to disk.
+            spool_dir (str): Directory for the spill file, defaults to the system default.
+            
+        Returns:
+            SpooledTemporaryFile: Buffer positioned at the start, or None on failure.
+        """
+        buffer = tempfile.SpooledTemporaryFile(max_size=spool_max_size, dir=spool_dir)
+        try:
+            body = self.s3_client.get_object(Bucket=bucket, Key=key)['Body']
+            for chunk in body.iter_chunks(S3_CHUNK_SIZE):
+                buffer.write(chunk)
+            buffer.seek(0)
+            logger.info(f"Downloaded file from S3: {bucket}/{key} into memory")
+            return buffer
+        except Exception as e:
+            buffer.close()
+            logger.error(f"Error downloading from S3: {e}")
+            return None
+    
+    def upload_from_buffer(self, buffer, bucket, key):
+        """
+        Upload a file-like object to S3, using multipart uploads for large files.
+        
+        Args:
+            buffer: Readable binary file object; it is uploaded from the start.
+            bucket (str): S3 bucket name.
+            key (str): S3 object key.
+            
+        Returns:
+            bool: True if upload is successful, False otherwise.
+        """
+        try:
+            buffer.seek(0)
+            self.s3_client.upload_fileobj(buffer, bucket, key, Config=S3_TRANSFER_CONFIG)
+            logger.info(f"Uploaded file to S3: {bucket}/{key} from memory")
+            return True
+        except Exception as e:
+            logger.error(f"Error uploading to S3: {e}")
+            return False
+    
     def upload_to_s3(self, local_path, bucket, key):
         """
         Upload a file to S3 from a local path.
@@ -427,57 +1220,506 @@ class BedrockTranslator:
             logger.error(f"Error uploading to S3: {e}")
             return False
 
+class StreamEcho:
+    """
+    Passes streamed text on to an on_text callback once, across retried streams.
+    
+    A retried stream starts over from the first token. While its text repeats what was
+    already passed on, nothing is forwarded; once it goes further, only the new text is.
+    If it diverges (sampling is not deterministic), STREAM_RESTART_MARKER is forwarded
+    and the new stream is shown from its start.
+    
+    Args:
+        on_text (callable): Receives each new piece of text.
+    """
+    
+    def __init__(self, on_text):
+        self.on_text = on_text
+        self.shown = ""
+        self.attempt = ""
+    
+    def restart(self):
+        """Start a new attempt; call before each stream is read."""
+        self.attempt = ""
+    
+    def __call__(self, piece):
+        self.attempt += piece
+        if self.shown.startswith(self.attempt):
+            return
+        if not self.attempt.startswith(self.shown):
+            self.on_text(STREAM_RESTART_MARKER)
+            self.shown = ""
+        self.on_text(self.attempt[len(self.shown):])
+        self.shown = self.attempt
+
+
+def write_json(file, data):
+    """
+    Write data as indented JSON to a path or a writable binary stream.
+    
+    Args:
+        file (str or file-like): Destination.
+        data: JSON-serializable data.
+    """
+    payload = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    if hasattr(file, 'write'):
+        file.write(payload)
+    else:
+        with open(file, 'wb') as f:
+            f.write(payload)
+
+def file_size(file):
+    """Return the size in bytes of a path or seekable stream, or None if it is unknown."""
+    try:
+        if isinstance(file, str):
+            return os.path.getsize(file)
+        position = file.tell()
+        file.seek(0, os.SEEK_END)
+        size = file.tell()
+        file.seek(position)
+        return size
+    except (OSError, AttributeError, ValueError):
+        return None
+
+def file_label(file):
+    """Return a path, or a readable name for a stream, for logs and reports."""
+    if isinstance(file, str):
+        return file
+    name = getattr(file, 'name', None)
+    return name if isinstance(name, str) else f"<{type(file).__name__}>"
+
+def update_job(jobs, job_id, **fields):
+    """
+    Update a translation job record, if the invocation belongs to a tracked job.
+    
+    Job store errors are logged and never fail the translation itself.
+    
+    Args:
+        jobs (JobTracker): Job tracker, or None.
+        job_id (str): Job ID, or None for untracked invocations.
+        **fields: Fields to merge into the job record.
+    """
+    if jobs is None or not job_id:
+        return
+    try:
+        jobs.update(job_id, **fields)
+    except Exception as e:
+        logger.error(f"Failed to update job {job_id}: {e}")
+
+_idle_translators = []
+_idle_translators_lock = threading.Lock()
+
+def acquire_translator():
+    """
+    Take a BedrockTranslator configured from the Lambda environment variables.
+    
+    Translators released by earlier records and warm invocations are reused, so their
+    clients and settings are only built once per container. Each acquired translator gets
+    a fresh translation memory front-end, so hit/miss counters are per record.
+    
+    Returns:
+        BedrockTranslator: A translator owned by the caller until release_translator().
+    """
+    with _idle_translators_lock:
+        translator = _idle_translators.pop() if _idle_translators else None
+    if translator is None:
+        translator = BedrockTranslator(
+            max_concurrency=int(os.environ.get('TRANSLATION_CONCURRENCY', DEFAULT_MAX_CONCURRENCY)),
+            batch_token_budget=int(os.environ.get('TRANSLATION_BATCH_TOKENS', 0)),
+            engine=os.environ.get('TRANSLATION_ENGINE', 'object'),
+            chunk_token_budget=int(os.environ.get('TRANSLATION_CHUNK_TOKENS', DEFAULT_CHUNK_TOKENS)),
+            streaming=os.environ.get('TRANSLATION_STREAMING', '').lower() in ('1', 'true', 'yes'),
+            stream_idle_timeout=float(os.environ.get('TRANSLATION_STREAM_IDLE_TIMEOUT', DEFAULT_STREAM_IDLE_TIMEOUT))
+        )
+    store = store_from_environment()
+    translator.translation_memory = TranslationMemory(store) if store is not None else None
+    return translator
+
+def release_translator(translator):
+    """Return a translator taken with acquire_translator() for reuse."""
+    with _idle_translators_lock:
+        _idle_translators.append(translator)
+
+def cleanup_stale_work_dirs():
+    """
+    Remove record work directories left in /tmp by earlier invocations.
+    
+    A Lambda container runs one invocation at a time, so any work directory present when
+    a new invocation starts belongs to an invocation that did not clean up after itself.
+    """
+    for path in glob.glob(os.path.join(LAMBDA_TMP_DIR, WORK_DIR_PREFIX + '*')):
+        shutil.rmtree(path, ignore_errors=True)
+
+def process_record(record, source_language, target_language, jobs=None, job_id=None):
+    """
+    Translate the file referenced by one S3 event record.
+    
+    The file is translated from and into in-memory buffers; files above
+    TRANSLATION_SPOOL_MAX_BYTES spill into a private work directory under /tmp, which is
+    removed when the record is done, whatever the outcome. Download, translation phases
+    and upload are timed, and the timings are logged as one JSON line per record (see
+    profiling.JobTimer; TRANSLATION_PROFILE adds a cProfile or tracemalloc capture).
+    
+    Args:
+        record (dict): S3 event record.
+        source_language (str): Source language.
+        target_language (str): Target language.
+        jobs (JobTracker): Job tracker, or None.
+        job_id (str): Job ID to update, or None for untracked records.
+        
+    Returns:
+        dict: Per-record result with 'bucket', 'key', 'status' ('succeeded' or 'failed')
+            and either 'outputBucket'/'outputKey' or 'error'.
+    """
+    bucket = record['s3']['bucket']['name']
+    key = record['s3']['object']['key']
+    output_key = f"translated/{key.split('/')[-1]}"
+    output_bucket = os.environ.get('TRANSLATED_BUCKET', bucket)
+    result = {'bucket': bucket, 'key': key}
+    
+    def fail(error):
+        update_job(jobs, job_id, status=JOB_FAILED, error=error)
+        result.update(status='failed', error=error)
+        return result
+    
+    def report_progress(event):
+        # Translation covers the first 90%, saving and uploading the rest
+        eta = event['eta_seconds']
+        update_job(
+            jobs, job_id, progress=int(event['percent'] * 0.9),
+            slidesDone=event['slides_done'], slidesTotal=event['slides_total'],
+            segmentsDone=event['segments_done'], segmentsTotal=event['segments_total'],
+            currentSlide=event['current_slide'], etaSeconds=eta,
+            estimatedCompletionAt=(datetime.datetime.now() + datetime.timedelta(seconds=eta)).isoformat()
+            if eta is not None else None
+        )
+    
+    timer = JobTimer(f"s3://{bucket}/{key}")
+    timer.start_profile()
+    update_job(jobs, job_id, status=JOB_PROCESSING, progress=0)
+    work_dir = tempfile.mkdtemp(prefix=WORK_DIR_PREFIX, dir=LAMBDA_TMP_DIR)
+    translator = None
+    input_buffer = None
+    output_buffer = None
+    report = {}
+    try:
+        translator = acquire_translator()
+        spool_max_size = int(os.environ.get('TRANSLATION_SPOOL_MAX_BYTES', DEFAULT_SPOOL_MAX_SIZE))
+        
+        # Files stay in memory end to end and only spill into the work directory if large
+        with span(timer, 'download'):
+            input_buffer = translator.download_to_buffer(bucket, key, spool_max_size, work_dir)
+        if input_buffer is None:
+            return fail("Failed to download input file from S3")
+        output_buffer = tempfile.SpooledTemporaryFile(max_size=spool_max_size, dir=work_dir)
+        if not translator.translate_file(input_buffer, output_buffer, source_language, target_language,
+                                         progress_callback=report_progress if jobs is not None else None,
+                                         timer=timer):
+            return fail("Failed to translate file")
+        
+        report = translator.last_report
+        update_job(
+            jobs, job_id,
+            slidesDone=report['slides'], slidesTotal=report['slides'],
+            segmentsDone=report['segments'] - report['failed_segments'],
+            segmentsTotal=report['segments'], tokensUsed=report['tokens_used'], usage=report['usage']
+        )
+        with span(timer, 'upload'):
+            uploaded = translator.upload_from_buffer(output_buffer, output_bucket, output_key)
+        if not uploaded:
+            return fail("Failed to upload translated file to S3")
+        if os.environ.get('TRANSLATION_USAGE_REPORT', '').lower() in ('1', 'true', 'yes'):
+            # Full per-segment report next to the translated file
+            usage_buffer = tempfile.SpooledTemporaryFile(max_size=spool_max_size, dir=work_dir)
+            with usage_buffer, span(timer, 'upload_usage_report'):
+                write_json(usage_buffer, translator.last_usage_report)
+                translator.upload_from_buffer(usage_buffer, output_bucket, output_key + '.usage.json')
+        
+        update_job(jobs, job_id, status=JOB_COMPLETED, progress=100,
+                   outputBucket=output_bucket, outputKey=output_key)
+        result.update(status='succeeded', outputBucket=output_bucket, outputKey=output_key)
+        return result
+    except Exception as e:
+        logger.error(f"Error processing {bucket}/{key}: {e}")
+        return fail(str(e))
+    finally:
+        for buffer in (input_buffer, output_buffer):
+            if buffer is not None:
+                buffer.close()
+        if translator is not None:
+            release_translator(translator)
+        shutil.rmtree(work_dir, ignore_errors=True)
+        timer.emit(status=result.get('status', 'failed'), job_id=job_id,
+                   segments=report.get('segments'), failed_segments=report.get('failed_segments'),
+                   tokens_used=report.get('tokens_used'))
+
 def lambda_handler(event, context):
     """
     Lambda function handler to process S3 events for translation jobs.
     
+    Every S3 record in the event is translated, up to TRANSLATION_RECORD_CONCURRENCY
+    records at a time, each in its own work directory under /tmp. Invocations started by
+    the translation API carry a jobId for their single record; its job record is updated
+    as the translation progresses so the API can report status and the result key.
+    Metrics recorded while the records are translated are flushed once, at the end of the
+    invocation (see metrics.MetricsRecorder).
+    
     Args:
         event (dict): Lambda event data.
         context (object): Lambda context object.
         
     Returns:
-        dict: Response with status code and message.
+        dict: Response with status code (200 if every record succeeded, 207 if some did,
+            500 if none did) and a body listing per-record results.
     """
-    logger.info("Lambda event received: %s", json.dumps(event))
-    
-    # Check if the event is from S3
-    if 'Records' in event and len(event['Records']) > 0:
-        record = event['Records'][0]
-        if 's3' in record:
-            bucket = record['s3']['bucket']['name']
-            key = record['s3']['object']['key']
-            local_input_path = '/tmp/input.pptx'
-            local_output_path = '/tmp/output.pptx'
-            output_key = f"translated/{key.split('/')[-1]}"
-            output_bucket = bucket  # Use the same bucket for output, or configure a different one if needed
-            
-            translator = BedrockTranslator()
-            if translator.download_from_s3(bucket, key, local_input_path):
-                if translator.translate_file(local_input_path, local_output_path, target_language="zh-TW"):
-                    if translator.upload_to_s3(local_output_path, output_bucket, output_key):
-                        return {
-                            'statusCode': 200,
-                            'body': json.dumps(f"Successfully translated {key} and uploaded to {output_bucket}/{output_key}")
-                        }
-                    else:
-                        return {
-                            'statusCode': 500,
-                            'body': json.dumps("Failed to upload translated file to S3")
-                        }
-                else:
-                    return {
-                        'statusCode': 500,
-                        'body': json.dumps("Failed to translate file")
-                    }
-            else:
-                return {
-                    'statusCode': 500,
-                    'body': json.dumps("Failed to download input file from S3")
-                }
+    job_id = event.get('jobId')
+    request_id = getattr(context, 'aws_request_id', None)
+    log_phase(logger, 'event', requestId=request_id, jobId=job_id, records=len(event.get('Records', [])))
+    logger.debug("Lambda event received: %s", LazyJson(event))
+    jobs = tracker_from_environment() if job_id else None
+    
+    metrics = get_metrics()
+    metrics.set_property('requestId', request_id)
+    
+    records = [record for record in event.get('Records', []) if 's3' in record]
+    if not records:
+        update_job(jobs, job_id, status=JOB_FAILED, error="Invalid event format or no S3 event found")
+        metrics.count('InvalidEvents')
+        metrics.flush()
+        return {
+            'statusCode': 400,
+            'body': json.dumps("Invalid event format or no S3 event found")
+        }
+    if job_id and len(records) > 1:
+        logger.warning(f"Job {job_id} covers {len(records)} records; job status is not tracked per record")
+        jobs = None
+    
+    cleanup_stale_work_dirs()
+    source_language = event.get('sourceLanguage', 'auto (en-US)')
+    target_language = event.get('targetLanguage', 'zh-TW')
+    record_concurrency = int(os.environ.get('TRANSLATION_RECORD_CONCURRENCY', DEFAULT_RECORD_CONCURRENCY))
+    
+    def run_record(record):
+        # Every record logged while translating carries its request, job and key
+        with log_context(requestId=request_id, jobId=job_id, key=record['s3']['object']['key']):
+            return process_record(record, source_language, target_language, jobs, job_id)
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(record_concurrency, len(records)))) as executor:
+        results = list(executor.map(run_record, records))
+    
+    succeeded = sum(1 for result in results if result['status'] == 'succeeded')
+    if succeeded == len(results):
+        status_code = 200
+    elif succeeded:
+        status_code = 207
+    else:
+        status_code = 500
+    log_phase(logger, 'records', requestId=request_id, jobId=job_id, records=len(results), succeeded=succeeded)
+    # One flush per invocation: metrics of every record leave in the same EMF documents
+    metrics.count('Records', len(results))
+    metrics.count('FailedRecords', len(results) - succeeded)
+    metrics.flush()
     return {
-        'statusCode': 400,
-        'body': json.dumps("Invalid event format or no S3 event found")
+        'statusCode': status_code,
+        'body': json.dumps({
+            'message': f"Translated {succeeded} of {len(results)} files",
+            'results': results
+        })
+    }
+
+_dir_worker_translator = None
+_dir_worker_store = None
+
+def init_dir_worker(translator_options, cache_db):
+    """
+    Set up a directory mode worker process.
+    
+    Each worker process builds one translator, with its own clients, segment-level
+    concurrency and connection to the translation memory, and reuses it for every deck.
+    
+    Args:
+        translator_options (dict): BedrockTranslator keyword arguments.
+        cache_db (str): SQLite translation memory path, or None to disable the memory.
+    """
+    global _dir_worker_translator, _dir_worker_store
+    _dir_worker_store = SQLiteStore(cache_db) if cache_db else None
+    _dir_worker_translator = BedrockTranslator(**translator_options)
+
+def translate_deck(location, relative, destination, translate_options):
+    """
+    Translate one deck in a directory mode worker process.
+    
+    Args:
+        location (str): Local path or s3:// URI of the deck.
+        relative (str): Path of the deck relative to the source directory or prefix.
+        destination (str): Output directory or s3://bucket/prefix.
+        translate_options (dict): translate_file keyword arguments (languages and
+            model settings).
+        
+    Returns:
+        dict: Result with 'relative', 'status' ('succeeded' or 'failed'), 'seconds',
+            'segments', 'unique_segments', 'failed_segments', 'cache_hits', 'tokens_used'
+            and, on failure, 'error'.
+    """
+    started = time.monotonic()
+    translator = _dir_worker_translator
+    translator.translation_memory = TranslationMemory(_dir_worker_store) if _dir_worker_store else None
+    result = {'relative': relative, 'status': 'failed'}
+    input_buffer = output_buffer = None
+    try:
+        input_location = split_s3_uri(location)
+        if input_location is not None:
+            input_buffer = translator.download_to_buffer(*input_location)
+            if input_buffer is None:
+                raise Exception(f"Failed to download {location}")
+            input_file = input_buffer
+        else:
+            input_file = location
+        
+        output_location = split_s3_uri(destination)
+        if output_location is not None:
+            output_buffer = tempfile.SpooledTemporaryFile(max_size=DEFAULT_SPOOL_MAX_SIZE)
+            output_file = output_buffer
+        else:
+            output_file = os.path.join(destination, relative)
+            os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        
+        with log_context(deck=relative):
+            translated = translator.translate_file(input_file, output_file, **translate_options)
+        if not translated:
+            raise Exception("Translation failed")
+        if output_location is not None:
+            bucket, prefix = output_location
+            key = f"{prefix.rstrip('/')}/{relative}".lstrip('/')
+            if not translator.upload_from_buffer(output_buffer, bucket, key):
+                raise Exception(f"Failed to upload s3://{bucket}/{key}")
+        
+        report = translator.last_report
+        result.update({
+            'status': 'succeeded',
+            'segments': report['segments'],
+            'unique_segments': report['unique_segments'],
+            'failed_segments': report['failed_segments'],
+            'cache_hits': report.get('translation_memory', {}).get('hits', 0),
+            'tokens_used': report['tokens_used']
+        })
+    except Exception as e:
+        logger.error(f"Error translating {location}: {e}")
+        result['error'] = str(e)
+    finally:
+        for buffer in (input_buffer, output_buffer):
+            if buffer is not None:
+                buffer.close()
+        # Each worker process buffers its own metrics, and the access times of its cache hits
+        translator.metrics.flush()
+        if _dir_worker_store is not None:
+            try:
+                _dir_worker_store.flush()
+            except Exception as e:
+                logger.warning(f"Could not update translation memory access times: {e}")
+    result['seconds'] = round(time.monotonic() - started, 2)
+    return result
+
+def load_dir_state(state_file):
+    """
+    Read the directory mode state file.
+    
+    Args:
+        state_file (str): JSONL file with one result per line, latest last.
+        
+    Returns:
+        dict: Latest result per relative deck path.
+    """
+    state = {}
+    if os.path.exists(state_file):
+        with open(state_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    state[entry['relative']] = entry
+                except (ValueError, KeyError):
+                    # A line cut short by an interrupted run
+                    continue
+    return state
+
+def translate_directory(source, destination, translator_options, translate_options,
+                        processes=DEFAULT_DIR_PROCESSES, state_file=None, cache_db=None,
+                        region_name="us-west-2"):
+    """
+    Translate every .pptx under a directory or S3 prefix with a pool of worker processes.
+    
+    Decks go to the same relative paths under `destination`. Each finished deck is
+    appended to `state_file`; decks recorded there as succeeded, and unchanged since, are
+    skipped, so an interrupted run picks up where it stopped.
+    
+    Args:
+        source (str): Input directory or s3://bucket/prefix.
+        destination (str): Output directory or s3://bucket/prefix.
+        translator_options (dict): BedrockTranslator keyword arguments for the workers.
+        translate_options (dict): translate_file keyword arguments.
+        processes (int): Number of worker processes.
+        state_file (str): Resumable state file, defaults to DEFAULT_STATE_FILE in the
+            output directory (or the current directory for S3 output).
+        cache_db (str): SQLite translation memory path, or None to disable the memory.
+        region_name (str): AWS region used to list S3 prefixes.
+        
+    Returns:
+        dict: Summary of the run.
+    """
+    started = time.monotonic()
+    if state_file is None:
+        state_dir = destination if split_s3_uri(destination) is None else os.getcwd()
+        state_file = os.path.join(state_dir, DEFAULT_STATE_FILE)
+    os.makedirs(os.path.dirname(os.path.abspath(state_file)), exist_ok=True)
+    state = load_dir_state(state_file)
+    
+    decks = list_decks(source, get_client('s3', region_name))
+    pending = []
+    for location, relative, fingerprint in decks:
+        previous = state.get(relative)
+        if previous and previous['status'] == 'succeeded' and previous.get('fingerprint') == fingerprint:
+            continue
+        pending.append((location, relative, fingerprint))
+    logger.info(f"Found {len(decks)} decks, {len(decks) - len(pending)} already translated")
+    
+    summary = {
+        'decks': len(decks),
+        'skipped': len(decks) - len(pending),
+        'succeeded': 0,
+        'failed': 0,
+        'segments': 0,
+        'unique_segments': 0,
+        'failed_segments': 0,
+        'cache_hits': 0,
+        'tokens_used': 0,
+        'deck_seconds': 0.0,
+        'failures': []
     }
+    with open(state_file, 'a', encoding='utf-8') as state_out, \
+            ProcessPoolExecutor(max_workers=max(1, processes), initializer=init_dir_worker,
+                                initargs=(translator_options, cache_db)) as executor:
+        futures = {
+            executor.submit(translate_deck, location, relative, destination, translate_options): fingerprint
+            for location, relative, fingerprint in pending
+        }
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Translating decks"):
+            result = future.result()
+            result['fingerprint'] = futures[future]
+            state_out.write(json.dumps(result, ensure_ascii=False) + '\n')
+            state_out.flush()
+            summary[result['status']] += 1
+            summary['deck_seconds'] += result['seconds']
+            if result['status'] == 'failed':
+                summary['failures'].append({'deck': result['relative'], 'error': result['error']})
+                continue
+            for field in ('segments', 'unique_segments', 'failed_segments', 'cache_hits', 'tokens_used'):
+                summary[field] += result[field]
+    
+    summary['deck_seconds'] = round(summary['deck_seconds'], 2)
+    summary['elapsed_seconds'] = round(time.monotonic() - started, 2)
+    summary['state_file'] = state_file
+    log_phase(logger, 'directory_summary', **summary)
+    return summary
 
 def main():
     """
@@ -485,10 +1727,12 @@ def main():
     Supports interactive, file-based, and batch translation modes.
     """
     parser = argparse.ArgumentParser(description="PowerPoint Translator using AWS Bedrock Claude 3.5 Sonnet")
-    parser.add_argument("--mode", choices=["interactive", "file", "batch"], 
-                        default="file", help="Translation mode: interactive, file, or batch")
-    parser.add_argument("--input", help="Input file path for file mode or batch mode input list")
-    parser.add_argument("--output", help="Output file path for file mode or batch mode results")
+    parser.add_argument("--mode", choices=["interactive", "file", "batch", "dir", "bulk"], 
+                        default="file", help="Translation mode: interactive, file, batch, dir, or bulk")
+    parser.add_argument("--input", help="Input file path for file mode, batch mode input list, "
+                                        "or directory / s3://bucket/prefix of decks for dir and bulk modes")
+    parser.add_argument("--output", help="Output file path for file mode, batch mode results, "
+                                         "or directory / s3://bucket/prefix for dir and bulk modes")
     parser.add_argument("--source-lang", default="auto (en-US)", help="Source language for translation")
     parser.add_argument("--target-lang", default="zh-TW", help="Target language for translation")
     parser.add_argument("--region", default="us-west-2", help="AWS region for Bedrock service")
@@ -497,9 +1741,43 @@ def main():
     parser.add_argument("--temperature", type=float, default=0.7, 
                         help="Temperature for model creativity (0.0 to 1.0)")
     parser.add_argument("--max-tokens", type=int, default=3000, 
-                        help="Maximum tokens for model response")
+                        help="Upper bound on model response tokens; each request is sized from its input")
     parser.add_argument("--top-p", type=float, default=0.9, 
                         help="Top P for nucleus sampling (0.0 to 1.0)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY,
+                        help="Maximum concurrent Bedrock requests in file mode")
+    parser.add_argument("--batch-tokens", type=int, default=0,
+                        help="Pack short segments into batched requests of up to this many input tokens (0 disables)")
+    parser.add_argument("--chunk-tokens", type=int, default=DEFAULT_CHUNK_TOKENS,
+                        help="Split text frames longer than this many input tokens into separately translated chunks")
+    parser.add_argument("--cache-db", default=DEFAULT_CACHE_DB,
+                        help="SQLite translation memory file shared across runs")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Disable the translation memory and always call the model")
+    parser.add_argument("--engine", choices=ENGINES, default="object",
+                        help="File mode engine: python-pptx object model, or direct slide XML access")
+    parser.add_argument("--checkpoint",
+                        help="Batch mode checkpoint file for resuming (default: <output>.checkpoint.jsonl)")
+    parser.add_argument("--processes", type=int, default=DEFAULT_DIR_PROCESSES,
+                        help="Worker processes in dir mode, each with --concurrency Bedrock requests")
+    parser.add_argument("--state-file",
+                        help=f"Dir mode resumable state file (default: {DEFAULT_STATE_FILE} in the output directory)")
+    parser.add_argument("--bulk-backend", choices=["bedrock", "local"], default="bedrock",
+                        help="Bulk mode backend: Bedrock batch inference, or a local stand-in using synchronous calls")
+    parser.add_argument("--bulk-work-dir",
+                        help="Bulk mode work directory for batch files and the resumable manifest")
+    parser.add_argument("--bulk-s3-uri", help="s3://bucket/prefix where bulk mode stages batch job input and output")
+    parser.add_argument("--bulk-role-arn", help="IAM role Bedrock assumes to run bulk mode batch jobs")
+    parser.add_argument("--poll-seconds", type=int, default=DEFAULT_POLL_SECONDS,
+                        help="Seconds between bulk mode batch job status checks")
+    parser.add_argument("--usage-report", action="store_true",
+                        help="File mode: write token, latency and cost figures to <output>.usage.json")
+    parser.add_argument("--top-slides", type=int, default=DEFAULT_TOP_SLIDES,
+                        help="File mode: number of most expensive slides to list in the summary")
+    parser.add_argument("--stream", action="store_true",
+                        help="Use the streaming Converse API; interactive mode prints text as it arrives")
+    parser.add_argument("--stream-idle-timeout", type=float, default=DEFAULT_STREAM_IDLE_TIMEOUT,
+                        help="Seconds a streamed response may stall before the call is retried")
     parser.add_argument("--s3-input-bucket", help="S3 bucket for input file in cloud mode")
     parser.add_argument("--s3-input-key", help="S3 key for input file in cloud mode")
     parser.add_argument("--s3-output-bucket", help="S3 bucket for output file in cloud mode")
@@ -508,7 +1786,12 @@ def main():
     args = parser.parse_args()
     
     # Create translator instance
-    translator = BedrockTranslator(region_name=args.region)
+    translation_memory = None if args.no_cache else TranslationMemory(SQLiteStore(args.cache_db))
+    translator = BedrockTranslator(region_name=args.region, max_concurrency=args.concurrency,
+                                   batch_token_budget=args.batch_tokens,
+                                   translation_memory=translation_memory, engine=args.engine,
+                                   chunk_token_budget=args.chunk_tokens, streaming=args.stream,
+                                   stream_idle_timeout=args.stream_idle_timeout)
     
     if args.mode == "interactive":
         print("===== AWS Bedrock Claude 3.5 PowerPoint Translator =====")
@@ -525,32 +1808,45 @@ def main():
             
             # Perform translation
             try:
-                translated_text = translator.translate(
-                    text, source_lang, target_lang, args.use_reasoning, 
-                    args.temperature, args.max_tokens, args.top_p
-                )
-                print("\nTranslated Text:")
-                print(translated_text)
+                if args.stream:
+                    # Print the translation as it arrives
+                    print("\nTranslated Text:")
+                    translator.translate(
+                        text, source_lang, target_lang, args.use_reasoning,
+                        args.temperature, args.max_tokens, args.top_p,
+                        on_text=lambda piece: print(piece, end="", flush=True)
+                    )
+                    print()
+                else:
+                    translated_text = translator.translate(
+                        text, source_lang, target_lang, args.use_reasoning, 
+                        args.temperature, args.max_tokens, args.top_p
+                    )
+                    print("\nTranslated Text:")
+                    print(translated_text)
                 print("-" * 50)
             except Exception as e:
                 print(f"Error during translation: {e}")
     
     elif args.mode == "file":
         if args.s3_input_bucket and args.s3_input_key and args.s3_output_bucket and args.s3_output_key:
-            # Cloud deployment mode with S3 integration (manual testing)
-            local_input_path = '/tmp/input.pptx'
-            local_output_path = '/tmp/output.pptx'
-            if translator.download_from_s3(args.s3_input_bucket, args.s3_input_key, local_input_path):
-                if translator.translate_file(
-                    local_input_path, local_output_path, args.source_lang, args.target_lang,
+            # Cloud deployment mode with S3 integration (manual testing); like
+            # process_record, files stay in memory and only spill to disk if large
+            spool_max_size = int(os.environ.get('TRANSLATION_SPOOL_MAX_BYTES', DEFAULT_SPOOL_MAX_SIZE))
+            input_buffer = translator.download_to_buffer(args.s3_input_bucket, args.s3_input_key, spool_max_size)
+            if input_buffer is None:
+                print("Failed to download input file from S3.")
+                return
+            with input_buffer, tempfile.SpooledTemporaryFile(max_size=spool_max_size) as output_buffer:
+                if not translator.translate_file(
+                    input_buffer, output_buffer, args.source_lang, args.target_lang,
                     args.use_reasoning, args.temperature, args.max_tokens, args.top_p
                 ):
-                    translator.upload_to_s3(local_output_path, args.s3_output_bucket, args.s3_output_key)
+                    print("Failed to translate file.")
+                elif translator.upload_from_buffer(output_buffer, args.s3_output_bucket, args.s3_output_key):
                     print("File translated and uploaded to S3 successfully.")
                 else:
-                    print("Failed to translate file.")
-            else:
-                print("Failed to download input file from S3.")
+                    print("Failed to upload translated file to S3.")
         else:
             if not args.input:
                 print("Error: File mode requires an input file path.")
@@ -562,10 +1858,28 @@ def main():
             print(f"Translating file: {args.input} to {output_path}")
             success = translator.translate_file(
                 args.input, output_path, args.source_lang, args.target_lang,
-                args.use_reasoning, args.temperature, args.max_tokens, args.top_p
+                args.use_reasoning, args.temperature, args.max_tokens, args.top_p,
+                usage_report_file=output_path + ".usage.json" if args.usage_report else None,
+                top_slides=args.top_slides
             )
             if success:
                 print(f"File translated successfully and saved to {output_path}")
+                report = translator.last_report
+                print(f"Segments: {report['segments']} ({report['unique_segments']} unique, "
+                      f"dedup ratio {report['dedup_ratio']:.1%})")
+                usage = report['usage']
+                print(f"Usage: {usage['input_tokens']} input / {usage['output_tokens']} output tokens "
+                      f"in {usage['calls']:g} calls, {usage['latency_ms'] / 1000:.1f}s model time, "
+                      f"${usage['cost_usd']:.4f}")
+                top_slides = translator.last_usage_report['top_slides']
+                if top_slides:
+                    print("Most expensive slides:")
+                    for row in top_slides:
+                        label = f"Slide {row['slide']}" if row['slide'] is not None else "Masters/layouts"
+                        print(f"  {label}: ${row['cost_usd']:.4f}, {row['input_tokens']} input / "
+                              f"{row['output_tokens']} output tokens, {row['latency_ms'] / 1000:.1f}s")
+                if args.usage_report:
+                    print(f"Usage report saved to {output_path}.usage.json")
             else:
                 print("File translation failed. Check logs for details.")
     
@@ -579,25 +1893,94 @@ def main():
             with open(args.input, 'r', encoding='utf-8') as f:
                 texts = [line.strip() for line in f if line.strip()]
             
+            # Completed translations are checkpointed next to the output so reruns resume
+            checkpoint_file = args.checkpoint or (args.output + ".checkpoint.jsonl" if args.output else None)
             print(f"Starting batch translation of {len(texts)} texts...")
             translated_texts = translator.translate_batch(
                 texts, args.source_lang, args.target_lang,
-                args.use_reasoning, args.temperature, args.max_tokens, args.top_p
+                args.use_reasoning, args.temperature, args.max_tokens, args.top_p,
+                checkpoint_file=checkpoint_file
             )
+            errors = {error['index']: error['error'] for error in translator.last_report['errors']}
             
             # Save results if output file is specified
             if args.output:
                 with open(args.output, 'w', encoding='utf-8') as f:
-                    for original, translated in zip(texts, translated_texts):
-                        f.write(f"Original: {original}\nTranslated: {translated}\n\n")
+                    for i, (original, translated) in enumerate(zip(texts, translated_texts)):
+                        if i in errors:
+                            f.write(f"Original: {original}\nError: {errors[i]}\n\n")
+                        else:
+                            f.write(f"Original: {original}\nTranslated: {translated}\n\n")
                 print(f"Batch translation results saved to {args.output}")
             else:
                 for i, (original, translated) in enumerate(zip(texts, translated_texts)):
                     print(f"[{i+1}] Original: {original}")
-                    print(f"[{i+1}] Translated: {translated}\n")
+                    if i in errors:
+                        print(f"[{i+1}] Error: {errors[i]}\n")
+                    else:
+                        print(f"[{i+1}] Translated: {translated}\n")
+            if errors:
+                print(f"{len(errors)}/{len(texts)} texts failed; rerun with the same checkpoint to retry them.")
                     
         except Exception as e:
             print(f"Error during batch translation: {e}")
+    
+    elif args.mode == "dir":
+        if not args.input or not args.output:
+            print("Error: Dir mode requires an input and an output directory or S3 prefix.")
+            return
+        translator_options = {
+            'region_name': args.region,
+            'max_concurrency': args.concurrency,
+            'batch_token_budget': args.batch_tokens,
+            'engine': args.engine,
+            'chunk_token_budget': args.chunk_tokens,
+            'streaming': args.stream,
+            'stream_idle_timeout': args.stream_idle_timeout
+        }
+        translate_options = {
+            'source_language': args.source_lang,
+            'target_language': args.target_lang,
+            'use_reasoning': args.use_reasoning,
+            'temperature': args.temperature,
+            'max_tokens': args.max_tokens,
+            'top_p': args.top_p
+        }
+        summary = translate_directory(
+            args.input, args.output, translator_options, translate_options,
+            processes=args.processes, state_file=args.state_file,
+            cache_db=None if args.no_cache else args.cache_db, region_name=args.region
+        )
+        print(f"Translated {summary['succeeded']} decks ({summary['skipped']} skipped, {summary['failed']} failed) "
+              f"in {summary['elapsed_seconds']}s: {summary['segments']} segments, "
+              f"{summary['cache_hits']} cache hits, {summary['failed_segments']} failed segments")
+        for failure in summary['failures']:
+            print(f"  {failure['deck']}: {failure['error']}")
+    
+    elif args.mode == "bulk":
+        if not args.input or not args.output:
+            print("Error: Bulk mode requires an input and an output directory or S3 prefix.")
+            return
+        if args.bulk_backend == "bedrock":
+            if not args.bulk_s3_uri or not args.bulk_role_arn:
+                print("Error: The bedrock bulk backend requires --bulk-s3-uri and --bulk-role-arn.")
+                return
+            backend = BedrockBatchBackend(args.bulk_s3_uri, args.bulk_role_arn, translator.model_id, args.region)
+        else:
+            backend = LocalBatchBackend(translator)
+        work_dir = args.bulk_work_dir or tempfile.mkdtemp(prefix="ppt-bulk-")
+        print(f"Bulk translating {args.input} to {args.output} (work directory {work_dir})")
+        bulk = BulkTranslation(
+            translator, backend, work_dir, args.source_lang, args.target_lang,
+            args.use_reasoning, args.temperature, args.max_tokens, args.top_p,
+            engine=args.engine, poll_seconds=args.poll_seconds
+        )
+        report = bulk.run(args.input, args.output)
+        print(f"Translated {report['decks_written']}/{report['decks']} decks: {report['segments']} segments "
+              f"({report['unique_segments']} unique, {report['batch_records']} batch records, "
+              f"{report['failed_segments']} failed)")
 
 if __name__ == "__main__":
     main()
+    # Written only if TRANSLATION_METRICS_SINK selects a sink
+    get_metrics().flush()
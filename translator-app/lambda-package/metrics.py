@@ -0,0 +1,199 @@
+"""
+In-process metrics, flushed as CloudWatch Embedded Metric Format (EMF) documents.
+
+Counters and histograms are buffered in memory while an invocation runs; recording a
+value never calls an AWS API. flush() turns the buffer into EMF JSON documents and hands
+them to a sink. On Lambda the default sink prints them to stdout, where CloudWatch Logs
+extracts the metrics; tests and local runs can collect them with MemorySink instead.
+
+Environment:
+    TRANSLATION_METRICS_SINK: 'stdout' (default on Lambda), 'log' (the metrics logger),
+        or 'none' (default elsewhere).
+    TRANSLATION_METRICS_NAMESPACE: CloudWatch namespace, default 'PowerPointTranslator'.
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+from debug_utils import setup_logger
+
+logger = setup_logger(__name__)
+
+DEFAULT_NAMESPACE = "PowerPointTranslator"
+
+# EMF limits: metrics per document and values per metric
+MAX_METRICS_PER_DOCUMENT = 100
+MAX_VALUES_PER_METRIC = 100
+
+# Sinks selectable with TRANSLATION_METRICS_SINK
+SINKS = ("stdout", "log", "none")
+
+
+class StdoutSink:
+    """Print each document as one line on stdout (the Lambda EMF path)."""
+
+    def write(self, document):
+        sys.stdout.write(json.dumps(document, separators=(",", ":"), default=str) + "\n")
+        sys.stdout.flush()
+
+
+class LogSink:
+    """Log each document through the metrics logger, e.g. to read them next to the logs."""
+
+    def write(self, document):
+        logger.info("metrics %s", json.dumps(document, default=str))
+
+
+class MemorySink:
+    """Keep documents in `documents`, for tests and local runs."""
+
+    def __init__(self):
+        self.documents = []
+
+    def write(self, document):
+        self.documents.append(document)
+
+
+class NullSink:
+    """Drop every document."""
+
+    def write(self, document):
+        pass
+
+
+def sink_from_environment():
+    """Return the sink named by TRANSLATION_METRICS_SINK (stdout on Lambda, none elsewhere)."""
+    default = "stdout" if os.environ.get("AWS_LAMBDA_FUNCTION_NAME") else "none"
+    name = os.environ.get("TRANSLATION_METRICS_SINK", default).lower()
+    if name == "stdout":
+        return StdoutSink()
+    if name == "log":
+        return LogSink()
+    if name != "none":
+        logger.warning(f"Unknown TRANSLATION_METRICS_SINK {name!r}; metrics are disabled")
+    return NullSink()
+
+
+class MetricsRecorder:
+    """
+    Buffers counters, histograms and properties until flush().
+
+    Counters are summed and emitted as one value per flush. Histogram values are kept
+    individually so that CloudWatch can compute percentiles; more than
+    MAX_VALUES_PER_METRIC values are spread over several documents. Every metric shares
+    the recorder's dimensions.
+
+    Args:
+        namespace (str): CloudWatch namespace, defaults to TRANSLATION_METRICS_NAMESPACE.
+        dimensions (dict): Dimension names and values, defaults to the Lambda function name.
+        sink: Object with a write(document) method, defaults to sink_from_environment().
+    """
+
+    def __init__(self, namespace=None, dimensions=None, sink=None):
+        self.namespace = namespace or os.environ.get("TRANSLATION_METRICS_NAMESPACE", DEFAULT_NAMESPACE)
+        if dimensions is None:
+            dimensions = {"FunctionName": os.environ.get("AWS_LAMBDA_FUNCTION_NAME", "local")}
+        self.dimensions = dict(dimensions)
+        self.sink = sink if sink is not None else sink_from_environment()
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._properties = {}
+
+    def count(self, name, value=1, unit="Count"):
+        """Add `value` to a counter."""
+        with self._lock:
+            total, _ = self._counters.get(name, (0, unit))
+            self._counters[name] = (total + value, unit)
+
+    def observe(self, name, value, unit="Milliseconds"):
+        """Add one value to a histogram."""
+        with self._lock:
+            self._histograms.setdefault(name, ([], unit))[0].append(value)
+
+    def set_property(self, name, value):
+        """Attach a searchable (non-metric) field, such as a request ID, to the next flush."""
+        with self._lock:
+            self._properties[name] = value
+
+    def flush(self):
+        """
+        Emit the buffered metrics as EMF documents and clear the buffer.
+
+        Sink errors are logged and never raised, so metrics cannot fail an invocation.
+
+        Returns:
+            list: The documents written.
+        """
+        with self._lock:
+            counters, self._counters = self._counters, {}
+            histograms, self._histograms = self._histograms, {}
+            properties, self._properties = self._properties, {}
+        documents = self.documents(counters, histograms, properties)
+        for document in documents:
+            try:
+                self.sink.write(document)
+            except Exception as e:
+                logger.error(f"Failed to write metrics: {e}")
+        return documents
+
+    def documents(self, counters, histograms, properties):
+        """Build EMF documents, splitting them at the EMF metric and value limits."""
+        # (name, unit, values) slices of at most MAX_VALUES_PER_METRIC values
+        slices = [(name, unit, [total]) for name, (total, unit) in counters.items()]
+        for name, (values, unit) in histograms.items():
+            for start in range(0, len(values), MAX_VALUES_PER_METRIC):
+                slices.append((name, unit, values[start:start + MAX_VALUES_PER_METRIC]))
+
+        # A metric name can appear once per document, so later slices go to later documents
+        pending = []
+        for name, unit, values in slices:
+            for batch in pending:
+                if name not in batch and len(batch) < MAX_METRICS_PER_DOCUMENT:
+                    batch[name] = (unit, values)
+                    break
+            else:
+                pending.append({name: (unit, values)})
+
+        timestamp = int(time.time() * 1000)
+        documents = []
+        for batch in pending:
+            document = dict(properties)
+            document.update(self.dimensions)
+            document["_aws"] = {
+                "Timestamp": timestamp,
+                "CloudWatchMetrics": [{
+                    "Namespace": self.namespace,
+                    "Dimensions": [sorted(self.dimensions)],
+                    "Metrics": [{"Name": name, "Unit": unit} for name, (unit, _) in batch.items()]
+                }]
+            }
+            for name, (_, values) in batch.items():
+                document[name] = values[0] if len(values) == 1 else values
+            documents.append(document)
+        return documents
+
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+def get_metrics():
+    """
+    Return the process-wide metrics recorder, creating it on first use.
+
+    Returns:
+        MetricsRecorder: The shared recorder.
+    """
+    global _recorder
+    with _recorder_lock:
+        if _recorder is None:
+            _recorder = MetricsRecorder()
+        return _recorder
+
+
+def set_sink(sink):
+    """Send the process-wide recorder's documents to `sink`, e.g. a MemorySink in tests."""
+    get_metrics().sink = sink
@@ -1,15 +1,11 @@
 import json
-import boto3
+from aws_clients import get_client
 import os
-import logging
+from debug_utils import setup_logger
 from botocore.exceptions import ClientError
 
 # Set up logging with detailed format
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+logger = setup_logger(__name__)
 
 def generate_presigned_url(bucket_name, object_key, operation='get_object', expiration=3600):
     """
@@ -24,7 +20,7 @@ def generate_presigned_url(bucket_name, object_key, operation='get_object', expi
     Returns:
         str: Presigned URL for the specified operation on the S3 object.
     """
-    s3_client = boto3.client('s3')
+    s3_client = get_client('s3')
     try:
         response = s3_client.generate_presigned_url(
             ClientMethod=operation,
@@ -0,0 +1,222 @@
+"""
+Per-phase timing spans and optional profiling for translation jobs.
+
+A JobTimer is created per job and handed to every stage of the pipeline. Stages wrap
+their work in `span(timer, phase)`, which records the elapsed wall time under the phase
+name (load, extract, model_call, write_back, save, upload, ...). Spans may be recorded
+from any thread. At the end of the job, summary() turns the recorded spans into a count,
+total, p50, p95 and maximum per phase, and emit() logs the whole breakdown as a single
+structured record (one JSON line with LOG_FORMAT=json).
+
+TRANSLATION_PROFILE turns on heavier capture for the duration of the job:
+'cprofile' profiles the thread running the job (model calls in worker threads show up
+as time spent waiting on them), 'tracemalloc' traces Python allocations, and
+'cprofile,tracemalloc' does both. The top entries of each are added to the JSON line.
+Both are process-wide, so concurrent jobs take turns: a job that cannot profile because
+another job (or code outside the translator) already does records why under 'skipped'.
+"""
+import cProfile
+import logging
+import math
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from debug_utils import log_phase, setup_logger
+
+# Capture modes accepted in TRANSLATION_PROFILE
+PROFILE_MODES = ("cprofile", "tracemalloc")
+
+# Number of functions and allocation sites included in profiles
+DEFAULT_PROFILE_TOP = 20
+
+# Frames kept per traced allocation
+TRACEMALLOC_FRAMES = 1
+
+# Job timings go to their own logger, kept at INFO so that they are logged even when
+# LOG_LEVEL quiets everything else; it can still be silenced on its own
+timings_logger = setup_logger("translation_timings")
+timings_logger.setLevel(logging.INFO)
+
+# tracemalloc is process-wide; the JobTimer that started it is the only one to stop it
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_owner = None
+
+
+def percentile(sorted_values, fraction):
+    """Return the nearest-rank percentile of a sorted, non-empty list."""
+    rank = math.ceil(fraction * len(sorted_values))
+    return sorted_values[min(len(sorted_values), max(rank, 1)) - 1]
+
+
+def profile_modes_from_environment():
+    """Return the capture modes named in TRANSLATION_PROFILE, ignoring unknown ones."""
+    value = os.environ.get("TRANSLATION_PROFILE", "")
+    return tuple(mode for mode in PROFILE_MODES
+                 if mode in (item.strip().lower() for item in value.split(",")))
+
+
+class JobTimer:
+    """
+    Collects timing spans for one job and, optionally, a profile of it.
+
+    Args:
+        job (str): Label of the job (input file or S3 key), included in the output.
+        profile (tuple): Capture modes from PROFILE_MODES; defaults to those named in
+            TRANSLATION_PROFILE.
+        profile_top (int): Functions and allocation sites listed per profile; defaults
+            to TRANSLATION_PROFILE_TOP.
+    """
+
+    def __init__(self, job=None, profile=None, profile_top=None):
+        self.job = job
+        self.profile = profile_modes_from_environment() if profile is None else tuple(profile)
+        self.profile_top = profile_top or int(os.environ.get("TRANSLATION_PROFILE_TOP", DEFAULT_PROFILE_TOP))
+        self.started_at = time.perf_counter()
+        self.finished_at = None
+        self._durations = {}
+        self._lock = threading.Lock()
+        self._profiler = None
+        self._tracing = False
+        self.profile_report = {}
+
+    def record(self, phase, seconds):
+        """Record one span of `seconds` under `phase`."""
+        with self._lock:
+            self._durations.setdefault(phase, []).append(seconds)
+
+    def start_profile(self):
+        """Start the capture modes requested for this job, if any."""
+        global _tracemalloc_owner
+        if "cprofile" in self.profile and self._profiler is None:
+            self._profiler = cProfile.Profile()
+            try:
+                self._profiler.enable()
+            except ValueError:
+                # Another profiler is already active (one per interpreter from Python 3.12)
+                self._profiler = None
+                self.profile_report["cprofile"] = {"skipped": "another profiler is active"}
+        if "tracemalloc" in self.profile and not self._tracing:
+            with _tracemalloc_lock:
+                if _tracemalloc_owner is not None:
+                    skipped = "another job is tracing allocations"
+                elif tracemalloc.is_tracing():
+                    skipped = "tracemalloc was started outside the translator"
+                else:
+                    tracemalloc.start(TRACEMALLOC_FRAMES)
+                    _tracemalloc_owner = self
+                    self._tracing = True
+                    skipped = None
+            if skipped is not None:
+                self.profile_report["tracemalloc"] = {"skipped": skipped}
+
+    def stop_profile(self):
+        """Stop capturing and keep the top entries in profile_report."""
+        global _tracemalloc_owner
+        if self._profiler is not None:
+            self._profiler.disable()
+            stats = pstats.Stats(self._profiler)
+            rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+            self.profile_report["cprofile"] = [
+                {
+                    "function": f"{os.path.basename(filename)}:{line}({name})",
+                    "calls": total_calls,
+                    "total_ms": round(total_time * 1000, 1),
+                    "cumulative_ms": round(cumulative_time * 1000, 1)
+                }
+                for (filename, line, name), (_, total_calls, total_time, cumulative_time, _) in rows[:self.profile_top]
+            ]
+            self._profiler = None
+        if self._tracing:
+            with _tracemalloc_lock:
+                snapshot = tracemalloc.take_snapshot()
+                current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                _tracemalloc_owner = None
+            self._tracing = False
+            self.profile_report["tracemalloc"] = {
+                "current_kib": round(current / 1024, 1),
+                "peak_kib": round(peak / 1024, 1),
+                "top": [
+                    {
+                        "location": f"{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                        "size_kib": round(stat.size / 1024, 1),
+                        "count": stat.count
+                    }
+                    for stat in snapshot.statistics("lineno")[:self.profile_top]
+                ]
+            }
+
+    def finish(self):
+        """Stop the job clock and any capture; later calls have no effect."""
+        if self.finished_at is None:
+            self.finished_at = time.perf_counter()
+            self.stop_profile()
+
+    def summary(self):
+        """
+        Summarize the recorded spans.
+
+        Returns:
+            dict: Per phase, in order of first use: 'count', 'total_ms', 'p50_ms',
+                'p95_ms' and 'max_ms'.
+        """
+        with self._lock:
+            durations = {phase: sorted(values) for phase, values in self._durations.items()}
+        return {
+            phase: {
+                "count": len(values),
+                "total_ms": round(sum(values) * 1000, 1),
+                "p50_ms": round(percentile(values, 0.5) * 1000, 1),
+                "p95_ms": round(percentile(values, 0.95) * 1000, 1),
+                "max_ms": round(values[-1] * 1000, 1)
+            }
+            for phase, values in durations.items()
+        }
+
+    def report(self, **fields):
+        """
+        Build the job timing document.
+
+        Args:
+            **fields: Extra top-level fields (e.g. status or segment counts).
+
+        Returns:
+            dict: 'job', 'wall_ms', 'phases', any extra fields and, when profiling,
+                'profile'.
+        """
+        finished_at = self.finished_at if self.finished_at is not None else time.perf_counter()
+        document = {
+            "job": self.job,
+            "wall_ms": round((finished_at - self.started_at) * 1000, 1),
+            "phases": self.summary()
+        }
+        document.update(fields)
+        if self.profile_report:
+            document["profile"] = self.profile_report
+        return document
+
+    def emit(self, **fields):
+        """Finish the job and log its timing document as one structured record."""
+        self.finish()
+        log_phase(timings_logger, "translation_timings", **self.report(**fields))
+
+
+@contextmanager
+def span(timer, phase):
+    """
+    Time the enclosed block under `phase`; does nothing if `timer` is None.
+
+    The span is recorded whether the block succeeds or raises.
+    """
+    if timer is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.record(phase, time.perf_counter() - started)
@@ -0,0 +1,120 @@
+import collections
+import time
+
+# Defaults for throttling progress events
+DEFAULT_MIN_INTERVAL = 1.0
+DEFAULT_PERCENT_STEP = 10
+
+# Seconds of history used for the rolling throughput estimate
+DEFAULT_THROUGHPUT_WINDOW = 30.0
+
+
+class ProgressReporter:
+    """
+    Turns per-unit completions into throttled, structured progress events.
+
+    Work is tracked in units (for translate_file, one unit per distinct text). Each unit
+    carries a weight (the number of segments it fills) and the set of slides it appears
+    on, so events report segments and slides rather than units. Events are passed to
+    `callback` at most once per `min_interval` seconds unless progress advanced by at
+    least `percent_step` percent; the first and last events are always emitted.
+
+    Event fields: segments_done, segments_total, slides_done, slides_total,
+    current_slide (1-based), percent, elapsed_seconds, segments_per_second and
+    eta_seconds (None until throughput is known).
+    """
+
+    def __init__(self, callback, unit_weights, unit_slides, slides_total,
+                 min_interval=DEFAULT_MIN_INTERVAL, percent_step=DEFAULT_PERCENT_STEP,
+                 window=DEFAULT_THROUGHPUT_WINDOW):
+        self.callback = callback
+        self.unit_weights = unit_weights
+        self.unit_slides = unit_slides
+        self.slides_total = slides_total
+        self.min_interval = min_interval
+        self.percent_step = percent_step
+        self.window = window
+
+        self.segments_total = sum(unit_weights)
+        self.segments_done = 0
+        self.current_slide = None
+        self.started_at = time.monotonic()
+        self._history = collections.deque([(self.started_at, 0)])
+        self._last_emit_at = None
+        self._last_emit_percent = None
+        self._last_emit_done = None
+
+        # Slides are done once every unit appearing on them is done
+        self._slide_pending = [0] * slides_total
+        for slides in unit_slides:
+            for slide in slides:
+                self._slide_pending[slide] += 1
+        self.slides_done = sum(1 for pending in self._slide_pending if pending == 0)
+
+    def start(self):
+        """Emit the initial event."""
+        self._emit(force=True)
+
+    def advance(self, units):
+        """
+        Record completed units and emit an event if the throttle allows it.
+
+        Args:
+            units (list): Indices of the units that completed.
+        """
+        for unit in units:
+            self.segments_done += self.unit_weights[unit]
+            for slide in self.unit_slides[unit]:
+                self._slide_pending[slide] -= 1
+                if self._slide_pending[slide] == 0:
+                    self.slides_done += 1
+            if self.unit_slides[unit]:
+                self.current_slide = min(self.unit_slides[unit]) + 1
+
+        now = time.monotonic()
+        self._history.append((now, self.segments_done))
+        while len(self._history) > 2 and now - self._history[1][0] > self.window:
+            self._history.popleft()
+        self._emit(force=self.segments_done >= self.segments_total)
+
+    def finish(self):
+        """Emit the final event, unless it was already emitted."""
+        if self._last_emit_done != self.segments_done:
+            self._emit(force=True)
+
+    def snapshot(self):
+        """Return the current progress event without emitting it."""
+        now = time.monotonic()
+        first_at, first_done = self._history[0]
+        rate = (self.segments_done - first_done) / (now - first_at) if now > first_at else 0.0
+        remaining = self.segments_total - self.segments_done
+        if remaining == 0:
+            eta = 0.0
+        else:
+            eta = round(remaining / rate, 1) if rate > 0 else None
+        return {
+            'segments_done': self.segments_done,
+            'segments_total': self.segments_total,
+            'slides_done': self.slides_done,
+            'slides_total': self.slides_total,
+            'current_slide': self.current_slide,
+            'percent': round(100.0 * self.segments_done / self.segments_total, 1) if self.segments_total else 100.0,
+            'elapsed_seconds': round(now - self.started_at, 2),
+            'segments_per_second': round(rate, 2),
+            'eta_seconds': eta
+        }
+
+    def _emit(self, force=False):
+        if self.callback is None:
+            return
+        event = self.snapshot()
+        now = time.monotonic()
+        if not force and self._last_emit_at is not None:
+            interval_ok = now - self._last_emit_at >= self.min_interval
+            step_ok = event['percent'] - self._last_emit_percent >= self.percent_step
+            if not (interval_ok or step_ok):
+                return
+        self._last_emit_at = now
+        self._last_emit_percent = event['percent']
+        self._last_emit_done = self.segments_done
+        self.callback(event)
@@ -0,0 +1,276 @@
+"""
+Process-wide rate limiting and retries for Bedrock calls.
+
+Every translation worker in the process goes through one AdaptiveRateLimiter. It
+holds two token buckets, one for requests per minute and one for model tokens per
+minute. Their rates follow AIMD: a throttling error halves them, and each successful
+call raises them by a fixed step, up to the configured ceiling. Concurrent jobs
+therefore slow down together, and do not retry in lockstep, when Bedrock pushes back.
+"""
+import collections
+import os
+import random
+import threading
+import time
+
+from botocore.exceptions import ClientError, ConnectionError, HTTPClientError
+
+from metrics import get_metrics
+
+# Attempts per call, including the first
+DEFAULT_MAX_ATTEMPTS = 5
+
+# Full-jitter backoff: sleep a random time in [0, min(cap, base * 2 ** attempt)]
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_CAP_SECONDS = 20.0
+
+# AIMD: rates are multiplied by DECREASE_FACTOR on throttling and raised by
+# INCREASE_FRACTION of their starting rate on every success
+DECREASE_FACTOR = 0.5
+INCREASE_FRACTION = 0.05
+
+# Rates never drop below this fraction of their starting rate
+MIN_RATE_FRACTION = 0.05
+
+# Seconds of burst a bucket can hold
+BURST_SECONDS = 5.0
+
+# Seconds of history used to learn a starting rate when no limit is configured
+OBSERVATION_WINDOW = 60.0
+
+# Error codes meaning the caller is sending too much
+THROTTLING_ERRORS = frozenset((
+    'ThrottlingException', 'TooManyRequestsException', 'ServiceQuotaExceededException'
+))
+
+# Error codes worth retrying without slowing down
+TRANSIENT_ERRORS = frozenset((
+    'ModelNotReadyException', 'ModelTimeoutException', 'ServiceUnavailableException',
+    'InternalServerException', 'InternalFailure', 'RequestTimeout', 'ModelStreamErrorException'
+))
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate` units per minute.
+
+    Reservations may drive the balance negative; the caller then waits until the debt
+    is repaid, so requests larger than the burst size are still admitted in turn.
+    """
+
+    def __init__(self, rate_per_minute):
+        self.rate = None
+        self.balance = 0.0
+        self.updated_at = time.monotonic()
+        self.set_rate(rate_per_minute)
+        if rate_per_minute is not None:
+            self.balance = self.capacity()
+
+    def set_rate(self, rate_per_minute):
+        """Change the refill rate (None for unlimited), keeping the current balance."""
+        self._refill()
+        self.rate = rate_per_minute
+        if rate_per_minute is not None:
+            self.balance = min(self.balance, self.capacity())
+
+    def capacity(self):
+        """Return the largest balance the bucket can hold."""
+        return self.rate / 60.0 * BURST_SECONDS
+
+    def reserve(self, amount):
+        """
+        Take `amount` units from the bucket.
+
+        Returns:
+            float: Seconds the caller must wait before using the reservation.
+        """
+        if self.rate is None:
+            return 0.0
+        self._refill()
+        self.balance -= amount
+        return -self.balance / (self.rate / 60.0) if self.balance < 0 else 0.0
+
+    def adjust(self, amount):
+        """Give back (positive) or take (negative) units after the fact."""
+        if self.rate is not None:
+            self._refill()
+            self.balance = min(self.balance + amount, self.capacity())
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate is not None:
+            self.balance = min(self.capacity(), self.balance + (now - self.updated_at) * self.rate / 60.0)
+        self.updated_at = now
+
+
+class AdaptiveRateLimiter:
+    """
+    Shared request and token budget for Bedrock calls with AIMD and full-jitter retries.
+
+    Limits of 0 mean no fixed ceiling: the bucket stays open until the first throttling
+    error, and then starts from half the throughput observed over the last minute.
+    """
+
+    def __init__(self, requests_per_minute=0, tokens_per_minute=0, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """
+        Args:
+            requests_per_minute (int): Ceiling on requests per minute, 0 for none.
+            tokens_per_minute (int): Ceiling on model tokens per minute, 0 for none.
+            max_attempts (int): Attempts per call, including the first.
+        """
+        self.max_attempts = max(1, max_attempts)
+        self._lock = threading.Lock()
+        self._limits = [requests_per_minute or None, tokens_per_minute or None]
+        self._buckets = [TokenBucket(limit) for limit in self._limits]
+        self._starting_rates = list(self._limits)
+        self._history = collections.deque()
+        self.counters = {
+            'calls': 0,
+            'attempts': 0,
+            'throttled': 0,
+            'retried': 0,
+            'failed': 0,
+            'non_retryable': 0,
+            'wait_seconds': 0.0
+        }
+
+    def call(self, request, estimated_tokens):
+        """
+        Run a Bedrock request under the rate limit, retrying throttling, transient service
+        errors and connection failures.
+
+        Args:
+            request (callable): Sends the request and returns (result, tokens used).
+            estimated_tokens (int): Tokens reserved before sending; corrected afterwards.
+
+        Returns:
+            The result of `request`.
+
+        Raises:
+            ClientError: Non-retryable errors such as ValidationException are raised at
+                once; retryable errors once `max_attempts` is reached. Any other exception
+                from `request` is raised without retrying.
+        """
+        self._count('calls')
+        for attempt in range(self.max_attempts):
+            self._acquire(estimated_tokens)
+            self._count('attempts')
+            try:
+                result, tokens_used = request()
+            except (ClientError, ConnectionError, HTTPClientError) as e:
+                code = e.response.get('Error', {}).get('Code', '') if isinstance(e, ClientError) else ''
+                # Errors raised inside an event stream are named in camel case
+                code = code[:1].upper() + code[1:]
+                if code in THROTTLING_ERRORS:
+                    self._count('throttled')
+                    get_metrics().count('BedrockThrottles')
+                    self._decrease()
+                elif isinstance(e, ClientError) and code not in TRANSIENT_ERRORS:
+                    self._count('non_retryable')
+                    raise
+                self._release(estimated_tokens)
+                if attempt == self.max_attempts - 1:
+                    self._count('failed')
+                    get_metrics().count('BedrockFailures')
+                    raise
+                self._count('retried')
+                get_metrics().count('BedrockRetries')
+                self._backoff(attempt)
+                continue
+            self._succeed(estimated_tokens, tokens_used)
+            return result
+
+    def stats(self):
+        """Return call counters, the throttle rate and the current per-minute rates."""
+        with self._lock:
+            stats = dict(self.counters)
+            stats['wait_seconds'] = round(stats['wait_seconds'], 2)
+            stats['throttle_rate'] = round(stats['throttled'] / stats['attempts'], 4) if stats['attempts'] else 0.0
+            stats['requests_per_minute'] = _rounded(self._buckets[0].rate)
+            stats['tokens_per_minute'] = _rounded(self._buckets[1].rate)
+        return stats
+
+    def _acquire(self, tokens):
+        with self._lock:
+            wait = max(self._buckets[0].reserve(1), self._buckets[1].reserve(tokens))
+            self.counters['wait_seconds'] += wait
+        if wait > 0:
+            time.sleep(wait)
+
+    def _release(self, tokens):
+        """Return the reservation of a failed attempt."""
+        with self._lock:
+            self._buckets[0].adjust(1)
+            self._buckets[1].adjust(tokens)
+
+    def _succeed(self, estimated_tokens, tokens_used):
+        with self._lock:
+            self._buckets[1].adjust(estimated_tokens - tokens_used)
+            now = time.monotonic()
+            # Bedrock counts maxTokens against the quota when a request starts, so the
+            # learned rate is kept in reserved tokens, the unit _acquire spends
+            self._history.append((now, estimated_tokens))
+            while self._history and now - self._history[0][0] > OBSERVATION_WINDOW:
+                self._history.popleft()
+            for bucket, limit, start in zip(self._buckets, self._limits, self._starting_rates):
+                if bucket.rate is not None and (limit is None or bucket.rate < limit):
+                    rate = bucket.rate + start * INCREASE_FRACTION
+                    bucket.set_rate(min(rate, limit) if limit is not None else rate)
+
+    def _decrease(self):
+        with self._lock:
+            observed = self._observed_rates()
+            for i, bucket in enumerate(self._buckets):
+                if bucket.rate is None:
+                    if not observed[i]:
+                        continue
+                    self._starting_rates[i] = observed[i]
+                    bucket.set_rate(observed[i])
+                floor = self._starting_rates[i] * MIN_RATE_FRACTION
+                bucket.set_rate(max(floor, bucket.rate * DECREASE_FACTOR))
+
+    def _observed_rates(self):
+        """Return the requests and tokens per minute completed within the observation window."""
+        if not self._history:
+            return [None, None]
+        minutes = max(1.0, time.monotonic() - self._history[0][0]) / 60.0
+        tokens = sum(reserved for _, reserved in self._history)
+        return [len(self._history) / minutes, tokens / minutes or None]
+
+    def _backoff(self, attempt):
+        delay = random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+        with self._lock:
+            self.counters['wait_seconds'] += delay
+        time.sleep(delay)
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+
+def get_rate_limiter():
+    """
+    Return the process-wide rate limiter, creating it on first use.
+
+    TRANSLATION_MAX_RPM and TRANSLATION_MAX_TPM set the request and token ceilings per
+    minute (0 or unset: none), and TRANSLATION_MAX_ATTEMPTS the attempts per call.
+
+    Returns:
+        AdaptiveRateLimiter: The shared limiter.
+    """
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = AdaptiveRateLimiter(
+                requests_per_minute=int(os.environ.get('TRANSLATION_MAX_RPM', 0)),
+                tokens_per_minute=int(os.environ.get('TRANSLATION_MAX_TPM', 0)),
+                max_attempts=int(os.environ.get('TRANSLATION_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS))
+            )
+        return _limiter
+
+
+def _rounded(rate):
+    return round(rate, 1) if rate is not None else None
@@ -0,0 +1,275 @@
+"""
+Run-level formatting for text bodies sent through the model.
+
+A text body is captured as a compact run map: for every paragraph, an array of
+(offset, length, element index) spans over the paragraph's plain text, plus one shared
+list of the `a:rPr` elements (and line breaks/fields) the indices refer to. The text sent
+to the model marks runs with inline tags:
+
+    Revenue grew <1>42%</1> in Q3<2/>see appendix
+
+Text outside any tag takes the paragraph's dominant formatting, `<n>...</n>` takes the
+formatting of element n and `<n/>` stands for an element copied as is (a line break or a
+field such as the slide number). Translated text is written back as new runs carrying
+clones of the original `a:rPr` elements, so bold/italic/hyperlink runs survive and font
+properties are never read through python-pptx proxies.
+
+A paragraph whose own text already looks like a tag (`<3>`, `</2>`, as in code samples)
+is sent untagged and written back literally with its base formatting, so that its text
+is never mistaken for, or stripped as, a run tag.
+"""
+import re
+from copy import deepcopy
+
+from lxml import etree
+from pptx.oxml.ns import qn
+
+# Inline tags: <n>, </n> and <n/>
+TAG_PATTERN = re.compile(r"<(/?)(\d+)(/?)>")
+
+# Prompt sentence added when the text to translate contains inline tags
+RUN_TAG_INSTRUCTIONS = (" Keep the numbered tags such as <1>, </1> and <2/> unchanged, placed around"
+                        " the translated words they correspond to.")
+
+_RUN = qn("a:r")
+_BREAK = qn("a:br")
+_FIELD = qn("a:fld")
+_PARAGRAPH = qn("a:p")
+
+# Run properties that only record editing state (spell-check, autocorrect) and do not
+# change how text looks; runs differing only in these are merged
+_EDITING_ATTRIBUTES = frozenset(("dirty", "err", "noProof", "smtClean", "smtId"))
+
+# Marks the start of a paragraph, before any span
+_NO_SPAN = object()
+
+
+class RunMap:
+    """Formatting of a text body, captured by capture_runs."""
+
+    __slots__ = ("paragraphs", "elements", "bases", "literal", "text", "plain_text")
+
+    def __init__(self, paragraphs, elements, bases, literal, text, plain_text):
+        self.paragraphs = paragraphs
+        self.elements = elements
+        self.bases = bases
+        self.literal = literal
+        self.text = text
+        self.plain_text = plain_text
+
+
+def capture_runs(txBody):
+    """
+    Capture the run map and tagged text of a text body.
+
+    Adjacent runs with identical `a:rPr` are merged, and the longest run of each paragraph
+    becomes its untagged base formatting, so uniformly formatted paragraphs carry no tags.
+    Paragraphs whose text contains tag-like sequences are left untagged and marked literal.
+
+    Args:
+        txBody: A `p:txBody` or `a:txBody` element.
+
+    Returns:
+        RunMap: Spans, formatting elements, per-paragraph base index and literal flag, the
+            tagged text (paragraphs separated by newlines) and the plain text.
+    """
+    elements = []
+    index_by_rPr = {}
+    paragraphs = []
+    bases = []
+    literal = []
+    tagged_paragraphs = []
+    plain_paragraphs = []
+
+    for p in txBody.iterchildren(_PARAGRAPH):
+        spans = []
+        plain = []
+        offset = 0
+        previous_key = _NO_SPAN
+        for child in p.iterchildren(_RUN, _BREAK, _FIELD):
+            if child.tag == _RUN:
+                text = child.findtext(qn("a:t")) or ""
+                if not text:
+                    continue
+                rPr = child.find(qn("a:rPr"))
+                key = _rPr_key(rPr)
+                if key == previous_key:
+                    span_offset, length, index = spans[-1]
+                    spans[-1] = (span_offset, length + len(text), index)
+                else:
+                    if key not in index_by_rPr:
+                        index_by_rPr[key] = len(elements)
+                        elements.append(rPr)
+                    spans.append((offset, len(text), index_by_rPr[key]))
+                    previous_key = key
+            else:
+                text = "\v" if child.tag == _BREAK else (child.findtext(qn("a:t")) or "")
+                spans.append((offset, len(text), len(elements)))
+                elements.append(child)
+                previous_key = _NO_SPAN
+            plain.append(text)
+            offset += len(text)
+
+        plain_text = "".join(plain)
+        base = _base_index(spans, elements)
+        is_literal = TAG_PATTERN.search(plain_text) is not None
+        paragraphs.append(spans)
+        bases.append(base)
+        literal.append(is_literal)
+        plain_paragraphs.append(plain_text)
+        tagged_paragraphs.append(plain_text if is_literal else _tag_paragraph(plain_text, spans, elements, base))
+
+    return RunMap(paragraphs, elements, bases, literal, "\n".join(tagged_paragraphs),
+                  "\n".join(plain_paragraphs))
+
+
+def apply_runs(txBody, run_map, translated_text):
+    """
+    Replace the runs of a text body with translated, tagged text.
+
+    Paragraph properties are kept. Translated paragraphs map onto the existing paragraphs
+    in order; surplus lines are merged into the last paragraph and paragraphs left without
+    text are removed. If the tags of a paragraph cannot be matched to the run map, its
+    text is written untagged with the paragraph's base formatting. Literal paragraphs are
+    written as is with their base formatting, keeping their line breaks.
+
+    Args:
+        txBody: The text body captured into `run_map`.
+        run_map (RunMap): Formatting captured by capture_runs.
+        translated_text (str): Translated tagged text, paragraphs separated by newlines.
+    """
+    paragraphs = list(txBody.iterchildren(_PARAGRAPH))
+    lines = translated_text.split("\n")
+    if len(lines) > len(paragraphs):
+        lines = lines[:len(paragraphs) - 1] + [" ".join(line.strip() for line in lines[len(paragraphs) - 1:])]
+
+    for i, p in enumerate(paragraphs):
+        if i >= len(lines):
+            if i > 0:
+                txBody.remove(p)
+            else:
+                _clear_paragraph(p)
+            continue
+        base = run_map.bases[i]
+        if run_map.literal[i]:
+            pieces = _literal_pieces(lines[i], run_map.paragraphs[i], run_map.elements, base)
+        else:
+            pieces = _parse_tagged(lines[i], run_map.elements, base)
+        if pieces is None:
+            pieces = [(base, TAG_PATTERN.sub("", lines[i]))]
+        _clear_paragraph(p)
+        end = p.find(qn("a:endParaRPr"))
+        for index, text in pieces:
+            element = run_map.elements[index] if index is not None else None
+            if element is not None and element.tag in (_BREAK, _FIELD):
+                if end is not None:
+                    end.addprevious(deepcopy(element))
+                else:
+                    p.append(deepcopy(element))
+            elif text:
+                r = p.add_r(text)
+                if element is not None:
+                    r.insert(0, deepcopy(element))
+
+
+def has_tags(text):
+    """Return True if `text` contains inline run tags."""
+    return TAG_PATTERN.search(text) is not None
+
+
+def _rPr_key(rPr):
+    """Return a hashable key identifying the formatting of `rPr`."""
+    if rPr is None:
+        return None
+    attributes = tuple(sorted(
+        (name, value) for name, value in rPr.attrib.items() if name not in _EDITING_ATTRIBUTES
+    ))
+    return attributes, tuple(etree.tostring(child) for child in rPr)
+
+
+def _base_index(spans, elements):
+    """Return the element index of the paragraph's longest formatted run, or None."""
+    best = None
+    best_length = -1
+    for _, length, index in spans:
+        element = elements[index]
+        if element is not None and element.tag in (_BREAK, _FIELD):
+            continue
+        if length > best_length:
+            best = index
+            best_length = length
+    return best
+
+
+def _tag_paragraph(plain_text, spans, elements, base):
+    """Build the tagged text of one paragraph."""
+    parts = []
+    for offset, length, index in spans:
+        element = elements[index]
+        if element is not None and element.tag in (_BREAK, _FIELD):
+            parts.append("<%d/>" % (index + 1))
+        elif index == base:
+            parts.append(plain_text[offset:offset + length])
+        else:
+            parts.append("<%d>%s</%d>" % (index + 1, plain_text[offset:offset + length], index + 1))
+    return "".join(parts)
+
+
+def _parse_tagged(line, elements, base):
+    """
+    Split one translated paragraph into (element index, text) pieces.
+
+    Returns:
+        list: Pieces in order; inline elements have empty text. None if the tags are
+            unbalanced or refer to unknown elements.
+    """
+    pieces = []
+    current = base
+    position = 0
+    for match in TAG_PATTERN.finditer(line):
+        if match.start() > position:
+            pieces.append((current, line[position:match.start()]))
+        position = match.end()
+        closing, number, self_closing = match.groups()
+        index = int(number) - 1
+        if closing and self_closing or not 0 <= index < len(elements):
+            return None
+        element = elements[index]
+        inline = element is not None and element.tag in (_BREAK, _FIELD)
+        if self_closing:
+            if not inline:
+                return None
+            pieces.append((index, ""))
+        elif inline:
+            return None
+        elif closing:
+            if current != index:
+                return None
+            current = base
+        else:
+            if current != base:
+                return None
+            current = index
+    if current != base:
+        return None
+    if position < len(line):
+        pieces.append((current, line[position:]))
+    return pieces
+
+
+def _literal_pieces(line, spans, elements, base):
+    """Split a literal paragraph into base-formatted pieces separated by its line breaks."""
+    break_index = next((index for _, _, index in spans
+                        if elements[index] is not None and elements[index].tag == _BREAK), None)
+    pieces = []
+    for n, part in enumerate(line.split("\v")):
+        if n:
+            pieces.append((break_index, "") if break_index is not None else (base, " "))
+        pieces.append((base, part))
+    return pieces
+
+
+def _clear_paragraph(p):
+    """Remove the runs, line breaks and fields of a paragraph."""
+    for child in list(p.iterchildren(_RUN, _BREAK, _FIELD)):
+        p.remove(child)
@@ -0,0 +1,122 @@
+import json
+import re
+
+# Default number of segments packed into a single Bedrock request
+DEFAULT_BATCH_MAX_SEGMENTS = 40
+
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+class BatchParseError(Exception):
+    """Raised when a batched model response cannot be mapped back onto its segments."""
+
+
+def estimate_tokens(text):
+    """
+    Roughly estimate the number of model tokens in a piece of text.
+
+    Args:
+        text (str): Text to measure.
+
+    Returns:
+        int: Estimated token count, using ~4 characters per token.
+    """
+    return max(1, (len(text) + 3) // 4)
+
+
+def pack_batches(texts, token_budget, max_segments=DEFAULT_BATCH_MAX_SEGMENTS):
+    """
+    Group segment indices into batches that fit within a token budget.
+
+    Segments keep their input order. A segment larger than the budget on its own
+    becomes a single-segment batch.
+
+    Args:
+        texts (list): Segment texts.
+        token_budget (int): Maximum estimated input tokens per batch.
+        max_segments (int): Maximum number of segments per batch.
+
+    Returns:
+        list: Batches, each a list of indices into `texts`.
+    """
+    batches = []
+    current = []
+    current_tokens = 0
+    for index, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if current and (current_tokens + tokens > token_budget or len(current) >= max_segments):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def build_batch_prompt(segments, source_language, target_language, use_reasoning=False, keep_tags=False):
+    """
+    Build a prompt that asks the model to translate several segments in one request.
+
+    Args:
+        segments (dict): Mapping of segment ID to source text.
+        source_language (str): Source language.
+        target_language (str): Target language.
+        use_reasoning (bool): Whether extended reasoning is enabled.
+        keep_tags (bool): Whether segments contain inline run formatting tags to preserve.
+
+    Returns:
+        str: Prompt text containing the segments as a numbered JSON envelope.
+    """
+    envelope = json.dumps(segments, ensure_ascii=False, indent=0)
+    instructions = "maintaining the original format, tone, and meaning of each segment"
+    if use_reasoning:
+        instructions = ("first analyzing key terms and style, then providing an accurate translation "
+                        "that preserves the original format, tone, and technical accuracy of each segment")
+    if keep_tags:
+        instructions += (", keeping numbered tags such as <1>, </1> and <2/> unchanged around the "
+                         "translated words they correspond to")
+    return (f"Translate the value of every entry in the following JSON object from {source_language} "
+            f"to {target_language}, {instructions}. Return only a JSON object with exactly the same "
+            f"keys mapped to the translated text, without any additional explanation:\n\n{envelope}")
+
+
+def parse_batch_response(response_text, segment_ids):
+    """
+    Parse a batched model response back into per-segment translations.
+
+    Args:
+        response_text (str): Raw model output.
+        segment_ids (list): Segment IDs that were sent in the request.
+
+    Returns:
+        dict: Mapping of segment ID to translated text.
+
+    Raises:
+        BatchParseError: If the response is not a JSON object covering exactly `segment_ids`.
+    """
+    text = _CODE_FENCE.sub("", response_text.strip())
+    start = text.find("{")
+    end = text.rfind("}")
+    if start < 0 or end < start:
+        raise BatchParseError("No JSON object found in batch response")
+
+    try:
+        translations = json.loads(text[start:end + 1])
+    except ValueError as e:
+        raise BatchParseError(f"Invalid JSON in batch response: {e}")
+
+    if not isinstance(translations, dict):
+        raise BatchParseError("Batch response is not a JSON object")
+    missing = [segment_id for segment_id in segment_ids if segment_id not in translations]
+    if missing:
+        raise BatchParseError(f"Batch response is missing segments {missing}")
+
+    result = {}
+    for segment_id in segment_ids:
+        value = translations[segment_id]
+        if not isinstance(value, str):
+            raise BatchParseError(f"Segment {segment_id} translation is not a string")
+        result[segment_id] = value
+    return result
@@ -0,0 +1,281 @@
+import json
+import logging
+import re
+
+from run_map import TAG_PATTERN
+from segment_batcher import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Default estimated input tokens per chunk of a long text frame
+DEFAULT_CHUNK_TOKENS = 1000
+
+# Output sizing: translations can take up to twice the source tokens (e.g. English to
+# CJK), plus a fixed margin for the model's own formatting
+OUTPUT_TOKEN_RATIO = 2
+OUTPUT_TOKEN_MARGIN = 128
+MIN_OUTPUT_TOKENS = 256
+
+# Reply tokens a packed batch spends per segment on its JSON envelope besides the key:
+# the quotes around key and value, the colon, the comma and the line break
+BATCH_ENTRY_OVERHEAD_TOKENS = 6
+
+# Sentence ends: Latin punctuation followed by whitespace, or CJK punctuation
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+|(?<=[。！？])\s*")
+
+
+def estimate_output_tokens(texts):
+    """
+    Estimate the output tokens needed to translate a set of texts.
+
+    Args:
+        texts (list): Source texts sent in one request.
+
+    Returns:
+        int: Suggested maxTokens for the request.
+    """
+    tokens = sum(estimate_tokens(text) for text in texts)
+    return max(MIN_OUTPUT_TOKENS, tokens * OUTPUT_TOKEN_RATIO + OUTPUT_TOKEN_MARGIN)
+
+
+def estimate_batch_output_tokens(segments):
+    """
+    Estimate the output tokens needed to answer a packed batch (see segment_batcher).
+
+    The reply is a JSON object, so every segment also costs its key and envelope, and
+    values are sized as serialized JSON strings, including escaped quotes and newlines.
+
+    Args:
+        segments (dict): Mapping of segment ID to source text, as sent in the batch.
+
+    Returns:
+        int: Suggested maxTokens for the request.
+    """
+    values = [json.dumps(text, ensure_ascii=False)[1:-1] for text in segments.values()]
+    envelope = sum(estimate_tokens(segment_id) + BATCH_ENTRY_OVERHEAD_TOKENS for segment_id in segments)
+    return estimate_output_tokens(values) + envelope
+
+
+def input_budget_for_output(max_output_tokens):
+    """
+    Return the largest input size, in estimated tokens, whose translation fits in
+    `max_output_tokens`.
+    """
+    return max(1, (max_output_tokens - OUTPUT_TOKEN_MARGIN) // OUTPUT_TOKEN_RATIO)
+
+
+def split_text(text, token_budget):
+    """
+    Split text into chunks that can be translated independently.
+
+    Consecutive paragraphs (lines) are grouped into chunks under `token_budget`. A
+    paragraph larger than the budget is split at sentence boundaries, and a sentence
+    larger than the budget at whitespace. Text under the budget is a single chunk.
+
+    Inline run tags (see run_map) are never cut: sentence boundaries only count outside
+    `<n>...</n>` spans, and a span that has to be split is closed at the end of one chunk
+    and reopened at the start of the next, so every chunk has balanced tags.
+
+    Args:
+        text (str): Text to split, paragraphs separated by newlines.
+        token_budget (int): Maximum estimated tokens per chunk.
+
+    Returns:
+        list: (chunk, separator) tuples, where separator is the source text between the
+            chunk and the next one ('' for the last chunk). Concatenating every chunk and
+            separator gives back `text`, apart from the tags added around split spans.
+    """
+    if estimate_tokens(text) <= token_budget:
+        return [(text, "")]
+
+    chunks = []
+    group = []
+    group_tokens = 0
+    for paragraph in text.split("\n"):
+        tokens = estimate_tokens(paragraph)
+        if group and group_tokens + tokens > token_budget:
+            chunks.append(("\n".join(group), "\n"))
+            group = []
+            group_tokens = 0
+        if tokens > token_budget:
+            for piece, separator in _split_paragraph(paragraph, token_budget):
+                chunks.append((piece, separator))
+            chunks[-1] = (chunks[-1][0], "\n")
+            continue
+        group.append(paragraph)
+        group_tokens += tokens
+    if group:
+        chunks.append(("\n".join(group), ""))
+    else:
+        chunks[-1] = (chunks[-1][0], "")
+
+    # Text with literal tag-like sequences (see run_map) may be unbalanced to begin with
+    if tags_balanced(text) and not all(tags_balanced(chunk) for chunk, _ in chunks):
+        # Sending unbalanced chunks would lose the run formatting of the whole text
+        logger.warning("Chunking produced unbalanced run tags; translating the text as one piece")
+        return [(text, "")]
+    return chunks
+
+
+def tags_balanced(text):
+    """Return True if every `<n>` in `text` is closed by `</n>` before the next one opens."""
+    open_number = None
+    for match in TAG_PATTERN.finditer(text):
+        closing, number, self_closing = match.groups()
+        if self_closing:
+            continue
+        if closing:
+            if open_number != number:
+                return False
+            open_number = None
+        elif open_number is not None:
+            return False
+        else:
+            open_number = number
+    return open_number is None
+
+
+def join_chunks(chunks, translations):
+    """
+    Reassemble translated chunks in order.
+
+    Each translation is fitted to the paragraph count of its source chunk, so the result
+    has exactly as many paragraphs as the source text: surplus lines are merged into the
+    chunk's last paragraph and missing ones are left empty.
+
+    Args:
+        chunks (list): (chunk, separator) tuples returned by split_text.
+        translations (list): Translated chunk texts, in the same order.
+
+    Returns:
+        str: The translated text.
+    """
+    parts = []
+    for (chunk, separator), translated in zip(chunks, translations):
+        count = chunk.count("\n") + 1
+        lines = translated.strip("\n").split("\n")
+        if len(lines) > count:
+            lines = lines[:count - 1] + [" ".join(line.strip() for line in lines[count - 1:])]
+        lines += [""] * (count - len(lines))
+        translated = "\n".join(lines)
+        if separator and separator != "\n":
+            translated = translated.rstrip()
+        parts.append(translated + separator)
+    return "".join(parts)
+
+
+def _split_paragraph(paragraph, token_budget):
+    """Split one paragraph into (piece, separator) tuples under `token_budget`."""
+    open_spans, in_token = _tag_state(paragraph)
+    sentences = []
+    position = 0
+    for match in _SENTENCE_END.finditer(paragraph):
+        # Only cut between spans, never inside <n>...</n> or a tag
+        if (open_spans[match.start()] is not None or open_spans[match.end()] is not None
+                or in_token[match.start()] or in_token[match.end()]):
+            continue
+        if match.start() > position and match.end() < len(paragraph):
+            sentences.append((paragraph[position:match.start()], match.group()))
+            position = match.end()
+    sentences.append((paragraph[position:], ""))
+
+    pieces = []
+    current = ""
+    current_separator = ""
+    for sentence, separator in sentences:
+        if estimate_tokens(sentence) > token_budget:
+            if current:
+                pieces.append((current, current_separator))
+                current = ""
+            words = _split_words(sentence, token_budget)
+            words[-1] = (words[-1][0], separator)
+            pieces.extend(words)
+            continue
+        candidate = current + current_separator + sentence if current else sentence
+        if current and estimate_tokens(candidate) > token_budget:
+            pieces.append((current, current_separator))
+            candidate = sentence
+        current = candidate
+        current_separator = separator
+    if current:
+        pieces.append((current, current_separator))
+    return pieces
+
+
+def _split_words(sentence, token_budget):
+    """
+    Split a sentence under `token_budget`, outside run tags where possible.
+
+    Cuts prefer, from the rightmost position that fits: whitespace outside any span,
+    whitespace after sentence punctuation inside a span, other whitespace inside a span,
+    and finally any position that is not inside a tag. A span cut in two is closed and
+    reopened around the cut.
+    """
+    max_chars = token_budget * 4
+    pieces = []
+    while len(sentence) > max_chars:
+        open_spans, in_token = _tag_state(sentence)
+        reopened = TAG_PATTERN.match(sentence)
+        # A piece must carry text beyond a tag reopened at its start
+        first = reopened.end() + 1 if reopened and not reopened.group(1) else 1
+        # Leave room for the closing tag of a split span
+        last = max(first, max_chars - 8)
+        cut, separator = _best_cut(sentence, first, last, open_spans, in_token)
+        number = open_spans[cut]
+        piece = sentence[:cut]
+        sentence = sentence[cut + len(separator):]
+        if number is not None:
+            piece += "</%s>" % number
+            sentence = "<%s>%s" % (number, sentence)
+        pieces.append((piece, separator))
+    pieces.append((sentence, ""))
+    return pieces
+
+
+def _best_cut(sentence, first, last, open_spans, in_token):
+    """Return (cut position, separator) for _split_words."""
+    candidates = [[], [], [], []]
+    for i in range(first, min(last, len(sentence) - 1) + 1):
+        if in_token[i]:
+            continue
+        if sentence[i] == " ":
+            if open_spans[i] is None:
+                candidates[0].append(i)
+            elif sentence[i - 1] in ".!?…":
+                candidates[1].append(i)
+            else:
+                candidates[2].append(i)
+        else:
+            candidates[3].append(i)
+    for rank, positions in enumerate(candidates):
+        if positions:
+            return positions[-1], (" " if rank < 3 else "")
+    return min(last, len(sentence) - 1), ""
+
+
+def _tag_state(text):
+    """
+    Describe every position of `text` (0 to len(text)) with respect to run tags.
+
+    Returns:
+        tuple: (open_spans, in_token) lists; open_spans[i] is the number of the span
+            `<n>...</n>` that position i falls inside (None outside spans) and in_token[i]
+            is True if position i is strictly inside a tag such as `<12>`.
+    """
+    open_spans = [None] * (len(text) + 1)
+    in_token = [False] * (len(text) + 1)
+    current = None
+    position = 0
+    for match in TAG_PATTERN.finditer(text):
+        for i in range(position, match.start() + 1):
+            open_spans[i] = current
+        for i in range(match.start() + 1, match.end()):
+            open_spans[i] = current
+            in_token[i] = True
+        closing, number, self_closing = match.groups()
+        if not self_closing:
+            current = None if closing else number
+        position = match.end()
+    for i in range(position, len(text) + 1):
+        open_spans[i] = current
+    return open_spans, in_token
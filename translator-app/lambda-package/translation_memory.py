@@ -0,0 +1,297 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import boto3
+
+# Defaults for the eviction policy shared by the local stores
+DEFAULT_MAX_ENTRIES = 100000
+DEFAULT_TTL_SECONDS = 90 * 24 * 3600
+
+# Cache hits whose access times SQLiteStore buffers before writing them in one transaction
+ACCESS_FLUSH_BATCH = 256
+
+
+def normalize_text(text):
+    """
+    Normalize source text so trivially different copies share a cache entry.
+
+    Applies Unicode NFC normalization, unifies line endings and strips trailing
+    whitespace from each line and the text as a whole.
+
+    Args:
+        text (str): Source text.
+
+    Returns:
+        str: Normalized text.
+    """
+    text = unicodedata.normalize("NFC", text).replace("\r\n", "\n").replace("\r", "\n")
+    return "\n".join(line.rstrip() for line in text.split("\n")).strip()
+
+
+def make_key(text, source_language, target_language, model_id, prompt_version):
+    """
+    Build the cache key for a translation.
+
+    Args:
+        text (str): Source text.
+        source_language (str): Source language.
+        target_language (str): Target language.
+        model_id (str): Bedrock model ID.
+        prompt_version (str): Version of the prompt that produced the translation.
+
+    Returns:
+        str: Hex SHA-256 digest identifying the translation.
+    """
+    payload = json.dumps(
+        [normalize_text(text), source_language, target_language, model_id, prompt_version],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryStore:
+    """
+    In-process LRU store with TTL expiry.
+
+    Kept at module level in Lambda so warm invocations share it.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            translation, created_at = entry
+            if self.ttl_seconds and time.time() - created_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return translation
+
+    def put(self, key, translation):
+        with self._lock:
+            self._entries[key] = (translation, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SQLiteStore:
+    """
+    Persistent store in a local SQLite file, evicting least recently used entries.
+
+    Lookups only read. Access times of hits (and expired keys to delete) are buffered
+    and written in one transaction with the next put, or once ACCESS_FLUSH_BATCH are
+    pending, so that processes sharing the file do not serialize on a write per hit.
+    Buffered access times not yet written when a process exits are lost, which only
+    makes eviction slightly less accurate.
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._accessed = {}
+        self._expired = set()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translation_memory ("
+            "key TEXT PRIMARY KEY, translation TEXT NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS translation_memory_accessed "
+            "ON translation_memory (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT translation, created_at FROM translation_memory WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            translation, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._expired.add(key)
+                translation = None
+            else:
+                self._accessed[key] = now
+            if len(self._accessed) + len(self._expired) >= ACCESS_FLUSH_BATCH:
+                self._write_accesses()
+                self._conn.commit()
+            return translation
+
+    def flush(self):
+        """Write the buffered access times and expired keys."""
+        with self._lock:
+            self._write_accesses()
+            self._conn.commit()
+
+    def _write_accesses(self):
+        """Apply buffered access times and deletions; the caller holds the lock and commits."""
+        if self._accessed:
+            self._conn.executemany(
+                "UPDATE translation_memory SET accessed_at = MAX(accessed_at, ?) WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._accessed.items()]
+            )
+            self._accessed = {}
+        if self._expired:
+            self._conn.executemany(
+                "DELETE FROM translation_memory WHERE key = ? AND created_at < ?",
+                [(key, time.time() - self.ttl_seconds) for key in self._expired]
+            )
+            self._expired = set()
+
+    def put(self, key, translation):
+        now = time.time()
+        with self._lock:
+            self._accessed.pop(key, None)
+            self._expired.discard(key)
+            self._write_accesses()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translation_memory (key, translation, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)", (key, translation, now, now)
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM translation_memory").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM translation_memory WHERE key IN ("
+                    "SELECT key FROM translation_memory ORDER BY accessed_at LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            self._conn.commit()
+
+
+class DynamoDBStore:
+    """
+    Shared store in a DynamoDB table, for Lambda.
+
+    The table needs a string partition key named 'key'. Expiry relies on DynamoDB TTL
+    configured on the 'expires_at' attribute, so no client-side eviction is needed.
+    """
+
+    def __init__(self, table_name, ttl_seconds=DEFAULT_TTL_SECONDS, region_name=None):
+        self.table = boto3.resource("dynamodb", region_name=region_name).Table(table_name)
+        self.ttl_seconds = ttl_seconds
+
+    def get(self, key):
+        item = self.table.get_item(Key={"key": key}).get("Item")
+        if item is None:
+            return None
+        expires_at = item.get("expires_at")
+        if expires_at is not None and int(expires_at) < time.time():
+            return None
+        return item["translation"]
+
+    def put(self, key, translation):
+        item = {"key": key, "translation": translation}
+        if self.ttl_seconds:
+            item["expires_at"] = int(time.time() + self.ttl_seconds)
+        self.table.put_item(Item=item)
+
+
+class TranslationMemory:
+    """
+    Exact-match translation memory in front of the model, with hit/miss counters.
+
+    Store errors are never fatal: a failing lookup counts as a miss and a failing write
+    is ignored.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, text, source_language, target_language, model_id, prompt_version):
+        """
+        Look up a cached translation.
+
+        Returns:
+            str: The cached translation, or None on a miss.
+        """
+        try:
+            translation = self.store.get(
+                make_key(text, source_language, target_language, model_id, prompt_version)
+            )
+        except Exception:
+            translation = None
+        with self._lock:
+            if translation is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return translation
+
+    def put(self, text, source_language, target_language, model_id, prompt_version, translation):
+        """Store a translation."""
+        try:
+            self.store.put(
+                make_key(text, source_language, target_language, model_id, prompt_version), translation
+            )
+        except Exception:
+            pass
+
+    def stats(self):
+        """
+        Return hit/miss counters.
+
+        Returns:
+            dict: 'hits', 'misses' and 'hit_ratio'.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+_environment_store = None
+
+
+def store_from_environment():
+    """
+    Build the translation memory store for Lambda from environment variables.
+
+    TRANSLATION_CACHE_TABLE selects a DynamoDB table; otherwise a module-level in-memory
+    store is reused across warm invocations. TRANSLATION_CACHE_MAX_ENTRIES and
+    TRANSLATION_CACHE_TTL tune eviction. TRANSLATION_CACHE=off disables the cache.
+
+    Returns:
+        object: A store instance, or None when caching is disabled.
+    """
+    global _environment_store
+    if os.environ.get('TRANSLATION_CACHE', 'on').lower() in ('off', 'false', '0'):
+        return None
+    if _environment_store is None:
+        ttl_seconds = int(os.environ.get('TRANSLATION_CACHE_TTL', DEFAULT_TTL_SECONDS))
+        table_name = os.environ.get('TRANSLATION_CACHE_TABLE')
+        if table_name:
+            _environment_store = DynamoDBStore(table_name, ttl_seconds=ttl_seconds)
+        else:
+            max_entries = int(os.environ.get('TRANSLATION_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+            _environment_store = MemoryStore(max_entries=max_entries, ttl_seconds=ttl_seconds)
+    return _environment_store
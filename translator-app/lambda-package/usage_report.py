@@ -0,0 +1,133 @@
+"""
+Token, cost and latency accounting for translation jobs.
+
+Every Bedrock call reports its input and output tokens and its latency. translate_segments
+attributes each call to the segments it carried, in proportion to their estimated size,
+and build_usage_report rolls those figures up per segment, per slide and per job. A
+segment repeated in the deck or found in the translation memory costs nothing; its cost is
+carried by the occurrence that was actually sent to the model.
+"""
+import os
+
+# On-demand USD prices per 1,000 input and output tokens
+MODEL_PRICES = {
+    "anthropic.claude-3-5-sonnet-20240620-v1:0": (0.003, 0.015),
+    "anthropic.claude-3-5-sonnet-20241022-v2:0": (0.003, 0.015),
+    "anthropic.claude-3-haiku-20240307-v1:0": (0.00025, 0.00125),
+}
+
+# Number of slides listed in job summaries
+DEFAULT_TOP_SLIDES = 5
+
+USAGE_FIELDS = ("input_tokens", "output_tokens", "latency_ms", "calls")
+
+
+def empty_usage():
+    """Return a usage dict with every counter at zero."""
+    return {field: 0 for field in USAGE_FIELDS}
+
+
+def add_usage(total, usage, share=1.0):
+    """
+    Add `share` of `usage` into `total` in place.
+
+    Args:
+        total (dict): Usage to add to.
+        usage (dict): Usage to add.
+        share (float): Fraction of `usage` to add.
+    """
+    for field in USAGE_FIELDS:
+        total[field] += usage.get(field, 0) * share
+
+
+def model_prices(model_id):
+    """
+    Return the (input, output) USD price per 1,000 tokens for a model.
+
+    TRANSLATION_PRICE_INPUT_PER_1K and TRANSLATION_PRICE_OUTPUT_PER_1K override the
+    built-in prices, e.g. for other models or negotiated rates.
+    """
+    input_price, output_price = MODEL_PRICES.get(model_id, (0.0, 0.0))
+    return (
+        float(os.environ.get("TRANSLATION_PRICE_INPUT_PER_1K", input_price)),
+        float(os.environ.get("TRANSLATION_PRICE_OUTPUT_PER_1K", output_price))
+    )
+
+
+def finalize(usage, prices):
+    """
+    Round a usage dict and add its cost.
+
+    Args:
+        usage (dict): Usage with possibly fractional counters.
+        prices (tuple): (input, output) USD price per 1,000 tokens.
+
+    Returns:
+        dict: Rounded counters plus 'cost_usd'.
+    """
+    result = {
+        "input_tokens": round(usage["input_tokens"]),
+        "output_tokens": round(usage["output_tokens"]),
+        "latency_ms": round(usage["latency_ms"]),
+        "calls": round(usage["calls"], 2)
+    }
+    result["cost_usd"] = round(
+        usage["input_tokens"] / 1000 * prices[0] + usage["output_tokens"] / 1000 * prices[1], 6
+    )
+    return result
+
+
+def build_usage_report(segments, occurrences, unique_usage, model_id, top_slides=DEFAULT_TOP_SLIDES):
+    """
+    Roll per-text usage up into segment, slide and job figures.
+
+    Args:
+        segments (list): Segments from collect_segments.
+        occurrences (list): Index into the unique texts for every segment.
+        unique_usage (dict): Usage per unique text index, as filled by translate_segments.
+        model_id (str): Model the calls were made to, for pricing.
+        top_slides (int): Number of most expensive slides listed in the summary.
+
+    Returns:
+        dict: 'job' totals, 'slides' (one entry per slide, in order; text outside slides
+            such as masters and layouts is reported under slide None), 'segments' (one entry
+            per segment) and 'top_slides' (the most expensive slides first).
+    """
+    prices = model_prices(model_id)
+    charged = set()
+    job = empty_usage()
+    slides = {}
+    segment_rows = []
+    for segment, unique_index in zip(segments, occurrences):
+        usage = empty_usage()
+        source = "model"
+        if unique_index in charged:
+            source = "duplicate"
+        elif unique_index in unique_usage:
+            add_usage(usage, unique_usage[unique_index])
+            charged.add(unique_index)
+        else:
+            source = "memory"
+        slide = segment['slide'] + 1 if segment['slide'] is not None else None
+        add_usage(slides.setdefault(slide, empty_usage()), usage)
+        add_usage(job, usage)
+        row = {"slide": slide, "kind": segment['kind'], "locator": segment['locator'], "source": source}
+        row.update(finalize(usage, prices))
+        segment_rows.append(row)
+
+    slide_rows = []
+    for slide in sorted(slides, key=lambda slide: (slide is None, slide or 0)):
+        row = {"slide": slide}
+        row.update(finalize(slides[slide], prices))
+        slide_rows.append(row)
+    ranked = sorted((row for row in slide_rows if row["cost_usd"] > 0),
+                    key=lambda row: (row["cost_usd"], row["latency_ms"]), reverse=True)
+
+    return {
+        "model_id": model_id,
+        "prices_per_1k": {"input": prices[0], "output": prices[1]},
+        "job": finalize(job, prices),
+        "top_slides": ranked[:top_slides],
+        "slides": slide_rows,
+        "segments": segment_rows
+    }
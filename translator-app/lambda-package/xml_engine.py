@@ -0,0 +1,195 @@
+"""
+Text-only translation engine working directly on the package XML.
+
+Translation only needs the parts that carry text. Instead of building the full
+python-pptx part graph (themes, media and the proxy objects around them), this engine
+resolves the slide order from the package relationships, parses just the text-bearing
+parts, and writes the package back by copying every untouched member raw and
+re-serializing only the parts whose text changed.
+
+The traversal here (text_parts and text_elements) is shared with the object-model path:
+it works on any package exposing element(), related_partnames() and rel_targets(), so
+both engines find the same text and produce the same part XML.
+"""
+import zipfile
+
+from lxml import etree
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.oxml import serialize_part_xml
+from pptx.opc.packuri import PACKAGE_URI, PackURI
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import namespaces, qn
+
+from lazy_package import LazyBlob, _PassThroughZipPkgWriter
+
+# SmartArt drawings (the rendered copy of a diagram) are related with an Office 2007 type
+RT_DIAGRAM_DRAWING = "http://schemas.microsoft.com/office/2007/relationships/diagramDrawing"
+
+_NAMESPACES = dict(
+    namespaces("a", "c", "p", "r"),
+    dgm="http://schemas.openxmlformats.org/drawingml/2006/diagram",
+    dsp="http://schemas.microsoft.com/office/drawing/2008/diagram",
+)
+
+# Text of a part, by part kind, in document order. Shape text includes group members,
+# graphic frames and table cells; notes text is the body placeholder only.
+_SHAPE_TEXT_XPATH = etree.XPath(".//p:txBody | .//a:tc/a:txBody", namespaces=_NAMESPACES)
+_TEXT_XPATHS = {
+    "slide": _SHAPE_TEXT_XPATH,
+    "layout": _SHAPE_TEXT_XPATH,
+    "master": _SHAPE_TEXT_XPATH,
+    "notes": etree.XPath(
+        '(./p:cSld/p:spTree/p:sp[p:nvSpPr/p:nvPr/p:ph[@type="body"]])[1]/p:txBody', namespaces=_NAMESPACES
+    ),
+    "chart": etree.XPath(".//c:rich | .//c:strCache/c:pt/c:v | .//c:lvl/c:pt/c:v", namespaces=_NAMESPACES),
+    "diagram": etree.XPath(".//dgm:t | .//dsp:txBody", namespaces=_NAMESPACES),
+}
+
+# Plain string values (chart series names and category labels) rather than text bodies
+VALUE_TAG = qn("c:v")
+
+
+def slide_partnames(package):
+    """
+    Return the slides of the presentation in presentation order.
+
+    Args:
+        package: XmlPackage or LazyPackage.
+
+    Returns:
+        list: (slide_partname, notes_partname) tuples; notes_partname is None for slides
+            without speaker notes.
+    """
+    presentation_partname = package.related_partnames(PACKAGE_URI, RT.OFFICE_DOCUMENT)[0]
+    presentation_rels = package.rel_targets(presentation_partname)
+    sldIdLst = package.element(presentation_partname).find(qn("p:sldIdLst"))
+
+    slides = []
+    for sldId in (sldIdLst if sldIdLst is not None else []):
+        slide_partname = presentation_rels[sldId.get(qn("r:id"))]
+        notes_partnames = package.related_partnames(slide_partname, RT.NOTES_SLIDE)
+        slides.append((slide_partname, notes_partnames[0] if notes_partnames else None))
+    return slides
+
+
+def text_parts(package):
+    """
+    Enumerate every text-bearing part of the package once, in a stable order.
+
+    Each slide comes with its charts, SmartArt data and drawings and its notes, in
+    presentation order; slide masters and their layouts follow.
+
+    Args:
+        package: XmlPackage or LazyPackage.
+
+    Returns:
+        list: (kind, slide_index, partname) tuples; kind is 'slide', 'chart', 'diagram',
+            'notes', 'master' or 'layout' and slide_index is None for masters and layouts.
+    """
+    parts = []
+    seen = set()
+
+    def add(kind, slide_index, partname):
+        if partname not in seen:
+            seen.add(partname)
+            parts.append((kind, slide_index, partname))
+
+    for slide_index, (slide_partname, notes_partname) in enumerate(slide_partnames(package)):
+        add("slide", slide_index, slide_partname)
+        for reltype, kind in ((RT.CHART, "chart"), (RT.DIAGRAM_DATA, "diagram"), (RT_DIAGRAM_DRAWING, "diagram")):
+            for partname in package.related_partnames(slide_partname, reltype):
+                add(kind, slide_index, partname)
+        if notes_partname is not None:
+            add("notes", slide_index, notes_partname)
+
+    presentation_partname = package.related_partnames(PACKAGE_URI, RT.OFFICE_DOCUMENT)[0]
+    for master_partname in package.related_partnames(presentation_partname, RT.SLIDE_MASTER):
+        add("master", None, master_partname)
+        for layout_partname in package.related_partnames(master_partname, RT.SLIDE_LAYOUT):
+            add("layout", None, layout_partname)
+    return parts
+
+
+def text_elements(kind, root):
+    """
+    Return the text-bearing elements of a part in document order.
+
+    Args:
+        kind (str): Part kind from text_parts.
+        root: Root element of the part.
+
+    Returns:
+        list: Text body elements (`p:txBody`, `a:txBody`, `c:rich`, `dgm:t`, `dsp:txBody`),
+            whose paragraphs are `a:p`, and `c:v` string values.
+    """
+    return _TEXT_XPATHS[kind](root)
+
+
+def text_locator(partname, element):
+    """Return a stable identifier of a text element: its partname and path within the part."""
+    return "%s#%s" % (partname, element.getroottree().getpath(element))
+
+
+class XmlPackage:
+    """
+    Minimal read/modify/write access to the XML parts of a .pptx package.
+
+    Parts are identified by partname. Parsed elements are modified in place; parts passed
+    to `mark_dirty()` are serialized on save and every other member is copied raw.
+    """
+
+    def __init__(self, pkg_file):
+        self._zip_file = zipfile.ZipFile(pkg_file, "r")
+        self._members = {
+            PackURI("/%s" % info.filename): info for info in self._zip_file.infolist()
+        }
+        self._elements = {}
+        self._dirty = set()
+
+    def element(self, partname):
+        """Return the parsed root element of `partname`, parsing it on first access."""
+        if partname not in self._elements:
+            self._elements[partname] = parse_xml(self._zip_file.read(self._members[partname]))
+        return self._elements[partname]
+
+    def mark_dirty(self, partname):
+        """Record that the element of `partname` was modified."""
+        self._dirty.add(partname)
+
+    def save(self, pkg_file):
+        """
+        Write the package to `pkg_file`, copying unmodified members without recompressing.
+
+        Args:
+            pkg_file (str or file-like): Destination path or binary stream.
+        """
+        with _PassThroughZipPkgWriter(pkg_file) as writer:
+            for partname, info in self._members.items():
+                if partname in self._dirty:
+                    writer.write(partname, serialize_part_xml(self._elements[partname]))
+                else:
+                    writer.copy_raw(partname, LazyBlob(self._zip_file, info))
+
+    def rel_targets(self, partname):
+        """Return {rId: target partname} for the internal relationships of `partname`."""
+        rels_uri = partname.rels_uri
+        if rels_uri not in self._members:
+            return {}
+        rels = parse_xml(self._zip_file.read(self._members[rels_uri]))
+        return {
+            rel.rId: PackURI.from_rel_ref(partname.baseURI, rel.target_ref)
+            for rel in rels.relationship_lst
+            if rel.targetMode != "External"
+        }
+
+    def related_partnames(self, partname, reltype):
+        """Return partnames related to `partname` by relationships of `reltype`."""
+        rels_uri = partname.rels_uri
+        if rels_uri not in self._members:
+            return []
+        rels = parse_xml(self._zip_file.read(self._members[rels_uri]))
+        return [
+            PackURI.from_rel_ref(partname.baseURI, rel.target_ref)
+            for rel in rels.relationship_lst
+            if rel.reltype == reltype and rel.targetMode != "External"
+        ]
@@ -1,15 +1,11 @@
 import json
-import boto3
+from aws_clients import get_client
 import os
-import logging
+from debug_utils import setup_logger
 from botocore.exceptions import ClientError
 
 # Set up logging with detailed format
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+logger = setup_logger(__name__)
 
 def generate_presigned_url(s3_bucket_name, s3_object_key, operation='get_object', expiration=3600, content_type=None):
     """
@@ -25,7 +21,7 @@ def generate_presigned_url(s3_bucket_name, s3_object_key, operation='get_object'
     Returns:
         str or dict: Presigned URL for get_object or presigned POST data for put_object
     """
-    s3_client = boto3.client('s3')
+    s3_client = get_client('s3')
     try:
         # For put_object operations, use presigned POST which works better with browsers
         if operation == 'put_object':
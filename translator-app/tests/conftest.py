@@ -0,0 +1,11 @@
+import os
+import sys
+
+# The API handlers live in translator-app and the translation engine in lambda-package.
+# lambda-package is appended, not prepended, so that installed builds of its vendored
+# dependencies (lxml, pptx, boto3) take precedence over the Lambda platform builds.
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+sys.path.append(os.path.join(APP_DIR, "lambda-package"))
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
@@ -0,0 +1,80 @@
+import threading
+
+import pytest
+
+import job_store
+from job_store import (
+    JOB_COMPLETED, JOB_PENDING, JOB_PROCESSING, InMemoryJobStore, JobStoreNotConfigured, JobTracker,
+    SQLiteJobStore, tracker_from_environment
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_environment(monkeypatch):
+    for name in ("JOB_TABLE_NAME", "JOB_STORE_PATH", "AWS_LAMBDA_FUNCTION_NAME"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(job_store, "_environment_tracker", None)
+
+
+@pytest.mark.parametrize("store", ["memory", "sqlite"])
+def test_tracker_transitions(store, tmp_path):
+    backend = InMemoryJobStore() if store == "memory" else SQLiteJobStore(str(tmp_path / "jobs.db"))
+    jobs = JobTracker(backend)
+    assert jobs.get("job-1") is None
+
+    created = jobs.create("job-1", fileKey="deck.pptx")
+    assert created["status"] == JOB_PENDING and created["progress"] == 0
+
+    jobs.update("job-1", status=JOB_PROCESSING, progress=40, usage={"cost_usd": 0.25})
+    jobs.update("job-1", status=JOB_COMPLETED, progress=100)
+    job = jobs.get("job-1")
+    assert job["status"] == JOB_COMPLETED
+    assert job["progress"] == 100
+    assert job["fileKey"] == "deck.pptx"
+    assert job["usage"] == {"cost_usd": 0.25}
+    assert job["updatedAt"] >= job["createdAt"]
+
+
+def test_sqlite_store_is_shared_between_trackers(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    JobTracker(SQLiteJobStore(path)).create("job-1")
+    JobTracker(SQLiteJobStore(path)).update("job-1", status=JOB_COMPLETED)
+    assert JobTracker(SQLiteJobStore(path)).get("job-1")["status"] == JOB_COMPLETED
+
+
+def test_environment_defaults_to_memory_outside_lambda():
+    assert isinstance(tracker_from_environment().store, InMemoryJobStore)
+
+
+def test_environment_selects_sqlite(monkeypatch, tmp_path):
+    monkeypatch.setenv("JOB_STORE_PATH", str(tmp_path / "jobs.db"))
+    assert isinstance(tracker_from_environment().store, SQLiteJobStore)
+
+
+def test_environment_requires_a_shared_store_on_lambda(monkeypatch):
+    monkeypatch.setenv("AWS_LAMBDA_FUNCTION_NAME", "translator")
+    with pytest.raises(JobStoreNotConfigured):
+        tracker_from_environment()
+    # A store path is enough
+    monkeypatch.setenv("JOB_STORE_PATH", ":memory:")
+    assert isinstance(tracker_from_environment().store, SQLiteJobStore)
+
+
+def test_environment_tracker_is_created_once(monkeypatch):
+    created = []
+    original = job_store.InMemoryJobStore
+
+    def slow_store():
+        created.append(True)
+        threading.Event().wait(0.05)
+        return original()
+
+    monkeypatch.setattr(job_store, "InMemoryJobStore", slow_store)
+    trackers = []
+    threads = [threading.Thread(target=lambda: trackers.append(tracker_from_environment())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 1
+    assert all(tracker is trackers[0] for tracker in trackers)
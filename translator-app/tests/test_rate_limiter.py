@@ -0,0 +1,69 @@
+import pytest
+from botocore.exceptions import ClientError
+
+import rate_limiter
+from rate_limiter import AdaptiveRateLimiter, TokenBucket
+
+
+def client_error(code):
+    return ClientError({"Error": {"Code": code, "Message": code}}, "Converse")
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(rate_limiter.time, "sleep", lambda seconds: None)
+
+
+def failing(*errors, result="ok", tokens=10):
+    errors = list(errors)
+
+    def request():
+        if errors:
+            raise errors.pop(0)
+        return result, tokens
+    return request
+
+
+def test_token_bucket_makes_callers_wait_once_empty():
+    bucket = TokenBucket(60)
+    capacity = bucket.capacity()
+    assert bucket.reserve(capacity) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.01)
+
+
+def test_throttling_is_retried_and_lowers_the_rate():
+    limiter = AdaptiveRateLimiter(requests_per_minute=600)
+    assert limiter.call(failing(client_error("ThrottlingException")), 10) == "ok"
+    stats = limiter.stats()
+    assert (stats["throttled"], stats["retried"], stats["attempts"]) == (1, 1, 2)
+    assert stats["requests_per_minute"] < 600
+
+
+def test_camel_case_stream_errors_are_recognized():
+    limiter = AdaptiveRateLimiter()
+    assert limiter.call(failing(client_error("throttlingException")), 10) == "ok"
+    assert limiter.stats()["throttled"] == 1
+
+
+def test_non_retryable_errors_are_raised_at_once():
+    limiter = AdaptiveRateLimiter()
+    with pytest.raises(ClientError):
+        limiter.call(failing(client_error("ValidationException")), 10)
+    assert limiter.stats()["attempts"] == 1
+
+
+def test_retries_stop_at_max_attempts():
+    limiter = AdaptiveRateLimiter(max_attempts=3)
+    with pytest.raises(ClientError):
+        limiter.call(failing(*[client_error("ServiceUnavailableException")] * 5), 10)
+    stats = limiter.stats()
+    assert (stats["attempts"], stats["failed"]) == (3, 1)
+
+
+def test_open_limiter_learns_a_rate_from_the_first_throttle():
+    limiter = AdaptiveRateLimiter()
+    for _ in range(5):
+        limiter.call(failing(), 100)
+    assert limiter.stats()["requests_per_minute"] is None
+    limiter.call(failing(client_error("ThrottlingException")), 100)
+    assert limiter.stats()["requests_per_minute"] is not None
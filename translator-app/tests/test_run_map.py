@@ -0,0 +1,78 @@
+import pytest
+from pptx import Presentation
+from pptx.util import Inches
+
+from run_map import apply_runs, capture_runs, has_tags
+
+
+@pytest.fixture
+def text_frame():
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    return slide.shapes.add_textbox(Inches(1), Inches(1), Inches(4), Inches(2)).text_frame
+
+
+def add_runs(paragraph, *runs):
+    for text, bold in runs:
+        run = paragraph.add_run()
+        run.text = text
+        run.font.bold = bold
+
+
+def runs_of(text_frame):
+    return [[(run.text, run.font.bold) for run in paragraph.runs] for paragraph in text_frame.paragraphs]
+
+
+def test_uniform_paragraph_carries_no_tags(text_frame):
+    add_runs(text_frame.paragraphs[0], ("Plain ", None), ("text", None))
+    run_map = capture_runs(text_frame._txBody)
+    assert run_map.text == "Plain text"
+    assert not has_tags(run_map.text)
+
+
+def test_formatting_survives_translation(text_frame):
+    add_runs(text_frame.paragraphs[0], ("Revenue grew ", None), ("42%", True), (" in Q3", None))
+    run_map = capture_runs(text_frame._txBody)
+    assert run_map.text == "Revenue grew <2>42%</2> in Q3"
+    apply_runs(text_frame._txBody, run_map, "Der Umsatz stieg im Q3 um <2>42 %</2>")
+    assert runs_of(text_frame) == [[("Der Umsatz stieg im Q3 um ", None), ("42 %", True)]]
+
+
+def test_unbalanced_tags_fall_back_to_base_formatting(text_frame):
+    add_runs(text_frame.paragraphs[0], ("Revenue grew ", None), ("42%", True))
+    run_map = capture_runs(text_frame._txBody)
+    apply_runs(text_frame._txBody, run_map, "Umsatz <2>42 %")
+    assert runs_of(text_frame) == [[("Umsatz 42 %", None)]]
+
+
+def test_line_breaks_are_kept(text_frame):
+    paragraph = text_frame.paragraphs[0]
+    add_runs(paragraph, ("first", None))
+    paragraph.add_line_break()
+    add_runs(paragraph, ("second", None))
+    run_map = capture_runs(text_frame._txBody)
+    apply_runs(text_frame._txBody, run_map, run_map.text.upper())
+    assert text_frame.paragraphs[0].text == "FIRST\vSECOND"
+
+
+def test_tag_like_source_text_is_literal(text_frame):
+    paragraph = text_frame.paragraphs[0]
+    add_runs(paragraph, ("Use <3> and </2> in ", None), ("code", True))
+    paragraph.add_line_break()
+    add_runs(paragraph, ("second line", None))
+    add_runs(text_frame.add_paragraph(), ("Normal ", None), ("bold", True))
+    run_map = capture_runs(text_frame._txBody)
+    assert run_map.literal == [True, False]
+    assert run_map.text.split("\n")[0] == "Use <3> and </2> in code\vsecond line"
+
+    apply_runs(text_frame._txBody, run_map, run_map.text.upper())
+    assert text_frame.paragraphs[0].text == "USE <3> AND </2> IN CODE\vSECOND LINE"
+    assert runs_of(text_frame)[1] == [("NORMAL ", None), ("BOLD", True)]
+
+
+def test_surplus_lines_merge_into_the_last_paragraph(text_frame):
+    add_runs(text_frame.paragraphs[0], ("one", None))
+    add_runs(text_frame.add_paragraph(), ("two", None))
+    run_map = capture_runs(text_frame._txBody)
+    apply_runs(text_frame._txBody, run_map, "eins\nzwei\ndrei")
+    assert [paragraph.text for paragraph in text_frame.paragraphs] == ["eins", "zwei drei"]
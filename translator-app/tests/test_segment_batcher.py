@@ -0,0 +1,114 @@
+import json
+import re
+
+import pytest
+
+from main import BedrockTranslator
+from segment_batcher import (
+    DEFAULT_BATCH_MAX_SEGMENTS, BatchParseError, estimate_tokens, pack_batches,
+    parse_batch_response
+)
+
+# JSON punctuation is tokenized on its own, unlike the ~4 characters per token of prose
+_PUNCTUATION = re.compile(r'[{}":,\n]')
+
+
+def reply_tokens(reply):
+    """Pessimistically count the tokens of a JSON reply."""
+    return len(_PUNCTUATION.findall(reply)) + estimate_tokens(_PUNCTUATION.sub("", reply))
+
+
+def envelope_of(prompt):
+    return json.loads(prompt[prompt.index("\n\n{") + 2:])
+
+
+class FakeModel:
+    """Stands in for BedrockTranslator.invoke_model, answering batches in upper case."""
+
+    def __init__(self, broken_batches=0):
+        self.broken_batches = broken_batches
+        self.calls = []
+
+    def __call__(self, prompt, use_reasoning=False, temperature=0.7, max_tokens=3000, top_p=0.9, on_text=None):
+        self.calls.append((prompt, max_tokens))
+        if "\n\n{" not in prompt:
+            return prompt.rsplit("\n\n", 1)[1].upper()
+        segments = envelope_of(prompt)
+        if self.broken_batches:
+            self.broken_batches -= 1
+            # Truncated reply
+            return json.dumps({key: value.upper() for key, value in segments.items()})[:-5]
+        return json.dumps({key: value.upper() for key, value in segments.items()}, ensure_ascii=False)
+
+
+@pytest.fixture
+def translator():
+    translator = BedrockTranslator(batch_token_budget=2000)
+    translator.invoke_model = FakeModel()
+    return translator
+
+
+def test_pack_batches_respects_budget_and_segment_limit():
+    texts = ["word " * 10] * 30
+    batches = pack_batches(texts, token_budget=40, max_segments=2)
+    assert [index for batch in batches for index in batch] == list(range(30))
+    assert all(len(batch) <= 2 for batch in batches)
+    assert all(sum(estimate_tokens(texts[i]) for i in batch) <= 40 or len(batch) == 1 for batch in batches)
+
+
+def test_parse_batch_response_accepts_code_fences():
+    response = '```json\n{"0": "Hallo", "1": "Welt"}\n```'
+    assert parse_batch_response(response, ["0", "1"]) == {"0": "Hallo", "1": "Welt"}
+
+
+@pytest.mark.parametrize("response", [
+    "no json here",
+    '{"0": "Hallo"',
+    '["Hallo", "Welt"]',
+    '{"0": "Hallo"}',
+    '{"0": "Hallo", "1": 2}',
+])
+def test_parse_batch_response_rejects_malformed_replies(response):
+    with pytest.raises(BatchParseError):
+        parse_batch_response(response, ["0", "1"])
+
+
+def test_full_batch_of_short_segments_fits_its_output_limit(translator):
+    texts = ["a"] * (DEFAULT_BATCH_MAX_SEGMENTS * 3)
+    batch = pack_batches(texts, token_budget=2000)[0]
+    assert len(batch) == DEFAULT_BATCH_MAX_SEGMENTS
+    # IDs as long as those of a large deck
+    segment_ids = [str(1000 + i) for i in batch]
+    # Translations at the expected growth ratio of two
+    reply = json.dumps({segment_id: "aa" for segment_id in segment_ids}, ensure_ascii=False, indent=0)
+    limit = translator.output_token_limit([texts[i] for i in batch], False, None, segment_ids)
+    assert reply_tokens(reply) <= limit
+
+
+def test_output_limit_counts_escaped_characters(translator):
+    texts = ['"q"\n' * 100] * 2
+    plain = translator.output_token_limit(["xqxx" * 100] * 2, False, None, ["0", "1"])
+    assert translator.output_token_limit(texts, False, None, ["0", "1"]) > plain
+
+
+def test_translate_packed_sends_one_request(translator):
+    texts = ["first", "second", "third"]
+    assert translator.translate_packed(texts) == ["FIRST", "SECOND", "THIRD"]
+    assert len(translator.invoke_model.calls) == 1
+
+
+def test_translate_packed_halves_malformed_batches(translator):
+    translator.invoke_model = FakeModel(broken_batches=1)
+    texts = ["one", "two", "three", "four"]
+    assert translator.translate_packed(texts) == ["ONE", "TWO", "THREE", "FOUR"]
+    sizes = [len(envelope_of(prompt)) for prompt, _ in translator.invoke_model.calls]
+    assert sizes == [4, 2, 2]
+
+
+def test_translate_packed_splits_batches_whose_reply_cannot_fit(translator):
+    texts = ["word " * 100] * 4
+    translations = translator.translate_packed(texts, max_tokens=700)
+    assert translations == [text.upper() for text in texts]
+    assert all(max_tokens <= 700 for _, max_tokens in translator.invoke_model.calls)
+    # Nothing is sent that would be cut off and retried
+    assert all(len(envelope_of(prompt)) == 2 for prompt, _ in translator.invoke_model.calls)
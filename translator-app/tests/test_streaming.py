@@ -0,0 +1,26 @@
+from main import STREAM_RESTART_MARKER, StreamEcho
+
+
+def stream(echo, *attempts):
+    for pieces in attempts:
+        echo.restart()
+        for piece in pieces:
+            echo(piece)
+
+
+def test_retried_stream_is_not_repeated():
+    shown = []
+    stream(StreamEcho(shown.append), ["Hallo", " Wel"], ["Hal", "lo W", "elt", "!"])
+    assert "".join(shown) == "Hallo Welt!"
+
+
+def test_retry_stopping_short_shows_nothing_twice():
+    shown = []
+    stream(StreamEcho(shown.append), ["Hallo Welt"], ["Hallo"], ["Hallo Welt!"])
+    assert "".join(shown) == "Hallo Welt!"
+
+
+def test_diverging_retry_is_marked_and_shown_whole():
+    shown = []
+    stream(StreamEcho(shown.append), ["Hallo Wel"], ["Servus", " Welt"])
+    assert "".join(shown) == "Hallo Wel" + STREAM_RESTART_MARKER + "Servus Welt"
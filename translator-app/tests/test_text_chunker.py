@@ -0,0 +1,81 @@
+import random
+import re
+
+import pytest
+
+from text_chunker import join_chunks, split_text, tags_balanced
+
+WORDS = "alpha beta gamma. delta epsilon! zeta eta theta".split()
+TAGS = re.compile(r"<[^>]*>")
+
+
+def tagged_paragraph(rng):
+    parts = []
+    for n in range(1, rng.randint(2, 30)):
+        words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 40)))
+        kind = rng.random()
+        if kind < 0.4:
+            parts.append("<%d>%s</%d>" % (n, words, n))
+        elif kind < 0.5:
+            parts.append("<%d/>" % n)
+        else:
+            parts.append(words)
+    return " ".join(parts)
+
+
+def test_short_text_is_one_chunk():
+    assert split_text("<1>Hello</1> world", 100) == [("<1>Hello</1> world", "")]
+
+
+def test_paragraphs_are_grouped_and_rejoined():
+    text = "\n".join("paragraph %d with some words" % i for i in range(20))
+    chunks = split_text(text, 20)
+    assert len(chunks) > 1
+    assert "".join(chunk + separator for chunk, separator in chunks) == text
+    assert join_chunks(chunks, [chunk.upper() for chunk, _ in chunks]) == text.upper()
+
+
+def test_sentences_inside_a_span_are_not_split_outside_it():
+    text = "<1>One two three four five. Six seven eight nine ten.</1> plain words here ok"
+    chunks = split_text(text, 5)
+    assert all(tags_balanced(chunk) for chunk, _ in chunks)
+    assert chunks[-1] == ("plain words here ok", "")
+    # An oversized span is closed and reopened around every cut
+    assert all(chunk.startswith("<1>") and chunk.endswith("</1>") for chunk, _ in chunks[:-1])
+
+
+def test_tags_are_never_cut():
+    text = "x" * 30 + "<12>" + "y" * 30 + "</12>"
+    for chunk, _ in split_text(text, 5):
+        assert tags_balanced(chunk)
+        assert not re.search(r"<[^>]*$|^[^<]*>", chunk)
+
+
+@pytest.mark.parametrize("seed", range(50))
+@pytest.mark.parametrize("budget", [5, 20, 60])
+def test_random_tagged_text_splits_into_balanced_chunks(seed, budget):
+    rng = random.Random(seed)
+    text = "\n".join(tagged_paragraph(rng) for _ in range(rng.randint(1, 3)))
+    chunks = split_text(text, budget)
+    assert all(tags_balanced(chunk) for chunk, _ in chunks)
+    joined = "".join(chunk + separator for chunk, separator in chunks)
+    # Only tags are added around split spans; the text itself round-trips
+    assert TAGS.sub("", joined) == TAGS.sub("", text)
+
+
+def test_literal_tag_text_is_still_split():
+    text = "x " * 30 + "<3> code\n" + "y " * 30
+    chunks = split_text(text, 10)
+    assert len(chunks) > 1
+    assert "".join(chunk + separator for chunk, separator in chunks) == text
+
+
+@pytest.mark.parametrize("text, balanced", [
+    ("<1>a</1><2/>b", True),
+    ("<1>a", False),
+    ("a</1>", False),
+    ("<1>a<2>b</2></1>", False),
+    ("<1>a</2>", False),
+])
+def test_tags_balanced(text, balanced):
+    assert tags_balanced(text) is balanced
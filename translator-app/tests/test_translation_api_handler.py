@@ -0,0 +1,100 @@
+import json
+
+import pytest
+
+import job_store
+import translation_api_handler
+from job_store import JOB_COMPLETED, JOB_FAILED, JOB_PENDING, JOB_PROCESSING, tracker_from_environment
+
+
+class FakeLambda:
+    def __init__(self, error=None):
+        self.error = error
+        self.invocations = []
+
+    def invoke(self, FunctionName, InvocationType, Payload):
+        if self.error is not None:
+            raise self.error
+        self.invocations.append(json.loads(Payload))
+        return {"StatusCode": 202}
+
+
+@pytest.fixture
+def lambda_client(monkeypatch, tmp_path):
+    # A shared SQLite file stands in for the DynamoDB table both Lambdas use
+    monkeypatch.setenv("JOB_STORE_PATH", str(tmp_path / "jobs.db"))
+    monkeypatch.setenv("TRANSLATION_LAMBDA_NAME", "arn:aws:lambda:us-east-1:123456789012:function:translate")
+    monkeypatch.delenv("JOB_TABLE_NAME", raising=False)
+    monkeypatch.setattr(job_store, "_environment_tracker", None)
+    client = FakeLambda()
+    monkeypatch.setattr(translation_api_handler, "get_client", lambda service: client)
+    return client
+
+
+def request(method, path, body=None, **query):
+    event = {"httpMethod": method, "path": path, "headers": {}, "queryStringParameters": query or None}
+    if body is not None:
+        event["body"] = json.dumps(body)
+    response = translation_api_handler.lambda_handler(event, None)
+    return response["statusCode"], json.loads(response["body"]) if response["body"] else None
+
+
+def worker_update(job_id, **fields):
+    """Update the job as the translation Lambda would, from a separate tracker."""
+    job_store._environment_tracker = None
+    tracker_from_environment().update(job_id, **fields)
+    job_store._environment_tracker = None
+
+
+def test_job_lifecycle(lambda_client):
+    status, body = request("POST", "/translate", {"fileKey": "uploads/deck.pptx", "targetLanguage": "ja"})
+    assert status == 200
+    job_id = body["jobId"]
+    assert lambda_client.invocations[0]["jobId"] == job_id
+
+    status, body = request("GET", "/status", jobId=job_id)
+    assert (status, body["status"], body["progress"]) == (200, JOB_PENDING, 0)
+    status, body = request("GET", "/result", jobId=job_id)
+    assert (status, body["status"]) == (409, JOB_PENDING)
+
+    worker_update(job_id, status=JOB_PROCESSING, progress=50, slidesDone=2, slidesTotal=4)
+    status, body = request("GET", "/status", jobId=job_id)
+    assert (status, body["status"], body["progress"], body["slidesDone"]) == (200, JOB_PROCESSING, 50, 2)
+    assert request("GET", "/result", jobId=job_id)[0] == 409
+
+    worker_update(job_id, status=JOB_COMPLETED, progress=100, outputBucket="out", outputKey="translated/deck.pptx")
+    assert request("GET", "/status", jobId=job_id)[1]["status"] == JOB_COMPLETED
+    status, body = request("GET", "/result", jobId=job_id)
+    assert (status, body["bucket"], body["fileKey"]) == (200, "out", "translated/deck.pptx")
+
+
+def test_failed_job_has_no_result(lambda_client):
+    job_id = request("POST", "/translate", {"fileKey": "deck.pptx"})[1]["jobId"]
+    worker_update(job_id, status=JOB_FAILED, error="Failed to download input file from S3")
+    status, body = request("GET", "/status", jobId=job_id)
+    assert (status, body["status"], body["error"]) == (200, JOB_FAILED, "Failed to download input file from S3")
+    status, body = request("GET", "/result", jobId=job_id)
+    assert (status, body["status"]) == (409, JOB_FAILED)
+
+
+def test_failed_invocation_marks_the_job_failed(lambda_client):
+    lambda_client.error = RuntimeError("boom")
+    status, _ = request("POST", "/translate", {"fileKey": "deck.pptx"})
+    assert status == 500
+    job_id = tracker_from_environment().store._conn.execute("SELECT job_id FROM jobs").fetchone()[0]
+    assert tracker_from_environment().get(job_id)["status"] == JOB_FAILED
+
+
+@pytest.mark.parametrize("path", ["/status", "/result"])
+def test_unknown_and_missing_job_ids(lambda_client, path):
+    assert request("GET", path, jobId="no-such-job")[0] == 404
+    assert request("GET", path)[0] == 400
+
+
+def test_missing_job_store_on_lambda_is_a_server_error(lambda_client, monkeypatch):
+    monkeypatch.delenv("JOB_STORE_PATH")
+    monkeypatch.setenv("AWS_LAMBDA_FUNCTION_NAME", "api")
+    assert request("GET", "/status", jobId="job")[0] == 500
+    status, _ = request("POST", "/translate", {"fileKey": "deck.pptx"})
+    assert status == 500
+    assert lambda_client.invocations == []
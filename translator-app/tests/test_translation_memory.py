@@ -0,0 +1,62 @@
+import sqlite3
+
+import translation_memory
+from translation_memory import SQLiteStore
+
+
+def accessed_at(path, key):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT accessed_at FROM translation_memory WHERE key = ?", (key,)).fetchone()[0]
+
+
+def test_hits_do_not_write(tmp_path):
+    path = str(tmp_path / "tm.sqlite3")
+    store = SQLiteStore(path)
+    store.put("a", "A")
+    written = accessed_at(path, "a")
+    statements = []
+    store._conn.set_trace_callback(statements.append)
+    for _ in range(10):
+        assert store.get("a") == "A"
+    assert all(statement.lstrip().upper().startswith("SELECT") for statement in statements)
+    assert accessed_at(path, "a") == written
+
+    store.flush()
+    assert accessed_at(path, "a") > written
+
+
+def test_access_times_are_written_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(translation_memory, "ACCESS_FLUSH_BATCH", 3)
+    path = str(tmp_path / "tm.sqlite3")
+    store = SQLiteStore(path)
+    for key in "abc":
+        store.put(key, key.upper())
+    before = accessed_at(path, "a")
+    store.get("a")
+    store.get("b")
+    assert accessed_at(path, "a") == before
+    store.get("c")
+    assert accessed_at(path, "a") > before
+
+
+def test_recent_hits_survive_eviction(tmp_path):
+    store = SQLiteStore(str(tmp_path / "tm.sqlite3"), max_entries=2)
+    store.put("old", "1")
+    store.put("new", "2")
+    assert store.get("old") == "1"
+    # The buffered hit is written before eviction picks the least recently used entry
+    store.put("newest", "3")
+    assert store.get("old") == "1"
+    assert store.get("new") is None
+
+
+def test_expired_entries_are_misses_and_deleted_on_flush(tmp_path, monkeypatch):
+    path = str(tmp_path / "tm.sqlite3")
+    store = SQLiteStore(path, ttl_seconds=60)
+    store.put("a", "A")
+    now = translation_memory.time.time()
+    monkeypatch.setattr(translation_memory.time, "time", lambda: now + 120)
+    assert store.get("a") is None
+    store.flush()
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM translation_memory").fetchone()[0] == 0
@@ -1,12 +1,15 @@
 import json
-import boto3
 import os
 import logging
 import uuid
 import traceback
 import datetime
+import time
 from botocore.exceptions import ClientError
-from debug_utils import setup_logger, log_event, handle_debug_request, handle_health_check
+from aws_clients import get_client, lambda_function_arn
+from debug_utils import LazyJson, setup_logger, log_event, handle_debug_request, handle_health_check
+from job_store import JOB_COMPLETED, JOB_FAILED, tracker_from_environment
+from metrics import get_metrics
 
 # Set up logging with detailed format
 logger = setup_logger(__name__)
@@ -15,6 +18,9 @@ def lambda_handler(event, context):
     """
     Lambda function handler to handle translation API requests.
     
+    Request count, latency and error counts are buffered while the request is handled
+    and flushed once as CloudWatch EMF metrics before returning.
+    
     Args:
         event (dict): Lambda event data
         context (object): Lambda context object
@@ -22,6 +28,23 @@ def lambda_handler(event, context):
     Returns:
         dict: Response with status code and appropriate data
     """
+    started = time.monotonic()
+    response = route_request(event, context)
+    
+    metrics = get_metrics()
+    metrics.set_property('requestId', getattr(context, 'aws_request_id', None))
+    metrics.set_property('path', event.get('path'))
+    metrics.count('ApiRequests')
+    if response['statusCode'] >= 500:
+        metrics.count('ApiServerErrors')
+    elif response['statusCode'] >= 400:
+        metrics.count('ApiClientErrors')
+    metrics.observe('ApiLatency', round((time.monotonic() - started) * 1000, 1))
+    metrics.flush()
+    return response
+
+def route_request(event, context):
+    """Dispatch an API request to its handler and return the response."""
     # Log the event with sensitive data redacted
     log_event(event, context, logger)
     
@@ -115,14 +138,12 @@ def handle_translate_request(event, cors_headers):
         # Generate a unique job ID
         job_id = str(uuid.uuid4())
         
-        # In a real implementation, you would start the translation process here
-        # For now, we'll just return a job ID
         logger.info(f"Translation job initiated: {job_id} for file {file_key} from {source_language} to {target_language}")
         
         # Trigger the main translation Lambda function
         try:
             # Create a synthetic S3 event to trigger the main Lambda function
-            lambda_client = boto3.client('lambda')
+            lambda_client = get_client('lambda')
             
             # Get the original bucket name from environment variable or use a default
             original_bucket = os.environ.get('ORIGINAL_BUCKET', 'ppt-translation-original')
@@ -143,18 +164,8 @@ def handle_translate_request(event, cors_headers):
                 
             logger.info(f"Using translation lambda name: {translation_lambda_name}")
             
-            # If the name doesn't include the full ARN, try to construct it
-            if ':function:' not in translation_lambda_name:
-                # Get the AWS region and account ID
-                sts_client = boto3.client('sts')
-                account_id = sts_client.get_caller_identity()['Account']
-                region = boto3.session.Session().region_name
-                
-                # Construct the full ARN
-                translation_lambda_arn = f"arn:aws:lambda:{region}:{account_id}:function:{translation_lambda_name}"
-                logger.info(f"Constructed Lambda ARN: {translation_lambda_arn}")
-            else:
-                translation_lambda_arn = translation_lambda_name
+            # If the name doesn't include the full ARN, construct it (resolved once per container)
+            translation_lambda_arn = lambda_function_arn(translation_lambda_name)
             
             logger.info(f"Using translation lambda ARN: {translation_lambda_arn}")
             
@@ -177,8 +188,12 @@ def handle_translate_request(event, cors_headers):
                 'targetLanguage': target_language
             }
             
+            # Record the job before the worker can start updating it
+            jobs = tracker_from_environment()
+            jobs.create(job_id, fileKey=file_key, sourceLanguage=source_language, targetLanguage=target_language)
+            
             # Log the event we're about to send
-            logger.info(f"Invoking Lambda {translation_lambda_arn} with event: {json.dumps(s3_event)}")
+            logger.info("Invoking Lambda %s with event: %s", translation_lambda_arn, LazyJson(s3_event))
             
             # Invoke the main translation Lambda function asynchronously
             try:
@@ -189,6 +204,7 @@ def handle_translate_request(event, cors_headers):
                 )
                 
                 logger.info(f"Successfully triggered translation Lambda for job {job_id}, response status code: {response['StatusCode']}")
+                get_metrics().count('TranslationJobsStarted')
                 
                 # Return the job ID to the client
                 return {
@@ -204,6 +220,7 @@ def handle_translate_request(event, cors_headers):
             except Exception as e:
                 logger.error(f"Error invoking Lambda: {e}")
                 logger.error(f"Exception traceback: {traceback.format_exc()}")
+                jobs.update(job_id, status=JOB_FAILED, error=f'Failed to start translation job: {str(e)}')
                 return {
                     'statusCode': 500,
                     'headers': cors_headers,
@@ -252,22 +269,27 @@ def handle_status_request(event, cors_headers):
                 })
             }
         
-        # In a real implementation, you would check the status of the translation job
-        # For now, we'll just return a mock status
         logger.info(f"Checking status for job: {job_id}")
         
-        # Mock status - in a real implementation, this would come from a database or other storage
-        status = 'completed'  # or 'processing', 'failed', etc.
+        job = tracker_from_environment().get(job_id)
+        if job is None:
+            return job_not_found(job_id, cors_headers)
+        
+        body = {
+            'jobId': job_id,
+            'status': job.get('status'),
+            'progress': job.get('progress', 0),  # percentage
+            'timestamp': datetime.datetime.now().isoformat()
+        }
+        for field in ('slidesDone', 'slidesTotal', 'segmentsDone', 'segmentsTotal', 'currentSlide',
+                      'etaSeconds', 'estimatedCompletionAt', 'tokensUsed', 'usage', 'error', 'updatedAt'):
+            if field in job:
+                body[field] = job[field]
         
         return {
             'statusCode': 200,
             'headers': cors_headers,
-            'body': json.dumps({
-                'jobId': job_id,
-                'status': status,
-                'progress': 100,  # percentage
-                'timestamp': datetime.datetime.now().isoformat()
-            })
+            'body': json.dumps(body)
         }
     except Exception as e:
         logger.error(f"Error checking status: {e}")
@@ -298,20 +320,32 @@ def handle_result_request(event, cors_headers):
                 })
             }
         
-        # In a real implementation, you would retrieve the result of the translation job
-        # For now, we'll just return a mock result
         logger.info(f"Getting result for job: {job_id}")
         
-        # Mock result - in a real implementation, this would come from a database or S3
-        translated_file_key = f"translated_{job_id}.pptx"
+        job = tracker_from_environment().get(job_id)
+        if job is None:
+            return job_not_found(job_id, cors_headers)
+        
+        if job.get('status') != JOB_COMPLETED:
+            return {
+                'statusCode': 409,
+                'headers': cors_headers,
+                'body': json.dumps({
+                    'jobId': job_id,
+                    'status': job.get('status'),
+                    'error': f"Translation job {job_id} is not completed",
+                    'timestamp': datetime.datetime.now().isoformat()
+                })
+            }
         
         return {
             'statusCode': 200,
             'headers': cors_headers,
             'body': json.dumps({
                 'jobId': job_id,
-                'status': 'completed',
-                'fileKey': translated_file_key,
+                'status': JOB_COMPLETED,
+                'fileKey': job.get('outputKey'),
+                'bucket': job.get('outputBucket'),
                 'timestamp': datetime.datetime.now().isoformat()
             })
         }
@@ -326,3 +360,14 @@ def handle_result_request(event, cors_headers):
                 'timestamp': datetime.datetime.now().isoformat()
             })
         }
+
+def job_not_found(job_id, cors_headers):
+    """Build the response for an unknown job ID"""
+    return {
+        'statusCode': 404,
+        'headers': cors_headers,
+        'body': json.dumps({
+            'error': f'Unknown translation job: {job_id}',
+            'timestamp': datetime.datetime.now().isoformat()
+        })
+    }